@@ -9,7 +9,7 @@ import shutil
 import subprocess
 from pathlib import Path
 
-from office.soffice import get_soffice_env
+from office.soffice import SofficeError, get_soffice_env
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +36,7 @@ ACCEPT_CHANGES_MACRO = """<?xml version="1.0" encoding="UTF-8"?>
 def accept_changes(
     input_file: str,
     output_file: str,
+    pool=None,
 ) -> tuple[None, str]:
     input_path = Path(input_file)
     output_path = Path(output_file)
@@ -52,6 +53,16 @@ def accept_changes(
     except Exception as e:
         return None, f"Error: Failed to copy input file to output location: {e}"
 
+    if pool is not None:
+        try:
+            pool.run_macro(output_path, _accept_all_tracked_changes, timeout=30)
+        except SofficeError as e:
+            return None, f"Error: LibreOffice failed: {e}"
+        return (
+            None,
+            f"Successfully accepted all tracked changes: {input_file} -> {output_file}",
+        )
+
     if not _setup_libreoffice_macro():
         return None, "Error: Failed to setup LibreOffice macro"
 
@@ -88,6 +99,14 @@ def accept_changes(
     )
 
 
+def _accept_all_tracked_changes(document, context) -> None:
+    dispatcher = context.ServiceManager.createInstanceWithContext(
+        "com.sun.star.frame.DispatchHelper", context
+    )
+    frame = document.getCurrentController().getFrame()
+    dispatcher.executeDispatch(frame, ".uno:AcceptAllTrackedChanges", "", 0, ())
+
+
 def _setup_libreoffice_macro() -> bool:
     macro_dir = Path(MACRO_DIR)
     macro_file = macro_dir / "Module1.xba"
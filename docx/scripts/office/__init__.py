@@ -0,0 +1,24 @@
+"""
+Loader for the shared ``office`` package in office-core/office.
+
+Importing ``office`` from a skill's scripts directory runs this module. It
+puts the office-core directory at the repository root first on sys.path
+and imports the package from there in its place, so every skill in a
+process gets the same modules, schemas and caches.
+"""
+
+import importlib
+import sys
+from pathlib import Path
+
+_OFFICE_CORE = Path(__file__).resolve().parents[3] / "office-core"
+
+if not (_OFFICE_CORE / "office" / "__init__.py").is_file():
+    raise ImportError(
+        f"office-core not found at {_OFFICE_CORE}; copy office-core/ from the "
+        "repository next to the docx, pptx and xlsx skills"
+    )
+
+sys.path.insert(0, str(_OFFICE_CORE))
+del sys.modules[__name__]
+sys.modules[__name__] = importlib.import_module(__name__)
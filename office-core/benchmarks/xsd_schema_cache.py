@@ -0,0 +1,91 @@
+"""Per-part XSD validation time with and without the compiled-schema cache.
+
+Usage:
+    python benchmarks/xsd_schema_cache.py deck.pptx [--repeat N]
+
+"before" compiles the part's schema for every part, as validate_against_xsd
+did before validators/cache.py memoized it; "after" goes through
+load_schema, so only the first part of each schema pays for compiling it.
+Both runs start from an empty schema cache and a fresh validator.
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from collections import defaultdict
+from pathlib import Path
+
+import lxml.etree
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from office.validators import DOCXSchemaValidator, PPTXSchemaValidator  # noqa: E402
+from office.validators import base, cache  # noqa: E402
+
+VALIDATORS = {".docx": DOCXSchemaValidator, ".pptx": PPTXSchemaValidator}
+
+
+def compile_every_time(schema_path):
+    with open(schema_path, "rb") as xsd_file:
+        xsd_doc = lxml.etree.parse(xsd_file, base_url=str(schema_path))
+    return lxml.etree.XMLSchema(xsd_doc)
+
+
+def time_parts(validator_class, unpacked_dir, load_schema):
+    """schema name -> [seconds per part], in part order."""
+    cache._SCHEMAS.clear()
+    base.load_schema = load_schema
+    try:
+        validator = validator_class(unpacked_dir)
+        timings = defaultdict(list)
+        for xml_file in validator.xml_files:
+            schema_path = validator._get_schema_path(xml_file)
+            if schema_path is None:
+                continue
+            started = time.perf_counter()
+            validator._validate_single_file_xsd(xml_file, validator.unpacked_dir)
+            timings[schema_path.name].append(time.perf_counter() - started)
+        return timings
+    finally:
+        base.load_schema = cache.load_schema
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("document", help="A .pptx or .docx file")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the median is shown")
+    args = parser.parse_args()
+
+    document = Path(args.document)
+    validator_class = VALIDATORS[document.suffix.lower()]
+    with tempfile.TemporaryDirectory() as unpacked_dir:
+        with zipfile.ZipFile(document) as archive:
+            archive.extractall(unpacked_dir)
+        runs = {
+            mode: [time_parts(validator_class, unpacked_dir, load) for _ in range(args.repeat)]
+            for mode, load in (("before", compile_every_time), ("after", cache.load_schema))
+        }
+
+    def median_total(mode, schema):
+        return statistics.median(sum(run[schema]) for run in runs[mode]) * 1000
+
+    def median_first(mode, schema):
+        return statistics.median(run[schema][0] for run in runs[mode]) * 1000
+
+    print(f"{document.name}: median of {args.repeat} runs, milliseconds")
+    print(f"{'schema':<40} {'parts':>5} {'before':>9} {'after':>9} {'after, 1st part':>16}")
+    totals = {"before": 0.0, "after": 0.0}
+    for schema in sorted(runs["before"][0]):
+        parts = len(runs["before"][0][schema])
+        before, after = median_total("before", schema), median_total("after", schema)
+        totals["before"] += before
+        totals["after"] += after
+        print(f"{schema:<40} {parts:>5} {before:>9.1f} {after:>9.1f} {median_first('after', schema):>16.1f}")
+    print(f"{'total':<40} {'':>5} {totals['before']:>9.1f} {totals['after']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
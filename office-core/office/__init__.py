@@ -0,0 +1,13 @@
+"""
+Office Open XML tooling shared by the docx, pptx and xlsx skills.
+
+The skills import this package as ``office`` (see the loader in each skill's
+scripts/office/__init__.py), so a process that uses several of them loads
+the validators, the XSD schemas and their caches once.
+
+Command line entry points:
+    python -m office.unpack <office_file> <output_dir>
+    python -m office.pack <input_directory> <output_file>
+    python -m office.validate <path>
+    python -m office.soffice <soffice args...>
+"""
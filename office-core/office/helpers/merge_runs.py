@@ -0,0 +1,201 @@
+"""Merge adjacent runs with identical formatting in DOCX.
+
+Merges adjacent <w:r> elements that have identical <w:rPr> properties.
+Works on runs in paragraphs and inside tracked changes (<w:ins>, <w:del>).
+
+Also:
+- Removes rsid attributes from runs (revision metadata that doesn't affect rendering)
+- Removes proofErr elements (spell/grammar markers that block merging)
+
+One iterative walk over the tree finds the proofErr elements and the run
+containers, so deeply nested tables never hit the recursion limit. Run
+properties are compared by a digest of their canonical form, computed once
+per <w:rPr>.
+"""
+
+import hashlib
+from pathlib import Path
+
+import lxml.etree
+
+from .pipeline import parse_xml, serialize_xml
+
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+
+def merge_runs(input_dir: str) -> tuple[int, str]:
+    doc_xml = Path(input_dir) / "word" / "document.xml"
+
+    if not doc_xml.exists():
+        return 0, f"Error: {doc_xml} not found"
+
+    try:
+        tree = parse_xml(doc_xml.read_bytes())
+
+        merge_count = merge_runs_in_tree(tree.getroot())
+
+        doc_xml.write_bytes(serialize_xml(tree))
+        return merge_count, f"Merged {merge_count} runs"
+
+    except Exception as e:
+        return 0, f"Error: {e}"
+
+
+def merge_runs_in_tree(root) -> int:
+    proof_errors = []
+    containers = {}
+
+    for elem in root.iter(lxml.etree.Element):
+        name = _local_name(elem)
+        if name == "proofErr":
+            proof_errors.append(elem)
+        elif name == "r":
+            _strip_rsid_attrs(elem)
+            parent = elem.getparent()
+            if parent is not None:
+                containers[parent] = None
+
+    for elem in proof_errors:
+        _remove_keeping_tail(elem)
+
+    rpr_digests = {}
+    merge_count = 0
+    for container in containers:
+        merge_count += _merge_runs_in(container, rpr_digests)
+
+    return merge_count
+
+
+def _local_name(elem) -> str:
+    return elem.tag.rpartition("}")[2]
+
+
+def _is_named(node, name: str) -> bool:
+    return isinstance(node.tag, str) and _local_name(node) == name
+
+
+def _strip_rsid_attrs(run):
+    for attr in list(run.attrib):
+        if "rsid" in attr.rpartition("}")[2].lower():
+            del run.attrib[attr]
+
+
+def _remove_keeping_tail(elem):
+    """Remove elem but keep the text that followed it, as a DOM removal does."""
+    parent = elem.getparent()
+    if parent is None:
+        return
+    if elem.tail:
+        previous = elem.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or "") + elem.tail
+        else:
+            parent.text = (parent.text or "") + elem.tail
+    parent.remove(elem)
+
+
+def _merge_runs_in(container, rpr_digests) -> int:
+    merge_count = 0
+    run = next((child for child in container if _is_named(child, "r")), None)
+
+    while run is not None:
+        while True:
+            next_elem = _next_element_sibling(run)
+            if (
+                next_elem is not None
+                and _is_named(next_elem, "r")
+                and _can_merge(run, next_elem, rpr_digests)
+            ):
+                _merge_run_content(run, next_elem)
+                _remove_keeping_tail(next_elem)
+                merge_count += 1
+            else:
+                break
+
+        _consolidate_text(run)
+        run = _next_sibling_run(run)
+
+    return merge_count
+
+
+def _next_element_sibling(node):
+    sibling = node.getnext()
+    while sibling is not None and not isinstance(sibling.tag, str):
+        sibling = sibling.getnext()
+    return sibling
+
+
+def _next_sibling_run(node):
+    sibling = node.getnext()
+    while sibling is not None and not _is_named(sibling, "r"):
+        sibling = sibling.getnext()
+    return sibling
+
+
+def _get_child(parent, tag: str):
+    for child in parent:
+        if _is_named(child, tag):
+            return child
+    return None
+
+
+def _rpr_digest(rpr, rpr_digests) -> bytes:
+    digest = rpr_digests.get(rpr)
+    if digest is None:
+        canonical = lxml.etree.tostring(
+            rpr, method="c14n", exclusive=True, with_tail=False
+        )
+        digest = hashlib.sha1(canonical).digest()
+        rpr_digests[rpr] = digest
+    return digest
+
+
+def _can_merge(run1, run2, rpr_digests) -> bool:
+    rpr1 = _get_child(run1, "rPr")
+    rpr2 = _get_child(run2, "rPr")
+
+    if (rpr1 is None) != (rpr2 is None):
+        return False
+    if rpr1 is None:
+        return True
+    return _rpr_digest(rpr1, rpr_digests) == _rpr_digest(rpr2, rpr_digests)
+
+
+def _merge_run_content(target, source):
+    for child in list(source):
+        if isinstance(child.tag, str) and _local_name(child) != "rPr":
+            child.tail = None
+            target.append(child)
+
+
+def _is_adjacent(elem1, elem2) -> bool:
+    if elem1.tail and elem1.tail.strip():
+        return False
+    node = elem1.getnext()
+    while node is not None:
+        if node is elem2:
+            return True
+        if isinstance(node.tag, str):
+            return False
+        if node.tail and node.tail.strip():
+            return False
+        node = node.getnext()
+    return False
+
+
+def _consolidate_text(run):
+    t_elements = [child for child in run if _is_named(child, "t")]
+
+    for i in range(len(t_elements) - 1, 0, -1):
+        curr, prev = t_elements[i], t_elements[i - 1]
+
+        if _is_adjacent(prev, curr):
+            merged = (prev.text or "") + (curr.text or "")
+            prev.text = merged
+
+            if merged.startswith(" ") or merged.endswith(" "):
+                prev.set(XML_SPACE, "preserve")
+            elif XML_SPACE in prev.attrib:
+                del prev.attrib[XML_SPACE]
+
+            _remove_keeping_tail(curr)
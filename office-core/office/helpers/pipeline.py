@@ -0,0 +1,53 @@
+"""Run DOCX cleanup transforms over one parsed tree per part.
+
+A transform takes the root element, edits it in place and returns how many
+changes it made (simplify_redlines_in_tree, merge_runs_in_tree). run_pipeline
+parses a part once, applies the transforms in order, and serializes the
+result once, pretty-printed the same way unpack.py formats every other part.
+
+The transforms apply to every DOCX story part, not just word/document.xml:
+headers, footers, footnotes, endnotes and comments carry runs and tracked
+changes too.
+"""
+
+import re
+
+import lxml.etree
+
+STORY_PART_PATTERN = re.compile(
+    r"word/(document|header\d*|footer\d*|footnotes|endnotes|comments)\.xml"
+)
+
+
+def is_story_part(name: str) -> bool:
+    return STORY_PART_PATTERN.fullmatch(name) is not None
+
+
+def parse_xml(data: bytes):
+    parser = lxml.etree.XMLParser(resolve_entities=False, huge_tree=True)
+    return lxml.etree.ElementTree(lxml.etree.fromstring(data, parser))
+
+
+def serialize_xml(tree, pretty: bool = False) -> bytes:
+    """Serialize like minidom: toprettyxml() when pretty, toxml() otherwise."""
+    if pretty:
+        lxml.etree.indent(tree, space="  ")
+        declaration = '<?xml version="1.0" encoding="utf-8"'
+    else:
+        declaration = '<?xml version="1.0" encoding="UTF-8"'
+    if tree.docinfo.standalone:
+        declaration += ' standalone="yes"'
+    declaration += "?>"
+
+    body = lxml.etree.tostring(tree, encoding="UTF-8", xml_declaration=False)
+    if pretty:
+        return f"{declaration}\n".encode() + body + b"\n"
+    return declaration.encode() + body
+
+
+def run_pipeline(data: bytes, transforms) -> tuple[bytes, list[int]]:
+    """Apply transforms to the part in data; returns (pretty XML, counts)."""
+    tree = parse_xml(data)
+    root = tree.getroot()
+    counts = [transform(root) for transform in transforms]
+    return serialize_xml(tree, pretty=True), counts
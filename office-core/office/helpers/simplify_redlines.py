@@ -14,7 +14,9 @@ import xml.etree.ElementTree as ET
 import zipfile
 from pathlib import Path
 
-import defusedxml.minidom
+import lxml.etree
+
+from .pipeline import parse_xml, serialize_xml
 
 WORD_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
 
@@ -26,33 +28,38 @@ def simplify_redlines(input_dir: str) -> tuple[int, str]:
         return 0, f"Error: {doc_xml} not found"
 
     try:
-        dom = defusedxml.minidom.parseString(doc_xml.read_text(encoding="utf-8"))
-        root = dom.documentElement
-
-        merge_count = 0
-
-        containers = _find_elements(root, "p") + _find_elements(root, "tc")
+        tree = parse_xml(doc_xml.read_bytes())
 
-        for container in containers:
-            merge_count += _merge_tracked_changes_in(container, "ins")
-            merge_count += _merge_tracked_changes_in(container, "del")
+        merge_count = simplify_redlines_in_tree(tree.getroot())
 
-        doc_xml.write_bytes(dom.toxml(encoding="UTF-8"))
+        doc_xml.write_bytes(serialize_xml(tree))
         return merge_count, f"Simplified {merge_count} tracked changes"
 
     except Exception as e:
         return 0, f"Error: {e}"
 
 
-def _merge_tracked_changes_in(container, tag: str) -> int:
+def simplify_redlines_in_tree(root) -> int:
     merge_count = 0
 
-    tracked = [
-        child
-        for child in container.childNodes
-        if child.nodeType == child.ELEMENT_NODE and _is_element(child, tag)
+    containers = [
+        elem
+        for elem in root.iter(lxml.etree.Element)
+        if _local_name(elem) in ("p", "tc")
     ]
 
+    for container in containers:
+        merge_count += _merge_tracked_changes_in(container, "ins")
+        merge_count += _merge_tracked_changes_in(container, "del")
+
+    return merge_count
+
+
+def _merge_tracked_changes_in(container, tag: str) -> int:
+    merge_count = 0
+
+    tracked = [child for child in container if _is_element(child, tag)]
+
     if len(tracked) < 2:
         return 0
 
@@ -63,7 +70,7 @@ def _merge_tracked_changes_in(container, tag: str) -> int:
 
         if _can_merge_tracked(curr, next_elem):
             _merge_tracked_content(curr, next_elem)
-            container.removeChild(next_elem)
+            _remove_keeping_tail(next_elem)
             tracked.pop(i + 1)
             merge_count += 1
         else:
@@ -72,55 +79,59 @@ def _merge_tracked_changes_in(container, tag: str) -> int:
     return merge_count
 
 
+def _local_name(elem) -> str:
+    return elem.tag.rpartition("}")[2]
+
+
 def _is_element(node, tag: str) -> bool:
-    name = node.localName or node.tagName
-    return name == tag or name.endswith(f":{tag}")
+    return isinstance(node.tag, str) and _local_name(node) == tag
 
 
 def _get_author(elem) -> str:
-    author = elem.getAttribute("w:author")
+    author = elem.get(f"{{{WORD_NS}}}author")
     if not author:
-        for attr in elem.attributes.values():
-            if attr.localName == "author" or attr.name.endswith(":author"):
-                return attr.value
-    return author
+        for name, value in elem.attrib.items():
+            if name.rpartition("}")[2] == "author":
+                return value
+    return author or ""
 
 
 def _can_merge_tracked(elem1, elem2) -> bool:
     if _get_author(elem1) != _get_author(elem2):
         return False
 
-    node = elem1.nextSibling
-    while node and node != elem2:
-        if node.nodeType == node.ELEMENT_NODE:
+    if elem1.tail and elem1.tail.strip():
+        return False
+    node = elem1.getnext()
+    while node is not None and node is not elem2:
+        if isinstance(node.tag, str):
             return False
-        if node.nodeType == node.TEXT_NODE and node.data.strip():
+        if node.tail and node.tail.strip():
             return False
-        node = node.nextSibling
+        node = node.getnext()
 
     return True
 
 
 def _merge_tracked_content(target, source):
-    while source.firstChild:
-        child = source.firstChild
-        source.removeChild(child)
-        target.appendChild(child)
-
-
-def _find_elements(root, tag: str) -> list:
-    results = []
+    if source.text:
+        if len(target):
+            target[-1].tail = (target[-1].tail or "") + source.text
+        else:
+            target.text = (target.text or "") + source.text
+    for child in list(source):
+        target.append(child)
 
-    def traverse(node):
-        if node.nodeType == node.ELEMENT_NODE:
-            name = node.localName or node.tagName
-            if name == tag or name.endswith(f":{tag}"):
-                results.append(node)
-            for child in node.childNodes:
-                traverse(child)
 
-    traverse(root)
-    return results
+def _remove_keeping_tail(elem):
+    parent = elem.getparent()
+    if elem.tail:
+        previous = elem.getprevious()
+        if previous is not None:
+            previous.tail = (previous.tail or "") + elem.tail
+        else:
+            parent.text = (parent.text or "") + elem.tail
+    parent.remove(elem)
 
 
 def get_tracked_change_authors(doc_xml_path: Path) -> dict[str, int]:
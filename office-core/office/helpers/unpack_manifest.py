@@ -0,0 +1,71 @@
+"""Record what unpack.py wrote so pack.py can reuse untouched ZIP members.
+
+unpack() stores the hash of every file it writes, together with the size and
+mtime of the source archive, in ".<name>.unpack.json" beside the unpacked
+directory (never inside it, so it is not packed). pack() reads it back: a part
+whose file still hashes to the recorded value was not edited, and its original
+compressed member can be copied from the source archive as-is.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+VERSION = 1
+
+
+def manifest_path(unpacked_dir) -> Path:
+    # Resolved first: Path(".").name is empty, which would put the manifest
+    # inside the directory it describes.
+    unpacked_dir = Path(unpacked_dir).resolve()
+    return unpacked_dir.parent / f".{unpacked_dir.name}.unpack.json"
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def save_unpack_manifest(unpacked_dir, source_file, hashes: dict[str, str]) -> None:
+    source = Path(source_file).resolve()
+    stat = source.stat()
+    data = {
+        "version": VERSION,
+        "source": str(source),
+        "source_signature": [stat.st_mtime_ns, stat.st_size],
+        "parts": hashes,
+    }
+    path = manifest_path(unpacked_dir)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(data), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def find_pristine_parts(unpacked_dir) -> tuple[Path | None, set[str]]:
+    """Source archive and the parts still byte-identical to what unpack wrote.
+
+    Returns (None, set()) when there is no manifest or the source archive
+    has changed or gone since unpacking.
+    """
+    unpacked_dir = Path(unpacked_dir)
+    try:
+        data = json.loads(manifest_path(unpacked_dir).read_text(encoding="utf-8"))
+        if data.get("version") != VERSION:
+            return None, set()
+        source = Path(data["source"])
+        stat = source.stat()
+        if [stat.st_mtime_ns, stat.st_size] != data["source_signature"]:
+            return None, set()
+        hashes = data["parts"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return None, set()
+
+    pristine = set()
+    for name, recorded in hashes.items():
+        try:
+            if content_hash((unpacked_dir / name).read_bytes()) == recorded:
+                pristine.add(name)
+        except OSError:
+            continue
+
+    return source, pristine
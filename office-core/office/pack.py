@@ -0,0 +1,395 @@
+"""Pack a directory into a DOCX, PPTX, or XLSX file.
+
+Validates with auto-repair, condenses XML formatting, and creates the Office file.
+Parts that are unchanged since unpack.py wrote them are copied from the original
+archive without being re-serialized or recompressed.
+
+Usage:
+    python pack.py <input_directory> <output_file> [--original <file>] [--validate true|false] [--jobs N] [--incremental] [--compresslevel 0-9]
+
+Examples:
+    python pack.py unpacked/ output.docx --original input.docx
+    python pack.py unpacked/ output.pptx --validate false
+"""
+
+import argparse
+import collections
+import struct
+import sys
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import defusedxml.minidom
+
+from .helpers.unpack_manifest import find_pristine_parts
+from .validators import DOCXSchemaValidator, PPTXSchemaValidator, RedliningValidator
+
+MAX_PRECOMPRESSED_BYTES = 16 * 1024 * 1024
+
+# Formats that are already compressed; deflating them only costs CPU, so they
+# are stored as-is. EMF/WMF and BMP are uncompressed and still deflated.
+STORED_EXTENSIONS = {
+    ".jpg", ".jpeg", ".jpe", ".png", ".gif", ".wdp", ".jxr", ".webp",
+    ".mp4", ".m4v", ".mov", ".wmv", ".avi", ".mpg", ".mpeg", ".webm",
+    ".mp3", ".m4a", ".wma", ".aac", ".ogg", ".oga",
+    ".zip", ".docx", ".docm", ".pptx", ".pptm", ".xlsx", ".xlsm", ".odttf",
+}
+
+# Manifests unpack.py and the validators keep beside an unpacked directory.
+SIDECAR_SUFFIXES = (".unpack.json", ".validation.json")
+
+
+def pack(
+    input_directory: str,
+    output_file: str,
+    original_file: str | None = None,
+    validate: bool = True,
+    infer_author_func=None,
+    jobs: int = 1,
+    incremental: bool = False,
+    compresslevel: int | None = None,
+) -> tuple[None, str]:
+    input_dir = Path(input_directory)
+    output_path = Path(output_file)
+    suffix = output_path.suffix.lower()
+
+    if not input_dir.is_dir():
+        return None, f"Error: {input_dir} is not a directory"
+
+    if suffix not in {".docx", ".pptx", ".xlsx"}:
+        return None, f"Error: {output_file} must be a .docx, .pptx, or .xlsx file"
+
+    if validate and original_file:
+        original_path = Path(original_file)
+        if original_path.exists():
+            success, output = _run_validation(
+                input_dir, original_path, suffix, infer_author_func, jobs, incremental
+            )
+            if output:
+                print(output)
+            if not success:
+                return None, f"Error: Validation failed for {input_dir}"
+
+    source, pristine = find_pristine_parts(input_dir)
+    if source and output_path.resolve() == source:
+        # Writing over the source archive truncates it before it is read.
+        pristine = set()
+    source_zip = zipfile.ZipFile(source, "r") if pristine else None
+
+    try:
+        if source_zip:
+            pristine = {
+                name
+                for name in pristine
+                if _can_copy_raw(source_zip.NameToInfo.get(name))
+            }
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            raw = _supports_raw_writes(zf)
+            members = _compress_members(input_dir, jobs, compresslevel, pristine)
+            for f, arcname, compressed in members:
+                if arcname in pristine:
+                    _copy_member(zf, source_zip, arcname, raw)
+                elif compressed is None:
+                    zf.write(f, arcname, _compress_type(f), compresslevel)
+                else:
+                    data, crc, file_size = compressed
+                    info = zipfile.ZipInfo.from_file(f, arcname)
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    if raw:
+                        info.CRC = crc
+                        info.file_size = file_size
+                        info.compress_size = len(data)
+                        _write_compressed_member(zf, info, data)
+                    else:
+                        zf.writestr(info, zlib.decompress(data, -15), compresslevel=compresslevel)
+    finally:
+        if source_zip:
+            source_zip.close()
+
+    return None, f"Successfully packed {input_dir} to {output_file}"
+
+
+def _run_validation(
+    unpacked_dir: Path,
+    original_file: Path,
+    suffix: str,
+    infer_author_func=None,
+    jobs: int = 1,
+    incremental: bool = False,
+) -> tuple[bool, str | None]:
+    output_lines = []
+    validators = []
+
+    if suffix == ".docx":
+        author = "Claude"
+        if infer_author_func:
+            try:
+                author = infer_author_func(unpacked_dir, original_file)
+            except ValueError as e:
+                print(f"Warning: {e} Using default author 'Claude'.", file=sys.stderr)
+
+        validators = [
+            DOCXSchemaValidator(
+                unpacked_dir, original_file, jobs=jobs, incremental=incremental
+            ),
+            RedliningValidator(unpacked_dir, original_file, author=author),
+        ]
+    elif suffix == ".pptx":
+        validators = [
+            PPTXSchemaValidator(
+                unpacked_dir, original_file, jobs=jobs, incremental=incremental
+            )
+        ]
+
+    if not validators:
+        return True, None
+
+    total_repairs = sum(v.repair() for v in validators)
+    if total_repairs:
+        output_lines.append(f"Auto-repaired {total_repairs} issue(s)")
+
+    success = all(v.validate() for v in validators)
+
+    if success:
+        output_lines.append("All validations PASSED!")
+
+    return success, "\n".join(output_lines) if output_lines else None
+
+
+def _compress_members(
+    input_dir: Path,
+    jobs: int = 1,
+    compresslevel: int | None = None,
+    skip: set[str] = frozenset(),
+):
+    """Yield (path, arcname, compressed) for every file under input_dir.
+
+    [Content_Types].xml comes first. XML parts, and other deflated members up
+    to MAX_PRECOMPRESSED_BYTES, are condensed and deflated ahead of the
+    writer, in a pool of `jobs` processes when jobs > 1; compressed is (raw
+    deflate data, CRC, uncompressed size). Stored and larger binary members,
+    and those named in skip, yield None and are left to the writer.
+    """
+    files = [f for f in input_dir.rglob("*") if f.is_file() and not _is_sidecar(f)]
+    files.sort(key=lambda f: f.relative_to(input_dir) != Path("[Content_Types].xml"))
+    precompress = [
+        f.relative_to(input_dir).as_posix() not in skip
+        and (
+            _is_xml_part(f)
+            or (
+                _compress_type(f) == zipfile.ZIP_DEFLATED
+                and f.stat().st_size <= MAX_PRECOMPRESSED_BYTES
+            )
+        )
+        for f in files
+    ]
+
+    if jobs <= 1:
+        for f, small in zip(files, precompress):
+            compressed = _deflate_member(f, compresslevel) if small else None
+            yield f, f.relative_to(input_dir).as_posix(), compressed
+        return
+
+    # At most jobs * 4 members are compressed ahead of the writer, which
+    # bounds the memory held by finished results.
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = collections.deque()
+        for f, small in zip(files, precompress):
+            future = None
+            if small:
+                future = executor.submit(_deflate_member, f, compresslevel)
+            pending.append((f, future))
+            if len(pending) >= jobs * 4:
+                yield _next_compressed(input_dir, pending)
+        while pending:
+            yield _next_compressed(input_dir, pending)
+
+
+def _next_compressed(input_dir: Path, pending):
+    f, future = pending.popleft()
+    compressed = future.result() if future else None
+    return f, f.relative_to(input_dir).as_posix(), compressed
+
+
+def _deflate_member(
+    f: Path, compresslevel: int | None = None
+) -> tuple[bytes, int, int]:
+    data = _condense_xml(f) if _is_xml_part(f) else f.read_bytes()
+    if compresslevel is None:
+        compresslevel = zlib.Z_DEFAULT_COMPRESSION
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    return compressor.compress(data) + compressor.flush(), zlib.crc32(data), len(data)
+
+
+def _is_sidecar(f: Path) -> bool:
+    """Whether f is an unpack or validation manifest, which describe the
+    package and are never part of it."""
+    return f.name.startswith(".") and f.name.endswith(SIDECAR_SUFFIXES)
+
+
+def _is_xml_part(f: Path) -> bool:
+    return f.name.endswith((".xml", ".rels"))
+
+
+def _compress_type(f: Path) -> int:
+    if f.suffix.lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def _can_copy_raw(info: zipfile.ZipInfo | None) -> bool:
+    return (
+        info is not None
+        and info.compress_type in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)
+        and not info.flag_bits & 0x1
+    )
+
+
+def _copy_member(
+    zf: zipfile.ZipFile, source_zip: zipfile.ZipFile, name: str, raw: bool
+) -> None:
+    """Copy a member's compressed bytes from source_zip without decompressing,
+    or through ZipFile.writestr when raw writes are unavailable."""
+    source_info = source_zip.getinfo(name)
+    if not raw:
+        info = zipfile.ZipInfo(name, date_time=source_info.date_time)
+        info.compress_type = source_info.compress_type
+        info.external_attr = source_info.external_attr
+        zf.writestr(info, source_zip.read(name))
+        return
+
+    source_zip.fp.seek(source_info.header_offset)
+    header = source_zip.fp.read(zipfile.sizeFileHeader)
+    name_length, extra_length = struct.unpack("<HH", header[26:30])
+    source_zip.fp.seek(
+        source_info.header_offset + zipfile.sizeFileHeader + name_length + extra_length
+    )
+    data = source_zip.fp.read(source_info.compress_size)
+
+    info = zipfile.ZipInfo(name, date_time=source_info.date_time)
+    info.compress_type = source_info.compress_type
+    info.external_attr = source_info.external_attr
+    info.CRC = source_info.CRC
+    info.file_size = source_info.file_size
+    info.compress_size = source_info.compress_size
+    _write_compressed_member(zf, info, data)
+
+
+# ZipFile internals _write_compressed_member relies on; they are not public
+# API, so raw writes are used only when all of them are present.
+_RAW_WRITE_ATTRIBUTES = ("fp", "start_dir", "_writecheck", "_didModify", "_lock", "_writing")
+
+
+def _supports_raw_writes(zf: zipfile.ZipFile) -> bool:
+    return all(hasattr(zf, name) for name in _RAW_WRITE_ATTRIBUTES)
+
+
+def _write_compressed_member(
+    zf: zipfile.ZipFile, info: zipfile.ZipInfo, data: bytes
+) -> None:
+    """Append a member whose data is already compressed with info.compress_type.
+
+    zipfile only writes members it compresses itself, so this writes the
+    local header and data the same way ZipFile.writestr does, minus the
+    compressor. Only call it when _supports_raw_writes(zf).
+    """
+    if not info.external_attr:
+        info.external_attr = 0o600 << 16
+
+    with zf._lock:
+        if zf._writing:
+            raise ValueError(
+                "Can't write to ZIP archive while an open writing handle exists"
+            )
+        zf.fp.seek(zf.start_dir)
+        info.header_offset = zf.fp.tell()
+        zf._writecheck(info)
+        zf._didModify = True
+
+        zf.fp.write(info.FileHeader())
+        zf.fp.write(data)
+        zf.start_dir = zf.fp.tell()
+
+        zf.filelist.append(info)
+        zf.NameToInfo[info.filename] = info
+
+
+def _condense_xml(xml_file: Path) -> bytes:
+    try:
+        with open(xml_file, encoding="utf-8") as f:
+            dom = defusedxml.minidom.parse(f)
+
+        for element in dom.getElementsByTagName("*"):
+            if element.tagName.endswith(":t"):
+                continue
+
+            for child in list(element.childNodes):
+                if (
+                    child.nodeType == child.TEXT_NODE
+                    and child.nodeValue
+                    and child.nodeValue.strip() == ""
+                ) or child.nodeType == child.COMMENT_NODE:
+                    element.removeChild(child)
+
+        return dom.toxml(encoding="UTF-8")
+    except Exception as e:
+        print(f"ERROR: Failed to parse {xml_file.name}: {e}", file=sys.stderr)
+        raise
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pack a directory into a DOCX, PPTX, or XLSX file"
+    )
+    parser.add_argument("input_directory", help="Unpacked Office document directory")
+    parser.add_argument("output_file", help="Output Office file (.docx/.pptx/.xlsx)")
+    parser.add_argument(
+        "--original",
+        help="Original file for validation comparison",
+    )
+    parser.add_argument(
+        "--validate",
+        type=lambda x: x.lower() == "true",
+        default=True,
+        metavar="true|false",
+        help="Run validation with auto-repair (default: true)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Validate parts against the XSD schemas and compress them in N worker processes (default: 1)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse per-part validation results from the previous run for unchanged parts",
+    )
+    parser.add_argument(
+        "--compresslevel",
+        type=int,
+        choices=range(10),
+        metavar="0-9",
+        help="Deflate level for XML and other compressible parts (default: zlib's default, 6); "
+        "already-compressed media is always stored",
+    )
+    args = parser.parse_args()
+
+    _, message = pack(
+        args.input_directory,
+        args.output_file,
+        original_file=args.original,
+        validate=args.validate,
+        jobs=args.jobs,
+        incremental=args.incremental,
+        compresslevel=args.compresslevel,
+    )
+    print(message)
+
+    if "Error" in message:
+        sys.exit(1)
@@ -0,0 +1,779 @@
+"""
+Helper for running LibreOffice (soffice) in environments where AF_UNIX
+sockets may be blocked (e.g., sandboxed VMs).  Detects the restriction
+at runtime and applies an LD_PRELOAD shim if needed.
+
+The shim is compiled with gcc on first use. To build it ahead of time, for
+example into a container image, run
+
+    SOFFICE_SHIM_DIR=/opt/soffice-shim python soffice.py --build-shim
+
+and set SOFFICE_SHIM_DIR to the same directory wherever soffice is started.
+
+Usage:
+    from office.soffice import run_soffice, get_soffice_env
+
+    # Option 1 – run soffice directly
+    result = run_soffice(["--headless", "--convert-to", "pdf", "input.docx"])
+
+    # Option 2 – get env dict for your own subprocess calls
+    env = get_soffice_env()
+    subprocess.run(["soffice", ...], env=env)
+
+    # Option 3 – convert many files, one soffice start per chunk of 50
+    results = convert_batch(["a.docx", "b.pptx"], "pdf", outdir="pdfs")
+    failed = [r for r in results if not r.ok]
+
+    # Option 4 – keep warm LibreOffice instances for many jobs (needs the
+    # UNO Python bridge, e.g. the python3-uno package)
+    with SofficePool(size=2) as pool:
+        pool.convert("input.docx", "output.pdf")
+        pool.recalc("model.xlsx")
+        pool.run_macro("doc.docx", "vnd.sun.star.script:...", save=True)
+"""
+
+import atexit
+import contextlib
+import functools
+import hashlib
+import os
+import queue
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+
+def get_soffice_env() -> dict:
+    env = os.environ.copy()
+    env["SAL_USE_VCLPLUGIN"] = "svp"
+
+    if _needs_shim():
+        shim = _ensure_shim()
+        env["LD_PRELOAD"] = str(shim)
+
+    return env
+
+
+def run_soffice(args: list[str], **kwargs) -> subprocess.CompletedProcess:
+    env = get_soffice_env()
+    return subprocess.run(["soffice"] + args, env=env, **kwargs)
+
+
+class ConversionResult(NamedTuple):
+    input: Path
+    output: Path
+    ok: bool
+    error: str | None = None
+
+
+def convert_batch(
+    inputs,
+    output_format: str = "pdf",
+    outdir=None,
+    chunk_size: int = 50,
+    timeout: float = 600,
+    pool=None,
+) -> list[ConversionResult]:
+    """Convert many documents, one soffice session per chunk of inputs.
+
+    inputs is a list of paths, or a mapping of input path to output path.
+    Given a list, each output is named after its input with the suffix of
+    output_format ("pdf", "docx", "pdf:writer_pdf_Export", ...) and goes
+    in outdir, or beside the input when outdir is None.
+
+    Every chunk of up to chunk_size files is converted by one
+    ``soffice --convert-to`` run into a private directory, so LibreOffice
+    starts once per chunk instead of once per file, and two inputs with
+    the same name never overwrite each other. A chunk that runs past
+    timeout seconds is killed. Files a chunk fails to convert are retried
+    one at a time, so each failure reports its own error. With a
+    SofficePool, each file is converted on its warm workers instead.
+
+    Returns one ConversionResult per input, in input order; a failed file
+    does not stop the others.
+    """
+    suffix = "." + output_format.split(":", 1)[0]
+    if isinstance(inputs, dict):
+        jobs = [(Path(src), Path(dst)) for src, dst in inputs.items()]
+    else:
+        jobs = [
+            (
+                Path(src),
+                (Path(outdir) if outdir is not None else Path(src).parent)
+                / (Path(src).stem + suffix),
+            )
+            for src in inputs
+        ]
+
+    results = {}
+    pending = []
+    claimed = {}
+    for index, (src, dst) in enumerate(jobs):
+        owner = claimed.setdefault(dst.absolute(), src)
+        if owner is not src:
+            results[index] = ConversionResult(
+                src, dst, False, f"output already used for {owner}"
+            )
+        elif not src.is_file():
+            results[index] = ConversionResult(src, dst, False, "input not found")
+        elif pool is not None:
+            try:
+                pool.convert(src, dst)
+                results[index] = ConversionResult(src, dst, True)
+            except SofficeError as e:
+                results[index] = ConversionResult(src, dst, False, str(e))
+        else:
+            pending.append(index)
+
+    if pending:
+        with tempfile.TemporaryDirectory(prefix="soffice_batch_") as work_dir:
+            work_path = Path(work_dir)
+            profile_url = (work_path / "profile").as_uri()
+            for number, chunk in enumerate(_batch_chunks(pending, jobs, chunk_size)):
+                chunk_dir = work_path / f"chunk{number}"
+                results.update(
+                    _convert_chunk(
+                        [(index, *jobs[index]) for index in chunk],
+                        output_format,
+                        suffix,
+                        chunk_dir,
+                        profile_url,
+                        timeout,
+                    )
+                )
+
+    return [results[index] for index in range(len(jobs))]
+
+
+def _batch_chunks(indices, jobs, chunk_size):
+    """Split indices into chunks of distinct input stems: soffice names each
+    output after its input, so two equal stems in one run would collide."""
+    chunks = []
+    for index in indices:
+        stem = jobs[index][0].stem
+        for chunk, stems in chunks:
+            if len(chunk) < chunk_size and stem not in stems:
+                chunk.append(index)
+                stems.add(stem)
+                break
+        else:
+            chunks.append(([index], {stem}))
+    return [chunk for chunk, _ in chunks]
+
+
+def _convert_chunk(chunk, output_format, suffix, chunk_dir, profile_url, timeout):
+    """Convert chunk in one soffice run. soffice reports failures on a
+    shared stderr that cannot be told apart per file, so when several
+    files were converted together each one that failed is converted again
+    on its own, and its result carries its own error."""
+    chunk_dir.mkdir()
+    failure = _soffice_convert(
+        [src for _, src, _ in chunk], output_format, chunk_dir, profile_url, timeout
+    )
+
+    results = {}
+    failed = []
+    for index, src, dst in chunk:
+        produced = chunk_dir / (src.stem + suffix)
+        if produced.is_file():
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(produced), str(dst))
+            results[index] = ConversionResult(src, dst, True)
+        elif len(chunk) == 1:
+            results[index] = ConversionResult(
+                src, dst, False, failure or "soffice produced no output"
+            )
+        else:
+            failed.append((index, src, dst))
+
+    for number, job in enumerate(failed):
+        results.update(
+            _convert_chunk(
+                [job],
+                output_format,
+                suffix,
+                chunk_dir / f"retry{number}",
+                profile_url,
+                timeout,
+            )
+        )
+    return results
+
+
+def _soffice_convert(sources, output_format, outdir, profile_url, timeout):
+    """Run ``soffice --convert-to`` on sources; the last line soffice wrote
+    to stderr, or None."""
+    process = subprocess.Popen(
+        [
+            "soffice",
+            "--headless",
+            "--norestore",
+            f"-env:UserInstallation={profile_url}",
+            "--convert-to",
+            output_format,
+            "--outdir",
+            str(outdir),
+        ]
+        + [str(src.absolute()) for src in sources],
+        env=get_soffice_env(),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=True,
+    )
+    try:
+        _, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        with contextlib.suppress(OSError):
+            os.killpg(process.pid, signal.SIGKILL)
+        process.communicate()
+        return f"soffice timed out after {timeout}s"
+    return stderr.strip().splitlines()[-1] if stderr.strip() else None
+
+
+class SofficeError(RuntimeError):
+    pass
+
+
+class SofficeTimeoutError(SofficeError):
+    pass
+
+
+# (document kind, output suffix) -> LibreOffice export filter
+EXPORT_FILTERS = {
+    ("text", ".pdf"): "writer_pdf_Export",
+    ("text", ".docx"): "MS Word 2007 XML",
+    ("text", ".doc"): "MS Word 97",
+    ("text", ".odt"): "writer8",
+    ("text", ".html"): "HTML (StarWriter)",
+    ("text", ".txt"): "Text",
+    ("spreadsheet", ".pdf"): "calc_pdf_Export",
+    ("spreadsheet", ".xlsx"): "Calc MS Excel 2007 XML",
+    ("spreadsheet", ".xls"): "MS Excel 97",
+    ("spreadsheet", ".ods"): "calc8",
+    ("spreadsheet", ".csv"): "Text - txt - csv (StarCalc)",
+    ("presentation", ".pdf"): "impress_pdf_Export",
+    ("presentation", ".pptx"): "Impress MS PowerPoint 2007 XML",
+    ("presentation", ".ppt"): "MS PowerPoint 97",
+    ("presentation", ".odp"): "impress8",
+}
+
+_DOCUMENT_KINDS = {
+    "com.sun.star.text.TextDocument": "text",
+    "com.sun.star.sheet.SpreadsheetDocument": "spreadsheet",
+    "com.sun.star.presentation.PresentationDocument": "presentation",
+}
+
+
+class SofficePool:
+    """Long-lived headless LibreOffice instances that run jobs over UNO.
+
+    Each worker is a soffice process with its own user profile, listening on
+    a loopback socket. Jobs check a worker out, load the document hidden,
+    work on it through the UNO bridge and close it again, so only the first
+    job on a worker pays for LibreOffice's startup.
+
+    A job that runs past its timeout gets its worker killed and a
+    SofficeTimeoutError. A worker that died or stopped answering is
+    restarted before its next job; the health probe and the shutdown
+    request each get health_timeout seconds before the worker is killed,
+    so a wedged soffice never hangs checkout or close(), and every worker is recycled after
+    max_jobs_per_worker jobs to bound LibreOffice's memory growth. The pool
+    is thread-safe: up to size jobs run at once, the rest wait for a worker.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        job_timeout: float = 120,
+        startup_timeout: float = 60,
+        max_jobs_per_worker: int = 200,
+        health_timeout: float = 10,
+    ):
+        self.job_timeout = job_timeout
+        self.startup_timeout = startup_timeout
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self._workers = [_SofficeWorker(health_timeout) for _ in range(max(1, size))]
+        self._idle = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self._closed = True
+        for worker in self._workers:
+            worker.stop()
+
+    def convert(
+        self, input_file, output_file, filter_name: str | None = None, timeout=None
+    ) -> Path:
+        """Save input_file as output_file, in the format of its suffix."""
+        output_path = Path(output_file).absolute()
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        def export(document, context):
+            name = filter_name or _export_filter(document, output_path.suffix)
+            uno = _import_uno()
+            document.storeToURL(
+                uno.systemPathToFileUrl(str(output_path)),
+                _properties(FilterName=name, Overwrite=True),
+            )
+
+        self._run(input_file, export, save=False, timeout=timeout)
+        return output_path
+
+    def recalc(self, input_file, timeout=None) -> None:
+        """Recalculate every formula in a spreadsheet and save it in place."""
+
+        def calculate(document, context):
+            document.calculateAll()
+
+        self._run(input_file, calculate, save=True, timeout=timeout)
+
+    def run_macro(self, input_file, macro, args=(), save=True, timeout=None):
+        """Run a macro on the document; returns what the macro returned.
+
+        macro is either a script URL (vnd.sun.star.script:...), resolved
+        through the document's script provider and invoked with args, or a
+        Python callable called as macro(document, context, *args) over the
+        UNO bridge. With save, the document is stored in place afterwards.
+        """
+        if callable(macro):
+            return self._run(
+                input_file,
+                lambda document, context: macro(document, context, *args),
+                save=save,
+                timeout=timeout,
+            )
+
+        def invoke(document, context):
+            script = document.getScriptProvider().getScript(macro)
+            return script.invoke(tuple(args), (), ())[0]
+
+        return self._run(input_file, invoke, save=save, timeout=timeout)
+
+    def _run(self, input_file, job, save, timeout):
+        input_path = Path(input_file).absolute()
+        if not input_path.exists():
+            raise SofficeError(f"File not found: {input_path}")
+        timeout = self.job_timeout if timeout is None else timeout
+
+        with self._checkout() as worker:
+            timed_out = threading.Event()
+
+            def expire():
+                timed_out.set()
+                worker.kill()
+
+            watchdog = threading.Timer(timeout, expire)
+            watchdog.start()
+            try:
+                return worker.run(input_path, job, save)
+            except Exception as e:
+                if timed_out.is_set():
+                    raise SofficeTimeoutError(
+                        f"LibreOffice job on {input_path} timed out after {timeout}s"
+                    ) from e
+                if isinstance(e, SofficeError):
+                    raise
+                raise SofficeError(f"LibreOffice job on {input_path} failed: {e}") from e
+            finally:
+                watchdog.cancel()
+
+    @contextlib.contextmanager
+    def _checkout(self):
+        if self._closed:
+            raise SofficeError("SofficePool is closed")
+        worker = self._idle.get()
+        try:
+            if worker.jobs >= self.max_jobs_per_worker or not worker.healthy():
+                worker.stop()
+            if not worker.running():
+                worker.start(self.startup_timeout)
+            yield worker
+        finally:
+            if not worker.healthy():
+                worker.stop()
+            self._idle.put(worker)
+
+
+class _SofficeWorker:
+    def __init__(self, health_timeout: float = 10):
+        self.health_timeout = health_timeout
+        self.process = None
+        self.profile_dir = None
+        self.context = None
+        self.desktop = None
+        self.jobs = 0
+
+    def running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def healthy(self) -> bool:
+        """Whether soffice answers a UNO call within health_timeout; a
+        worker that doesn't is killed."""
+        if not self.running() or self.desktop is None:
+            return False
+        if _answers(self.desktop.getComponents, self.health_timeout):
+            return True
+        self.kill()
+        return False
+
+    def start(self, startup_timeout: float) -> None:
+        uno = _import_uno()
+        self.profile_dir = Path(tempfile.mkdtemp(prefix="soffice_worker_"))
+        port = _free_port()
+        connection = f"socket,host=127.0.0.1,port={port};urp;StarOffice.ComponentContext"
+        self.process = subprocess.Popen(
+            [
+                "soffice",
+                "--headless",
+                "--invisible",
+                "--nologo",
+                "--nodefault",
+                "--norestore",
+                "--nolockcheck",
+                f"-env:UserInstallation={self.profile_dir.as_uri()}",
+                f"--accept={connection}",
+            ],
+            env=get_soffice_env(),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.bridge.UnoUrlResolver", local_context
+        )
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if not self.running():
+                self.stop()
+                raise SofficeError("soffice exited during startup")
+            try:
+                self.context = resolver.resolve(f"uno:{connection}")
+                break
+            except Exception:
+                if time.monotonic() > deadline:
+                    self.stop()
+                    raise SofficeError(
+                        f"soffice did not accept connections within {startup_timeout}s"
+                    )
+                time.sleep(0.25)
+
+        self.desktop = self.context.ServiceManager.createInstanceWithContext(
+            "com.sun.star.frame.Desktop", self.context
+        )
+        self.jobs = 0
+
+    def run(self, input_path: Path, job, save: bool):
+        uno = _import_uno()
+        self.jobs += 1
+        document = self.desktop.loadComponentFromURL(
+            uno.systemPathToFileUrl(str(input_path)),
+            "_blank",
+            0,
+            _properties(Hidden=True),
+        )
+        if document is None:
+            raise SofficeError(f"LibreOffice could not open {input_path}")
+        try:
+            result = job(document, self.context)
+            if save:
+                document.store()
+            return result
+        finally:
+            with contextlib.suppress(Exception):
+                document.close(True)
+
+    def kill(self) -> None:
+        if self.running():
+            with contextlib.suppress(OSError):
+                os.killpg(self.process.pid, signal.SIGKILL)
+
+    def stop(self) -> None:
+        if self.running() and self.desktop is not None:
+            if _answers(self.desktop.terminate, self.health_timeout):
+                with contextlib.suppress(subprocess.TimeoutExpired):
+                    self.process.wait(timeout=10)
+        self.kill()
+        if self.process is not None:
+            with contextlib.suppress(subprocess.TimeoutExpired):
+                self.process.wait(timeout=10)
+        if self.profile_dir is not None:
+            shutil.rmtree(self.profile_dir, ignore_errors=True)
+        self.process = self.profile_dir = self.context = self.desktop = None
+
+
+def _answers(call, timeout: float) -> bool:
+    """Whether call() returns within timeout seconds without raising. The
+    call runs on a daemon thread, so one blocked on a wedged soffice is
+    abandoned rather than waited for; killing soffice then ends it."""
+    outcome = []
+
+    def target():
+        try:
+            call()
+        except Exception:
+            outcome.append(False)
+        else:
+            outcome.append(True)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return bool(outcome) and outcome[0]
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_pool(size: int = 2) -> SofficePool:
+    """The process-wide pool, started on first use and closed at exit."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = SofficePool(size=size)
+            atexit.register(_shared_pool.close)
+        return _shared_pool
+
+
+def _import_uno():
+    try:
+        import uno
+    except ImportError as e:
+        raise SofficeError(
+            "SofficePool needs LibreOffice's UNO Python bridge (the 'uno' module)"
+        ) from e
+    return uno
+
+
+def _properties(**values) -> tuple:
+    uno = _import_uno()
+    properties = []
+    for name, value in values.items():
+        prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+        prop.Name = name
+        prop.Value = value
+        properties.append(prop)
+    return tuple(properties)
+
+
+def _export_filter(document, suffix: str) -> str:
+    for service, kind in _DOCUMENT_KINDS.items():
+        if document.supportsService(service):
+            break
+    else:
+        kind = None
+    try:
+        return EXPORT_FILTERS[(kind, suffix.lower())]
+    except KeyError:
+        raise SofficeError(
+            f"No export filter for {kind or 'this'} document to {suffix}; pass filter_name"
+        ) from None
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# Directory for the compiled shim; set it when building the shim into an
+# image ahead of time (see build_shim), so workers never need gcc.
+SHIM_DIR_ENV = "SOFFICE_SHIM_DIR"
+
+
+@functools.lru_cache(maxsize=None)
+def _needs_shim() -> bool:
+    try:
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.close()
+        return False
+    except OSError:
+        return True
+
+
+def shim_path() -> Path:
+    """Where the shim for this version of _SHIM_SOURCE lives.
+
+    The name carries a hash of the source, so an edited shim is rebuilt
+    rather than an older .so being picked up from a previous version.
+    """
+    digest = hashlib.sha1(_SHIM_SOURCE.encode()).hexdigest()[:12]
+    shim_dir = os.environ.get(SHIM_DIR_ENV) or tempfile.gettempdir()
+    return Path(shim_dir) / f"lo_socket_shim-{digest}.so"
+
+
+@functools.lru_cache(maxsize=None)
+def _ensure_shim() -> Path:
+    return build_shim()
+
+
+def build_shim() -> Path:
+    """Compile the shim unless it exists; returns its path.
+
+    Concurrent callers, in this process or others, serialize on a lock file
+    next to the shim, and the compiler writes to a private temporary file
+    that is renamed into place, so nobody ever loads a half-written .so.
+    """
+    import fcntl
+
+    shim = shim_path()
+    if shim.exists():
+        return shim
+
+    shim.parent.mkdir(parents=True, exist_ok=True)
+    with open(shim.with_suffix(".lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if shim.exists():
+            return shim
+
+        with tempfile.TemporaryDirectory(dir=shim.parent) as build_dir:
+            src = Path(build_dir) / "lo_socket_shim.c"
+            out = Path(build_dir) / shim.name
+            src.write_text(_SHIM_SOURCE)
+            subprocess.run(
+                ["gcc", "-shared", "-fPIC", "-o", str(out), str(src), "-ldl"],
+                check=True,
+                capture_output=True,
+            )
+            os.replace(out, shim)
+    return shim
+
+
+_SHIM_SOURCE = r"""
+#define _GNU_SOURCE
+#include <dlfcn.h>
+#include <errno.h>
+#include <signal.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <sys/socket.h>
+#include <unistd.h>
+
+static int (*real_socket)(int, int, int);
+static int (*real_socketpair)(int, int, int, int[2]);
+static int (*real_listen)(int, int);
+static int (*real_accept)(int, struct sockaddr *, socklen_t *);
+static int (*real_close)(int);
+static int (*real_read)(int, void *, size_t);
+
+/* Per-FD bookkeeping (FDs >= 1024 are passed through unshimmed). */
+static int is_shimmed[1024];
+static int peer_of[1024];
+static int wake_r[1024];            /* accept() blocks reading this */
+static int wake_w[1024];            /* close()  writes to this      */
+static int listener_fd = -1;        /* FD that received listen()    */
+
+__attribute__((constructor))
+static void init(void) {
+    real_socket     = dlsym(RTLD_NEXT, "socket");
+    real_socketpair = dlsym(RTLD_NEXT, "socketpair");
+    real_listen     = dlsym(RTLD_NEXT, "listen");
+    real_accept     = dlsym(RTLD_NEXT, "accept");
+    real_close      = dlsym(RTLD_NEXT, "close");
+    real_read       = dlsym(RTLD_NEXT, "read");
+    for (int i = 0; i < 1024; i++) {
+        peer_of[i] = -1;
+        wake_r[i]  = -1;
+        wake_w[i]  = -1;
+    }
+}
+
+/* ---- socket ---------------------------------------------------------- */
+int socket(int domain, int type, int protocol) {
+    if (domain == AF_UNIX) {
+        int fd = real_socket(domain, type, protocol);
+        if (fd >= 0) return fd;
+        /* socket(AF_UNIX) blocked – fall back to socketpair(). */
+        int sv[2];
+        if (real_socketpair(domain, type, protocol, sv) == 0) {
+            if (sv[0] >= 0 && sv[0] < 1024) {
+                is_shimmed[sv[0]] = 1;
+                peer_of[sv[0]]    = sv[1];
+                int wp[2];
+                if (pipe(wp) == 0) {
+                    wake_r[sv[0]] = wp[0];
+                    wake_w[sv[0]] = wp[1];
+                }
+            }
+            return sv[0];
+        }
+        errno = EPERM;
+        return -1;
+    }
+    return real_socket(domain, type, protocol);
+}
+
+/* ---- listen ---------------------------------------------------------- */
+int listen(int sockfd, int backlog) {
+    if (sockfd >= 0 && sockfd < 1024 && is_shimmed[sockfd]) {
+        listener_fd = sockfd;
+        return 0;
+    }
+    return real_listen(sockfd, backlog);
+}
+
+/* ---- accept ---------------------------------------------------------- */
+int accept(int sockfd, struct sockaddr *addr, socklen_t *addrlen) {
+    if (sockfd >= 0 && sockfd < 1024 && is_shimmed[sockfd]) {
+        /* Block until close() writes to the wake pipe. */
+        if (wake_r[sockfd] >= 0) {
+            char buf;
+            real_read(wake_r[sockfd], &buf, 1);
+        }
+        errno = ECONNABORTED;
+        return -1;
+    }
+    return real_accept(sockfd, addr, addrlen);
+}
+
+/* ---- close ----------------------------------------------------------- */
+int close(int fd) {
+    if (fd >= 0 && fd < 1024 && is_shimmed[fd]) {
+        int was_listener = (fd == listener_fd);
+        is_shimmed[fd] = 0;
+
+        if (wake_w[fd] >= 0) {              /* unblock accept() */
+            char c = 0;
+            write(wake_w[fd], &c, 1);
+            real_close(wake_w[fd]);
+            wake_w[fd] = -1;
+        }
+        if (wake_r[fd] >= 0) { real_close(wake_r[fd]); wake_r[fd]  = -1; }
+        if (peer_of[fd] >= 0) { real_close(peer_of[fd]); peer_of[fd] = -1; }
+
+        if (was_listener)
+            _exit(0);                        /* conversion done – exit */
+    }
+    return real_close(fd);
+}
+"""
+
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] == ["--build-shim"]:
+        print(build_shim())
+        sys.exit(0)
+    result = run_soffice(sys.argv[1:])
+    sys.exit(result.returncode)
@@ -0,0 +1,202 @@
+"""Unpack Office files (DOCX, PPTX, XLSX) for editing.
+
+Extracts the ZIP archive, pretty-prints XML files, and optionally:
+- Merges adjacent runs with identical formatting (DOCX only)
+- Simplifies adjacent tracked changes from same author (DOCX only)
+
+The DOCX cleanups apply to the document body, headers, footers, footnotes,
+endnotes and comments; each of those parts is parsed and written once.
+
+With --parts, only the named parts are pretty-printed; every other member
+is extracted byte-for-byte.
+
+The hash of every file written is recorded beside the output directory, so
+pack.py can copy parts that were never edited straight from this file.
+
+Usage:
+    python unpack.py <office_file> <output_dir> [options]
+
+Examples:
+    python unpack.py document.docx unpacked/
+    python unpack.py presentation.pptx unpacked/
+    python unpack.py document.docx unpacked/ --merge-runs false
+    python unpack.py presentation.pptx unpacked/ --parts ppt/slides/slide3.xml
+"""
+
+import argparse
+import fnmatch
+import sys
+import zipfile
+from pathlib import Path, PurePosixPath
+
+import defusedxml.minidom
+
+from .helpers.merge_runs import merge_runs_in_tree
+from .helpers.pipeline import is_story_part, run_pipeline
+from .helpers.simplify_redlines import simplify_redlines_in_tree
+from .helpers.unpack_manifest import content_hash, save_unpack_manifest
+
+SMART_QUOTE_REPLACEMENTS = {
+    "\u201c": "&#x201C;",  
+    "\u201d": "&#x201D;",  
+    "\u2018": "&#x2018;",  
+    "\u2019": "&#x2019;",  
+}
+
+
+def unpack(
+    input_file: str,
+    output_directory: str,
+    merge_runs: bool = True,
+    simplify_redlines: bool = True,
+    parts: list[str] | None = None,
+) -> tuple[None, str]:
+    input_path = Path(input_file)
+    output_path = Path(output_directory)
+    suffix = input_path.suffix.lower()
+
+    if not input_path.exists():
+        return None, f"Error: {input_file} does not exist"
+
+    if suffix not in {".docx", ".pptx", ".xlsx"}:
+        return None, f"Error: {input_file} must be a .docx, .pptx, or .xlsx file"
+
+    try:
+        output_path.mkdir(parents=True, exist_ok=True)
+
+        with zipfile.ZipFile(input_path, "r") as zf:
+            members = [info for info in zf.infolist() if not info.is_dir()]
+            xml_names = [info.filename for info in members if _is_xml_part(info.filename)]
+            formatted = [name for name in xml_names if _selected(name, parts)]
+
+            transforms = []
+            if suffix == ".docx":
+                if simplify_redlines:
+                    transforms.append(simplify_redlines_in_tree)
+                if merge_runs:
+                    transforms.append(merge_runs_in_tree)
+            totals = [0] * len(transforms)
+
+            formatted_set = set(formatted)
+            hashes = {}
+            for info in members:
+                data = zf.read(info)
+                if info.filename in formatted_set:
+                    if transforms and is_story_part(info.filename):
+                        data = _transform_xml(data, transforms, totals)
+                    else:
+                        data = _pretty_print_xml(data)
+                    data = _escape_smart_quotes(data)
+                target = _member_path(output_path, info.filename)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                target.write_bytes(data)
+                hashes[info.filename] = content_hash(data)
+
+        if parts is None:
+            message = f"Unpacked {input_file} ({len(formatted)} XML files)"
+        else:
+            message = (
+                f"Unpacked {input_file} ({len(formatted)} of {len(xml_names)} "
+                "XML files pretty-printed)"
+            )
+
+        for transform, total in zip(transforms, totals):
+            if transform is simplify_redlines_in_tree:
+                message += f", simplified {total} tracked changes"
+            else:
+                message += f", merged {total} runs"
+
+        save_unpack_manifest(output_path, input_path, hashes)
+
+        return None, message
+
+    except zipfile.BadZipFile:
+        return None, f"Error: {input_file} is not a valid Office file"
+    except Exception as e:
+        return None, f"Error unpacking: {e}"
+
+
+def _is_xml_part(name: str) -> bool:
+    return name.endswith((".xml", ".rels"))
+
+
+def _selected(name: str, parts: list[str] | None) -> bool:
+    if parts is None:
+        return True
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in parts)
+
+
+def _member_path(output_path: Path, name: str) -> Path:
+    # Same sanitizing as ZipFile.extract: no absolute paths or "..".
+    parts = [p for p in PurePosixPath(name).parts if p not in ("/", ".", "..")]
+    return output_path.joinpath(*parts)
+
+
+def _transform_xml(data: bytes, transforms, totals: list[int]) -> bytes:
+    try:
+        data, counts = run_pipeline(data, transforms)
+    except Exception:
+        return _pretty_print_xml(data)
+    for i, count in enumerate(counts):
+        totals[i] += count
+    return data
+
+
+def _pretty_print_xml(data: bytes) -> bytes:
+    try:
+        dom = defusedxml.minidom.parseString(data.decode("utf-8"))
+        return dom.toprettyxml(indent="  ", encoding="utf-8")
+    except Exception:
+        return data
+
+
+def _escape_smart_quotes(data: bytes) -> bytes:
+    try:
+        content = data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data
+    for char, entity in SMART_QUOTE_REPLACEMENTS.items():
+        content = content.replace(char, entity)
+    return content.encode("utf-8")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Unpack an Office file (DOCX, PPTX, XLSX) for editing"
+    )
+    parser.add_argument("input_file", help="Office file to unpack")
+    parser.add_argument("output_directory", help="Output directory")
+    parser.add_argument(
+        "--merge-runs",
+        type=lambda x: x.lower() == "true",
+        default=True,
+        metavar="true|false",
+        help="Merge adjacent runs with identical formatting (DOCX only, default: true)",
+    )
+    parser.add_argument(
+        "--simplify-redlines",
+        type=lambda x: x.lower() == "true",
+        default=True,
+        metavar="true|false",
+        help="Merge adjacent tracked changes from same author (DOCX only, default: true)",
+    )
+    parser.add_argument(
+        "--parts",
+        nargs="+",
+        metavar="PART",
+        help="Pretty-print only these parts (names or glob patterns such as "
+        "'ppt/slides/slide3.xml'); other parts are extracted unchanged (default: all)",
+    )
+    args = parser.parse_args()
+
+    _, message = unpack(
+        args.input_file,
+        args.output_directory,
+        merge_runs=args.merge_runs,
+        simplify_redlines=args.simplify_redlines,
+        parts=args.parts,
+    )
+    print(message)
+
+    if "Error" in message:
+        sys.exit(1)
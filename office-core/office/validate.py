@@ -0,0 +1,178 @@
+"""
+Command line tool to validate Office document XML files against XSD schemas and tracked changes.
+
+Usage:
+    python validate.py <path> [--original <original_file>] [--auto-repair] [--author NAME] [--jobs N] [--incremental] [--format text|json]
+
+The first argument can be either:
+- An unpacked directory containing the Office document XML files
+- A packed Office file (.docx/.pptx/.xlsx) which will be unpacked to a temp directory
+
+Auto-repair fixes:
+- paraId/durableId values that exceed OOXML limits
+- Missing xml:space="preserve" on w:t elements with whitespace
+
+With --incremental, per-part results are stored beside the unpacked directory
+(.<name>.validation.json) and reused on the next run for parts whose content
+has not changed.
+
+With --format json, a report is written to stdout. It lists every check with
+its validator, pass/fail, wall time, parts processed and issues (part, line,
+rule, message, severity). The human-readable output moves to stderr.
+"""
+
+import argparse
+import contextlib
+import json
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+from .validators import (
+    DOCXSchemaValidator,
+    PPTXSchemaValidator,
+    RedliningValidator,
+    ValidationReport,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate Office document XML files")
+    parser.add_argument(
+        "path",
+        help="Path to unpacked directory or packed Office file (.docx/.pptx/.xlsx)",
+    )
+    parser.add_argument(
+        "--original",
+        required=False,
+        default=None,
+        help="Path to original file (.docx/.pptx/.xlsx). If omitted, all XSD errors are reported and redlining validation is skipped.",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Enable verbose output",
+    )
+    parser.add_argument(
+        "--auto-repair",
+        action="store_true",
+        help="Automatically repair common issues (hex IDs, whitespace preservation)",
+    )
+    parser.add_argument(
+        "--author",
+        default="Claude",
+        help="Author name for redlining validation (default: Claude)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Validate parts against the XSD schemas in N worker processes (default: 1)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse per-part results from the previous run for unchanged parts "
+        "(unpacked directories only)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["text", "json"],
+        default="text",
+        help="Output format (default: text); json writes a structured report to stdout",
+    )
+    args = parser.parse_args()
+    report = ValidationReport() if args.format == "json" else None
+
+    path = Path(args.path)
+    assert path.exists(), f"Error: {path} does not exist"
+
+    original_file = None
+    if args.original:
+        original_file = Path(args.original)
+        assert original_file.is_file(), f"Error: {original_file} is not a file"
+        assert original_file.suffix.lower() in [".docx", ".pptx", ".xlsx"], (
+            f"Error: {original_file} must be a .docx, .pptx, or .xlsx file"
+        )
+
+    file_extension = (original_file or path).suffix.lower()
+    assert file_extension in [".docx", ".pptx", ".xlsx"], (
+        f"Error: Cannot determine file type from {path}. Use --original or provide a .docx/.pptx/.xlsx file."
+    )
+
+    if path.is_file() and path.suffix.lower() in [".docx", ".pptx", ".xlsx"]:
+        if args.incremental:
+            # A fresh temp directory is never validated again, so its
+            # manifest would only be written and left behind.
+            print(
+                "Warning: --incremental has no effect on a packed file; "
+                "validate the unpacked directory to reuse results.",
+                file=sys.stderr,
+            )
+            args.incremental = False
+        temp_dir = tempfile.mkdtemp()
+        with zipfile.ZipFile(path, "r") as zf:
+            zf.extractall(temp_dir)
+        unpacked_dir = Path(temp_dir)
+    else:
+        assert path.is_dir(), f"Error: {path} is not a directory or Office file"
+        unpacked_dir = path
+
+    match file_extension:
+        case ".docx":
+            validators = [
+                DOCXSchemaValidator(
+                    unpacked_dir,
+                    original_file,
+                    verbose=args.verbose,
+                    jobs=args.jobs,
+                    incremental=args.incremental,
+                    report=report,
+                ),
+            ]
+            if original_file:
+                validators.append(
+                    RedliningValidator(unpacked_dir, original_file, verbose=args.verbose, author=args.author, report=report)  
+                )
+        case ".pptx":
+            validators = [
+                PPTXSchemaValidator(
+                    unpacked_dir,
+                    original_file,
+                    verbose=args.verbose,
+                    jobs=args.jobs,
+                    incremental=args.incremental,
+                    report=report,
+                ),
+            ]
+        case _:
+            print(f"Error: Validation not supported for file type {file_extension}")
+            sys.exit(1)
+
+    output = sys.stdout if report is None else sys.stderr
+    total_repairs = 0
+    with contextlib.redirect_stdout(output):
+        if args.auto_repair:
+            total_repairs = sum(v.repair() for v in validators)
+            if total_repairs:
+                print(f"Auto-repaired {total_repairs} issue(s)")
+
+        success = all(v.validate() for v in validators)
+
+        if success:
+            print("All validations PASSED!")
+
+    if report is not None:
+        data = {"path": str(path), "passed": success, "repairs": total_repairs}
+        data.update({k: v for k, v in report.to_dict().items() if k != "passed"})
+        json.dump(data, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1155 @@
+"""
+Base validator with common validation logic for document files.
+"""
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import lxml.etree
+
+from .cache import PartCache, ValidationManifest, get_original_package, load_schema
+from .relationships import PackageRelationshipGraph
+from .report import Issue, check
+
+
+class BaseSchemaValidator:
+
+    IGNORED_VALIDATION_ERRORS = [
+        "hyphenationZone",
+        "purl.org/dc/terms",
+    ]
+
+    UNIQUE_ID_REQUIREMENTS = {
+        "comment": ("id", "file"),  
+        "commentrangestart": ("id", "file"),  
+        "commentrangeend": ("id", "file"),  
+        "bookmarkstart": ("id", "file"),  
+        "bookmarkend": ("id", "file"),  
+        "sldid": ("id", "file"),  
+        "sldmasterid": ("id", "global"),  
+        "sldlayoutid": ("id", "global"),  
+        "cm": ("authorid", "file"),  
+        "sheet": ("sheetid", "file"),  
+        "definedname": ("id", "file"),  
+        "cxnsp": ("id", "file"),  
+        "sp": ("id", "file"),  
+        "pic": ("id", "file"),  
+        "grpsp": ("id", "file"),  
+    }
+
+    EXCLUDED_ID_CONTAINERS = {
+        "sectionlst",  
+    }
+
+    ELEMENT_RELATIONSHIP_TYPES = {}
+
+    SCHEMA_MAPPINGS = {
+        "word": "ISO-IEC29500-4_2016/wml.xsd",  
+        "ppt": "ISO-IEC29500-4_2016/pml.xsd",  
+        "xl": "ISO-IEC29500-4_2016/sml.xsd",  
+        "[Content_Types].xml": "ecma/fouth-edition/opc-contentTypes.xsd",
+        "app.xml": "ISO-IEC29500-4_2016/shared-documentPropertiesExtended.xsd",
+        "core.xml": "ecma/fouth-edition/opc-coreProperties.xsd",
+        "custom.xml": "ISO-IEC29500-4_2016/shared-documentPropertiesCustom.xsd",
+        ".rels": "ecma/fouth-edition/opc-relationships.xsd",
+        "people.xml": "microsoft/wml-2012.xsd",
+        "commentsIds.xml": "microsoft/wml-cid-2016.xsd",
+        "commentsExtensible.xml": "microsoft/wml-cex-2018.xsd",
+        "commentsExtended.xml": "microsoft/wml-2012.xsd",
+        "chart": "ISO-IEC29500-4_2016/dml-chart.xsd",
+        "theme": "ISO-IEC29500-4_2016/dml-main.xsd",
+        "drawing": "ISO-IEC29500-4_2016/dml-main.xsd",
+    }
+
+    MC_NAMESPACE = "http://schemas.openxmlformats.org/markup-compatibility/2006"
+    XML_NAMESPACE = "http://www.w3.org/XML/1998/namespace"
+
+    PACKAGE_RELATIONSHIPS_NAMESPACE = (
+        "http://schemas.openxmlformats.org/package/2006/relationships"
+    )
+    OFFICE_RELATIONSHIPS_NAMESPACE = (
+        "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    )
+    CONTENT_TYPES_NAMESPACE = (
+        "http://schemas.openxmlformats.org/package/2006/content-types"
+    )
+
+    MAIN_CONTENT_FOLDERS = {"word", "ppt", "xl"}
+
+    OOXML_NAMESPACES = {
+        "http://schemas.openxmlformats.org/officeDocument/2006/math",
+        "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+        "http://schemas.openxmlformats.org/schemaLibrary/2006/main",
+        "http://schemas.openxmlformats.org/drawingml/2006/main",
+        "http://schemas.openxmlformats.org/drawingml/2006/chart",
+        "http://schemas.openxmlformats.org/drawingml/2006/chartDrawing",
+        "http://schemas.openxmlformats.org/drawingml/2006/diagram",
+        "http://schemas.openxmlformats.org/drawingml/2006/picture",
+        "http://schemas.openxmlformats.org/drawingml/2006/spreadsheetDrawing",
+        "http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing",
+        "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+        "http://schemas.openxmlformats.org/presentationml/2006/main",
+        "http://schemas.openxmlformats.org/spreadsheetml/2006/main",
+        "http://schemas.openxmlformats.org/officeDocument/2006/sharedTypes",
+        "http://www.w3.org/XML/1998/namespace",
+    }
+
+    def __init__(
+        self,
+        unpacked_dir,
+        original_file=None,
+        verbose=False,
+        jobs=1,
+        incremental=False,
+        report=None,
+    ):
+        self.unpacked_dir = Path(unpacked_dir).resolve()
+        self.original_file = Path(original_file) if original_file else None
+        self.verbose = verbose
+        self.jobs = jobs
+        self.report = report
+        self._current_check = None
+
+        self.schemas_dir = Path(__file__).parent.parent / "schemas"
+        self.part_cache = PartCache()
+        self._relationship_graph = None
+        self.manifest = (
+            ValidationManifest(self.unpacked_dir, self._manifest_context())
+            if incremental
+            else None
+        )
+
+        patterns = ["*.xml", "*.rels"]
+        self.xml_files = [
+            f for pattern in patterns for f in self.unpacked_dir.rglob(pattern)
+        ]
+
+        if not self.xml_files:
+            print(f"Warning: No XML files found in {self.unpacked_dir}")
+
+    def _parse_xml(self, xml_file):
+        self._touch_part(xml_file)
+        return self.part_cache.parse(xml_file)
+
+    def _touch_part(self, xml_file):
+        if self._current_check is not None:
+            self._current_check.parts.add(self._part_name(xml_file))
+
+    def _issue(self, part, line, message, rule=None, text=None):
+        """Build an Issue; text defaults to "  <part>: Line <n>: <message>"."""
+        if isinstance(part, Path) and part.is_absolute():
+            part = self._part_name(part)
+        elif part is not None:
+            part = Path(part).as_posix()
+
+        if text is None:
+            location = f"Line {line}: " if line is not None else ""
+            text = f"  {part}: {location}{message}"
+        return Issue(text, part=part, line=line, message=message, rule=rule)
+
+    def _record_issue(self, issue):
+        if self._current_check is not None:
+            if not isinstance(issue, Issue):
+                issue = Issue(issue)
+            self._current_check.issues.append(issue)
+
+    def _print_issues(self, issues):
+        for issue in issues:
+            print(issue)
+            self._record_issue(issue)
+
+    def _iter_part_events(self, xml_file, tags=None):
+        """Yield (event, element) start/end pairs for a part in document order.
+
+        Only elements whose Clark-notation tag is in tags are reported (all
+        elements when tags is None). Parts the part cache keeps are walked in
+        memory. Larger parts are streamed with iterparse, and each reported
+        element is cleared and detached once its end event has been handled,
+        so memory stays flat.
+        """
+        self._touch_part(xml_file)
+        if not self.part_cache.is_large(xml_file):
+            root = self._parse_xml(xml_file).getroot()
+            yield from lxml.etree.iterwalk(root, events=("start", "end"), tag=tags)
+            return
+
+        for event, elem in lxml.etree.iterparse(
+            str(xml_file), events=("start", "end"), tag=tags
+        ):
+            yield event, elem
+            if event == "end":
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+
+    @property
+    def relationship_graph(self):
+        if self._relationship_graph is None:
+            self._relationship_graph = PackageRelationshipGraph(
+                self.unpacked_dir, parse=self._parse_xml
+            )
+        return self._relationship_graph
+
+    def _part_name(self, xml_file):
+        return Path(xml_file).relative_to(self.unpacked_dir).as_posix()
+
+    def _manifest_context(self):
+        original = None
+        if self.original_file is not None:
+            stat = self.original_file.stat()
+            original = [str(self.original_file.resolve()), stat.st_size, stat.st_mtime_ns]
+        return {"validator": type(self).__name__, "original": original}
+
+    def _cached_part_result(self, check, xml_file, compute, depends_on=()):
+        self._touch_part(xml_file)
+        if self.manifest is None:
+            return compute(xml_file)
+
+        part_name = self._part_name(xml_file)
+        key = self.manifest.key(xml_file, *depends_on)
+        found, result = self.manifest.lookup(part_name, check, key)
+        if not found:
+            result = compute(xml_file)
+            self.manifest.store(part_name, check, key, result)
+        return result
+
+    def save_manifest(self):
+        if self.manifest is not None:
+            self.manifest.save(self._part_name(f) for f in self.xml_files)
+
+    def validate(self):
+        raise NotImplementedError("Subclasses must implement the validate method")
+
+    def repair(self) -> int:
+        return self._run_repairs(self._repair_steps())
+
+    def repair_whitespace_preservation(self) -> int:
+        return self._run_repairs([self._repair_whitespace_preservation])
+
+    def _repair_steps(self):
+        return [self._repair_whitespace_preservation]
+
+    def _run_repairs(self, steps):
+        """Apply repair steps to each part's tree, writing only parts that changed.
+
+        Each step takes (xml_file, tree), edits the tree in place and returns
+        the number of repairs made. The tree is the part cache's; a changed
+        part is written back and dropped from the cache straight away, so no
+        check ever sees the edited tree.
+        """
+        repairs = 0
+
+        for xml_file in self.xml_files:
+            try:
+                tree = self._parse_xml(xml_file)
+                part_repairs = sum(step(xml_file, tree) for step in steps)
+
+                if part_repairs:
+                    xml_file.write_bytes(self._serialize_repaired(tree))
+                    self.part_cache.invalidate(xml_file)
+                    repairs += part_repairs
+
+            except Exception:
+                self.part_cache.invalidate(xml_file)
+
+        return repairs
+
+    @staticmethod
+    def _serialize_repaired(tree):
+        # Keep the root on the line it was read from (unpack.py puts the
+        # declaration on a line of its own), so line numbers in later error
+        # messages still match the file on disk.
+        declaration = '<?xml version="1.0" encoding="UTF-8"'
+        if tree.docinfo.standalone:
+            declaration += ' standalone="yes"'
+        declaration += "?>"
+        root_line = tree.getroot().sourceline or 1
+        return (declaration + "\n" * (root_line > 1)).encode() + lxml.etree.tostring(
+            tree, encoding="UTF-8", xml_declaration=False
+        )
+
+    def _repair_whitespace_preservation(self, xml_file, tree):
+        repairs = 0
+        xml_space_attr = f"{{{self.XML_NAMESPACE}}}space"
+
+        for elem in tree.xpath("//*[local-name()='t'][not(@xml:space='preserve')]"):
+            text = elem.text
+            if elem.prefix and text and (
+                text.startswith((" ", "\t")) or text.endswith((" ", "\t"))
+            ):
+                elem.set(xml_space_attr, "preserve")
+                text_preview = repr(text[:30]) + "..." if len(text) > 30 else repr(text)
+                print(f"  Repaired: {xml_file.name}: Added xml:space='preserve' to {elem.prefix}:t: {text_preview}")
+                repairs += 1
+
+        return repairs
+
+    @check("xml")
+    def validate_xml(self):
+        errors = []
+
+        for xml_file in self.xml_files:
+            errors.extend(
+                self._cached_part_result("xml", xml_file, self._check_part_xml)
+            )
+
+        if errors:
+            print(f"FAILED - Found {len(errors)} XML violations:")
+            self._print_issues(errors)
+            return False
+        else:
+            if self.verbose:
+                print("PASSED - All XML files are well-formed")
+            return True
+
+    def _check_part_xml(self, xml_file):
+        try:
+            self._parse_xml(xml_file)
+        except lxml.etree.XMLSyntaxError as e:
+            return [self._issue(xml_file, e.lineno, e.msg)]
+        except Exception as e:
+            return [self._issue(xml_file, None, f"Unexpected error: {str(e)}")]
+        return []
+
+    @check("namespaces")
+    def validate_namespaces(self):
+        errors = []
+
+        for xml_file in self.xml_files:
+            errors.extend(
+                self._cached_part_result(
+                    "namespaces", xml_file, self._check_part_namespaces
+                )
+            )
+
+        if errors:
+            print(f"FAILED - {len(errors)} namespace issues:")
+            self._print_issues(errors)
+            return False
+        if self.verbose:
+            print("PASSED - All namespace prefixes properly declared")
+        return True
+
+    def _check_part_namespaces(self, xml_file):
+        errors = []
+
+        try:
+            root = self._parse_xml(xml_file).getroot()
+            declared = set(root.nsmap.keys()) - {None}  
+
+            for attr_val in [
+                v for k, v in root.attrib.items() if k.endswith("Ignorable")
+            ]:
+                undeclared = set(attr_val.split()) - declared
+                errors.extend(
+                    self._issue(
+                        xml_file, None, f"Namespace '{ns}' in Ignorable but not declared"
+                    )
+                    for ns in undeclared
+                )
+        except lxml.etree.XMLSyntaxError:
+            pass
+
+        return errors
+
+    @check("unique_ids")
+    def validate_unique_ids(self):
+        errors = []
+        global_ids = {}  
+
+        for xml_file in self.xml_files:
+            occurrences = self._cached_part_result(
+                "unique_ids", xml_file, self._collect_part_ids
+            )
+            for kind, *details in occurrences:
+                if kind == "error":
+                    errors.append(details[0])
+                    continue
+
+                id_value, line, tag = details
+                if id_value in global_ids:
+                    prev_file, prev_line, prev_tag = global_ids[id_value]
+                    errors.append(
+                        self._issue(
+                            xml_file,
+                            line,
+                            f"Global ID '{id_value}' in <{tag}> "
+                            f"already used in {prev_file} at line {prev_line} in <{prev_tag}>",
+                            rule="duplicate_global_id",
+                        )
+                    )
+                else:
+                    global_ids[id_value] = (
+                        xml_file.relative_to(self.unpacked_dir),
+                        line,
+                        tag,
+                    )
+
+        if errors:
+            print(f"FAILED - Found {len(errors)} ID uniqueness violations:")
+            self._print_issues(errors)
+            return False
+        else:
+            if self.verbose:
+                print("PASSED - All required IDs are unique")
+            return True
+
+    def _collect_part_ids(self, xml_file):
+        """Per-file ID errors plus the part's global-scope IDs, in document order.
+
+        Single walk over the tree: depth counters track whether we are inside
+        mc:AlternateContent or an excluded container, so no ancestor scans.
+        Returns ["error", message] and ["global", id, line, tag] entries so the
+        cross-part uniqueness check can run from cached results alone.
+        """
+        occurrences = []
+
+        try:
+            root = self._parse_xml(xml_file).getroot()
+            file_ids = {}
+            local_names = {}
+            alternate_content = f"{{{self.MC_NAMESPACE}}}AlternateContent"
+            mc_depth = 0
+            excluded_depth = 0
+
+            for event, elem in lxml.etree.iterwalk(root, events=("start", "end")):
+                tag = local_names.get(elem.tag)
+                if tag is None:
+                    tag = local_names[elem.tag] = _local_name(elem.tag)
+
+                if event == "end":
+                    if elem.tag == alternate_content:
+                        mc_depth -= 1
+                    elif tag in self.EXCLUDED_ID_CONTAINERS:
+                        excluded_depth -= 1
+                    continue
+
+                if elem.tag == alternate_content:
+                    mc_depth += 1
+                    continue
+                in_excluded_container = excluded_depth > 0
+                if tag in self.EXCLUDED_ID_CONTAINERS:
+                    excluded_depth += 1
+                if mc_depth or in_excluded_container:
+                    continue
+
+                requirement = self.UNIQUE_ID_REQUIREMENTS.get(tag)
+                if requirement is None:
+                    continue
+                attr_name, scope = requirement
+
+                id_value = None
+                for attr, value in elem.attrib.items():
+                    attr_local = local_names.get(attr)
+                    if attr_local is None:
+                        attr_local = local_names[attr] = _local_name(attr)
+                    if attr_local == attr_name:
+                        id_value = value
+                        break
+
+                if id_value is not None:
+                    if scope == "global":
+                        occurrences.append(["global", id_value, elem.sourceline, tag])
+                    elif scope == "file":
+                        key = (tag, attr_name)
+                        if key not in file_ids:
+                            file_ids[key] = {}
+
+                        if id_value in file_ids[key]:
+                            prev_line = file_ids[key][id_value]
+                            occurrences.append([
+                                "error",
+                                self._issue(
+                                    xml_file,
+                                    elem.sourceline,
+                                    f"Duplicate {attr_name}='{id_value}' in <{tag}> "
+                                    f"(first occurrence at line {prev_line})",
+                                    rule="duplicate_id",
+                                ),
+                            ])
+                        else:
+                            file_ids[key][id_value] = elem.sourceline
+
+        except (lxml.etree.XMLSyntaxError, Exception) as e:
+            occurrences.append(["error", self._issue(xml_file, None, f"Error: {e}")])
+
+        return occurrences
+
+    @check("file_references")
+    def validate_file_references(self):
+        errors = []
+
+        graph = self.relationship_graph
+
+        if not graph.rels_parts:
+            if self.verbose:
+                print("PASSED - No .rels files found")
+            return True
+
+        if self.verbose:
+            target_count = sum(
+                1
+                for part in graph.parts
+                if not part.endswith(".rels")
+                and Path(part).name != "[Content_Types].xml"
+            )
+            print(
+                f"Found {len(graph.rels_parts)} .rels files and {target_count} target files"
+            )
+
+        for rels_part in graph.rels_parts:
+            graph.relationships_in(rels_part)
+            if rels_part in graph.load_errors:
+                error = graph.load_errors[rels_part]
+                errors.append(
+                    self._issue(
+                        rels_part,
+                        None,
+                        f"Error parsing: {error}",
+                        text=f"  Error parsing {rels_part}: {error}",
+                    )
+                )
+                continue
+
+            for rel in graph.broken_relationships(rels_part):
+                errors.append(
+                    self._issue(
+                        rels_part,
+                        rel.line,
+                        f"Broken reference to {rel.target}",
+                        rule="broken_reference",
+                    )
+                )
+
+        for part in graph.unreferenced_parts():
+            errors.append(
+                self._issue(
+                    part,
+                    None,
+                    "Unreferenced file",
+                    rule="unreferenced_file",
+                    text=f"  Unreferenced file: {part}",
+                )
+            )
+
+        if errors:
+            print(f"FAILED - Found {len(errors)} relationship validation errors:")
+            self._print_issues(errors)
+            print(
+                "CRITICAL: These errors will cause the document to appear corrupt. "
+                + "Broken references MUST be fixed, "
+                + "and unreferenced files MUST be referenced or removed."
+            )
+            return False
+        else:
+            if self.verbose:
+                print(
+                    "PASSED - All references are valid and all files are properly referenced"
+                )
+            return True
+
+    @check("relationship_ids")
+    def validate_all_relationship_ids(self):
+        errors = []
+
+        for xml_file in self.xml_files:
+            if xml_file.suffix == ".rels":
+                continue
+
+            rels_dir = xml_file.parent / "_rels"
+            rels_file = rels_dir / f"{xml_file.name}.rels"
+
+            if not rels_file.exists():
+                continue
+
+            errors.extend(
+                self._cached_part_result(
+                    "relationship_ids",
+                    xml_file,
+                    self._check_part_relationship_ids,
+                    depends_on=[rels_file],
+                )
+            )
+
+        if errors:
+            print(f"FAILED - Found {len(errors)} relationship ID reference errors:")
+            self._print_issues(errors)
+            print("\nThese ID mismatches will cause the document to appear corrupt!")
+            return False
+        else:
+            if self.verbose:
+                print("PASSED - All relationship ID references are valid")
+            return True
+
+    def _check_part_relationship_ids(self, xml_file):
+        rels_file = xml_file.parent / "_rels" / f"{xml_file.name}.rels"
+        errors = []
+
+        try:
+            rels_part = self._part_name(rels_file)
+            relationships = self.relationship_graph.relationships_in(rels_part)
+            if rels_part in self.relationship_graph.load_errors:
+                raise self.relationship_graph.load_errors[rels_part]
+            rid_to_type = {}
+
+            for rel in relationships:
+                if rel.id:
+                    if rel.id in rid_to_type:
+                        errors.append(
+                            self._issue(
+                                rels_part,
+                                rel.line,
+                                f"Duplicate relationship ID '{rel.id}' (IDs must be unique)",
+                                rule="duplicate_relationship_id",
+                            )
+                        )
+                    type_name = (
+                        rel.type.split("/")[-1] if "/" in rel.type else rel.type
+                    )
+                    rid_to_type[rel.id] = type_name
+
+            xml_root = self._parse_xml(xml_file).getroot()
+
+            r_ns = self.OFFICE_RELATIONSHIPS_NAMESPACE
+            rid_attrs_to_check = ["id", "embed", "link"]
+            for elem in xml_root.iter():
+                for attr_name in rid_attrs_to_check:
+                    rid_attr = elem.get(f"{{{r_ns}}}{attr_name}")
+                    if not rid_attr:
+                        continue
+                    elem_name = (
+                        elem.tag.split("}")[-1] if "}" in elem.tag else elem.tag
+                    )
+
+                    if rid_attr not in rid_to_type:
+                        errors.append(
+                            self._issue(
+                                xml_file,
+                                elem.sourceline,
+                                f"<{elem_name}> r:{attr_name} references non-existent relationship '{rid_attr}' "
+                                f"(valid IDs: {', '.join(sorted(rid_to_type.keys())[:5])}{'...' if len(rid_to_type) > 5 else ''})",
+                                rule="missing_relationship",
+                            )
+                        )
+                    elif attr_name == "id" and self.ELEMENT_RELATIONSHIP_TYPES:
+                        expected_type = self._get_expected_relationship_type(
+                            elem_name
+                        )
+                        if expected_type:
+                            actual_type = rid_to_type[rid_attr]
+                            if expected_type not in actual_type.lower():
+                                errors.append(
+                                    self._issue(
+                                        xml_file,
+                                        elem.sourceline,
+                                        f"<{elem_name}> references '{rid_attr}' which points to '{actual_type}' "
+                                        f"but should point to a '{expected_type}' relationship",
+                                        rule="relationship_type_mismatch",
+                                    )
+                                )
+
+        except Exception as e:
+            xml_rel_path = xml_file.relative_to(self.unpacked_dir)
+            errors.append(
+                self._issue(
+                    xml_file,
+                    None,
+                    f"Error processing: {e}",
+                    text=f"  Error processing {xml_rel_path}: {e}",
+                )
+            )
+
+        return errors
+
+    def _get_expected_relationship_type(self, element_name):
+        elem_lower = element_name.lower()
+
+        if elem_lower in self.ELEMENT_RELATIONSHIP_TYPES:
+            return self.ELEMENT_RELATIONSHIP_TYPES[elem_lower]
+
+        if elem_lower.endswith("id") and len(elem_lower) > 2:
+            prefix = elem_lower[:-2]  
+            if prefix.endswith("master"):
+                return prefix.lower()
+            elif prefix.endswith("layout"):
+                return prefix.lower()
+            else:
+                if prefix == "sld":
+                    return "slide"
+                return prefix.lower()
+
+        if elem_lower.endswith("reference") and len(elem_lower) > 9:
+            prefix = elem_lower[:-9]  
+            return prefix.lower()
+
+        return None
+
+    @check("content_types")
+    def validate_content_types(self):
+        errors = []
+
+        content_types_file = self.unpacked_dir / "[Content_Types].xml"
+        if not content_types_file.exists():
+            print("FAILED - [Content_Types].xml file not found")
+            self._record_issue(
+                self._issue("[Content_Types].xml", None, "File not found")
+            )
+            return False
+
+        try:
+            root = self._parse_xml(content_types_file).getroot()
+            declared_parts = set()
+            declared_extensions = set()
+
+            for override in root.findall(
+                f".//{{{self.CONTENT_TYPES_NAMESPACE}}}Override"
+            ):
+                part_name = override.get("PartName")
+                if part_name is not None:
+                    declared_parts.add(part_name.lstrip("/"))
+
+            for default in root.findall(
+                f".//{{{self.CONTENT_TYPES_NAMESPACE}}}Default"
+            ):
+                extension = default.get("Extension")
+                if extension is not None:
+                    declared_extensions.add(extension.lower())
+
+            declarable_roots = {
+                "sld",
+                "sldLayout",
+                "sldMaster",
+                "presentation",  
+                "document",  
+                "workbook",
+                "worksheet",  
+                "theme",  
+            }
+
+            media_extensions = {
+                "png": "image/png",
+                "jpg": "image/jpeg",
+                "jpeg": "image/jpeg",
+                "gif": "image/gif",
+                "bmp": "image/bmp",
+                "tiff": "image/tiff",
+                "wmf": "image/x-wmf",
+                "emf": "image/x-emf",
+            }
+
+            all_files = list(self.unpacked_dir.rglob("*"))
+            all_files = [f for f in all_files if f.is_file()]
+
+            for xml_file in self.xml_files:
+                path_str = str(xml_file.relative_to(self.unpacked_dir)).replace(
+                    "\\", "/"
+                )
+
+                if any(
+                    skip in path_str
+                    for skip in [".rels", "[Content_Types]", "docProps/", "_rels/"]
+                ):
+                    continue
+
+                root_name = self._cached_part_result(
+                    "root_name", xml_file, self._get_root_name
+                )
+                if root_name is None:
+                    continue  
+
+                if root_name in declarable_roots and path_str not in declared_parts:
+                    errors.append(
+                        self._issue(
+                            path_str,
+                            None,
+                            f"File with <{root_name}> root not declared in [Content_Types].xml",
+                            rule="undeclared_part",
+                        )
+                    )
+
+            for file_path in all_files:
+                if file_path.suffix.lower() in {".xml", ".rels"}:
+                    continue
+                if file_path.name == "[Content_Types].xml":
+                    continue
+                if "_rels" in file_path.parts or "docProps" in file_path.parts:
+                    continue
+
+                extension = file_path.suffix.lstrip(".").lower()
+                if extension and extension not in declared_extensions:
+                    if extension in media_extensions:
+                        relative_path = file_path.relative_to(self.unpacked_dir)
+                        errors.append(
+                            self._issue(
+                                relative_path,
+                                None,
+                                f'File with extension \'{extension}\' not declared in [Content_Types].xml - should add: <Default Extension="{extension}" ContentType="{media_extensions[extension]}"/>',
+                                rule="undeclared_extension",
+                            )
+                        )
+
+        except Exception as e:
+            errors.append(
+                self._issue(
+                    "[Content_Types].xml",
+                    None,
+                    f"Error parsing: {e}",
+                    text=f"  Error parsing [Content_Types].xml: {e}",
+                )
+            )
+
+        if errors:
+            print(f"FAILED - Found {len(errors)} content type declaration errors:")
+            self._print_issues(errors)
+            return False
+        else:
+            if self.verbose:
+                print(
+                    "PASSED - All content files are properly declared in [Content_Types].xml"
+                )
+            return True
+
+    def _get_root_name(self, xml_file):
+        try:
+            root_tag = self._parse_xml(xml_file).getroot().tag
+        except Exception:
+            return None
+        return root_tag.split("}")[-1] if "}" in root_tag else root_tag
+
+    def validate_file_against_xsd(self, xml_file, verbose=False):
+        xml_file = Path(xml_file).resolve()
+        unpacked_dir = self.unpacked_dir.resolve()
+
+        is_valid, current_errors = self._validate_single_file_xsd(
+            xml_file, unpacked_dir
+        )
+
+        if is_valid is None:
+            return None, set()  
+        elif is_valid:
+            return True, set()  
+
+        original_errors = self._get_original_file_errors(xml_file)
+
+        assert current_errors is not None
+        # Errors are (line, message); the original file is compared on the
+        # message alone, since edits move the lines.
+        new_errors = {
+            (line, message)
+            for line, message in current_errors
+            if message not in original_errors
+            and not any(
+                pattern in message for pattern in self.IGNORED_VALIDATION_ERRORS
+            )
+        }
+
+        if new_errors:
+            if verbose:
+                relative_path = xml_file.relative_to(unpacked_dir)
+                print(f"FAILED - {relative_path}: {len(new_errors)} new error(s)")
+                for error in _sorted_errors(new_errors)[:3]:
+                    print(f"  - {_format_error(error)}")
+            return False, new_errors
+        else:
+            if verbose:
+                print(
+                    f"PASSED - No new errors (original had {len(current_errors)} errors)"
+                )
+            return True, set()
+
+    @check("xsd")
+    def validate_against_xsd(self):
+        new_errors = []
+        file_issues = []
+        original_error_count = 0
+        valid_count = 0
+        skipped_count = 0
+
+        results = self._cached_xsd_results()
+
+        for xml_file, (is_valid, new_file_errors) in zip(self.xml_files, results):
+            relative_path = str(xml_file.relative_to(self.unpacked_dir))
+
+            if is_valid is None:
+                skipped_count += 1
+                continue
+            self._touch_part(xml_file)
+            if is_valid and not new_file_errors:
+                valid_count += 1
+                continue
+            elif is_valid:
+                original_error_count += 1
+                valid_count += 1
+                continue
+
+            new_file_errors = _sorted_errors(new_file_errors)
+            new_errors.append(f"  {relative_path}: {len(new_file_errors)} new error(s)")
+            for error in new_file_errors[:3]:
+                new_errors.append(f"    - {_format_error(error)}")
+            file_issues.extend(
+                self._issue(xml_file, line, message) for line, message in new_file_errors
+            )
+
+        if self.verbose:
+            print(f"Validated {len(self.xml_files)} files:")
+            print(f"  - Valid: {valid_count}")
+            print(f"  - Skipped (no schema): {skipped_count}")
+            if original_error_count:
+                print(f"  - With original errors (ignored): {original_error_count}")
+            print(
+                f"  - With NEW errors: {len(new_errors) > 0 and len([e for e in new_errors if not e.startswith('    ')]) or 0}"
+            )
+
+        if new_errors:
+            print("\nFAILED - Found NEW validation errors:")
+            for error in new_errors:
+                print(error)
+            for issue in file_issues:
+                self._record_issue(issue)
+            return False
+        else:
+            if self.verbose:
+                print("\nPASSED - No new XSD validation errors introduced")
+            return True
+
+    def _cached_xsd_results(self):
+        if self.manifest is None:
+            return self._validate_files_against_xsd(self.xml_files)
+
+        results = {}
+        stale = []
+        for xml_file in self.xml_files:
+            key = self.manifest.key(xml_file)
+            found, result = self.manifest.lookup(self._part_name(xml_file), "xsd", key)
+            if found:
+                is_valid, errors = result
+                results[xml_file] = [is_valid, [tuple(error) for error in errors]]
+            else:
+                stale.append((xml_file, key))
+
+        computed = self._validate_files_against_xsd([f for f, _ in stale])
+        for (xml_file, key), (is_valid, new_file_errors) in zip(stale, computed):
+            result = [is_valid, _sorted_errors(new_file_errors)]
+            self.manifest.store(self._part_name(xml_file), "xsd", key, result)
+            results[xml_file] = result
+
+        return [results[xml_file] for xml_file in self.xml_files]
+
+    def _validate_files_against_xsd(self, xml_files):
+        if self.jobs <= 1 or len(xml_files) < 2:
+            return [
+                self.validate_file_against_xsd(xml_file, verbose=False)
+                for xml_file in xml_files
+            ]
+
+        chunksize = max(1, len(xml_files) // (self.jobs * 4))
+        with ProcessPoolExecutor(
+            max_workers=self.jobs,
+            initializer=_init_xsd_worker,
+            initargs=(type(self), self.unpacked_dir, self.original_file),
+        ) as executor:
+            return list(
+                executor.map(_validate_file_in_worker, xml_files, chunksize=chunksize)
+            )
+
+    def _get_schema_path(self, xml_file):
+        if xml_file.name in self.SCHEMA_MAPPINGS:
+            return self.schemas_dir / self.SCHEMA_MAPPINGS[xml_file.name]
+
+        if xml_file.suffix == ".rels":
+            return self.schemas_dir / self.SCHEMA_MAPPINGS[".rels"]
+
+        if "charts/" in str(xml_file) and xml_file.name.startswith("chart"):
+            return self.schemas_dir / self.SCHEMA_MAPPINGS["chart"]
+
+        if "theme/" in str(xml_file) and xml_file.name.startswith("theme"):
+            return self.schemas_dir / self.SCHEMA_MAPPINGS["theme"]
+
+        if xml_file.parent.name in self.MAIN_CONTENT_FOLDERS:
+            return self.schemas_dir / self.SCHEMA_MAPPINGS[xml_file.parent.name]
+
+        return None
+
+    def _clean_ignorable_namespaces(self, xml_doc):
+        xml_string = lxml.etree.tostring(xml_doc, encoding="unicode")
+        xml_copy = lxml.etree.fromstring(xml_string)
+
+        for elem in xml_copy.iter():
+            attrs_to_remove = []
+
+            for attr in elem.attrib:
+                if "{" in attr:
+                    ns = attr.split("}")[0][1:]
+                    if ns not in self.OOXML_NAMESPACES:
+                        attrs_to_remove.append(attr)
+
+            for attr in attrs_to_remove:
+                del elem.attrib[attr]
+
+        self._remove_ignorable_elements(xml_copy)
+
+        return lxml.etree.ElementTree(xml_copy)
+
+    def _remove_ignorable_elements(self, root):
+        elements_to_remove = []
+
+        for elem in list(root):
+            if not hasattr(elem, "tag") or callable(elem.tag):
+                continue
+
+            tag_str = str(elem.tag)
+            if tag_str.startswith("{"):
+                ns = tag_str.split("}")[0][1:]
+                if ns not in self.OOXML_NAMESPACES:
+                    elements_to_remove.append(elem)
+                    continue
+
+            self._remove_ignorable_elements(elem)
+
+        for elem in elements_to_remove:
+            root.remove(elem)
+
+    def _preprocess_for_mc_ignorable(self, xml_doc):
+        root = xml_doc.getroot()
+
+        if f"{{{self.MC_NAMESPACE}}}Ignorable" in root.attrib:
+            del root.attrib[f"{{{self.MC_NAMESPACE}}}Ignorable"]
+
+        return xml_doc
+
+    def _validate_single_file_xsd(self, xml_file, base_path):
+        schema_path = self._get_schema_path(xml_file)
+        if not schema_path:
+            return None, None  
+
+        try:
+            xml_doc = self._parse_xml(xml_file)
+        except Exception as e:
+            return False, {(getattr(e, "lineno", None), str(e))}
+
+        return self._validate_doc_xsd(
+            xml_doc, schema_path, xml_file.relative_to(base_path)
+        )
+
+    def _validate_doc_xsd(self, xml_doc, schema_path, relative_path):
+        """(valid, {(line, message)}) for a parsed part against its schema."""
+        try:
+            schema = load_schema(schema_path)
+            # The cleaned copies below are reparsed without the XML
+            # declaration, so their lines are off by the root's own line.
+            line_offset = (xml_doc.getroot().sourceline or 1) - 1
+
+            xml_doc, _ = self._remove_template_tags_from_text_nodes(xml_doc)
+            xml_doc = self._preprocess_for_mc_ignorable(xml_doc)
+
+            if (
+                relative_path.parts
+                and relative_path.parts[0] in self.MAIN_CONTENT_FOLDERS
+            ):
+                xml_doc = self._clean_ignorable_namespaces(xml_doc)
+
+            if schema.validate(xml_doc):
+                return True, set()
+            else:
+                errors = set()
+                for error in schema.error_log:
+                    line = error.line + line_offset if error.line else None
+                    errors.add((line, error.message))
+                return False, errors
+
+        except Exception as e:
+            return False, {(None, str(e))}
+
+    @property
+    def original_package(self):
+        if self.original_file is None:
+            return None
+        return get_original_package(self.original_file)
+
+    def _get_original_file_errors(self, xml_file):
+        if self.original_file is None:
+            return set()
+
+        xml_file = Path(xml_file).resolve()
+        relative_path = xml_file.relative_to(self.unpacked_dir)
+        part_name = relative_path.as_posix()
+
+        original = self.original_package
+        if part_name not in original.xsd_errors:
+            errors = set()
+            if original.has_part(part_name):
+                try:
+                    xml_doc = original.parse(part_name)
+                except Exception as e:
+                    errors = {str(e)}
+                else:
+                    _, errors = self._validate_doc_xsd(
+                        xml_doc, self._get_schema_path(xml_file), relative_path
+                    )
+                    errors = {message for _, message in errors or ()}
+            original.xsd_errors[part_name] = errors or set()
+
+        return original.xsd_errors[part_name]
+
+    def _remove_template_tags_from_text_nodes(self, xml_doc):
+        warnings = []
+        template_pattern = re.compile(r"\{\{[^}]*\}\}")
+
+        xml_string = lxml.etree.tostring(xml_doc, encoding="unicode")
+        xml_copy = lxml.etree.fromstring(xml_string)
+
+        def process_text_content(text, content_type):
+            if not text:
+                return text
+            matches = list(template_pattern.finditer(text))
+            if matches:
+                for match in matches:
+                    warnings.append(
+                        f"Found template tag in {content_type}: {match.group()}"
+                    )
+                return template_pattern.sub("", text)
+            return text
+
+        for elem in xml_copy.iter():
+            if not hasattr(elem, "tag") or callable(elem.tag):
+                continue
+            tag_str = str(elem.tag)
+            if tag_str.endswith("}t") or tag_str == "t":
+                continue
+
+            elem.text = process_text_content(elem.text, "text content")
+            elem.tail = process_text_content(elem.tail, "tail content")
+
+        return lxml.etree.ElementTree(xml_copy), warnings
+
+
+def _sorted_errors(errors):
+    return sorted(errors, key=lambda error: (error[0] or 0, error[1]))
+
+
+def _format_error(error):
+    line, message = error
+    if len(message) > 250:
+        message = message[:250] + "..."
+    return f"Line {line}: {message}" if line is not None else message
+
+
+_worker_validator = None
+
+
+def _init_xsd_worker(validator_class, unpacked_dir, original_file):
+    global _worker_validator
+    _worker_validator = validator_class(unpacked_dir, original_file)
+
+
+def _validate_file_in_worker(xml_file):
+    return _worker_validator.validate_file_against_xsd(xml_file, verbose=False)
+
+
+def _local_name(name):
+    return name.split("}")[-1].lower() if "}" in name else name.lower()
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
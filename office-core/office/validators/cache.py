@@ -0,0 +1,238 @@
+"""
+Caches shared by the schema validators.
+"""
+
+import hashlib
+import json
+import os
+import zipfile
+from pathlib import Path
+
+import lxml.etree
+
+from .report import Issue
+
+_SCHEMAS = {}
+_ORIGINAL_PACKAGES = {}
+
+_PARSER = lxml.etree.XMLParser(huge_tree=True)
+
+
+def load_schema(schema_path):
+    """Compile an XSD once per process and return the cached XMLSchema on later calls."""
+    key = str(schema_path)
+    schema = _SCHEMAS.get(key)
+    if schema is None:
+        with open(key, "rb") as xsd_file:
+            parser = lxml.etree.XMLParser()
+            xsd_doc = lxml.etree.parse(xsd_file, parser=parser, base_url=key)
+        schema = lxml.etree.XMLSchema(xsd_doc)
+        _SCHEMAS[key] = schema
+    return schema
+
+
+def preload_schemas(schema_paths):
+    for schema_path in schema_paths:
+        load_schema(schema_path)
+
+
+def get_original_package(original_file):
+    """Return the shared OriginalPackage for original_file, reopening it if the file changed."""
+    path = Path(original_file).resolve()
+    stat = path.stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    package = _ORIGINAL_PACKAGES.get(path)
+    if package is None or package.signature != signature:
+        if package is not None:
+            package.close()
+        package = OriginalPackage(path, signature)
+        _ORIGINAL_PACKAGES[path] = package
+    return package
+
+
+class PartCache:
+    """Parsed XML parts keyed by path, re-parsed only when the file changes on disk.
+
+    Trees handed out by the cache are shared between checks and must not be
+    modified in place; copy them first if a check needs to rewrite the tree.
+    The repair steps are the exception: they edit the cached tree, write the
+    part back and invalidate it before anything else reads it.
+    Parts larger than MAX_CACHED_BYTES are re-parsed on every call instead of
+    being kept, so a very large document.xml is not held for the whole run.
+    """
+
+    MAX_CACHED_BYTES = 32 * 1024 * 1024
+
+    def __init__(self):
+        self._entries = {}
+        self._results = {}
+
+    def is_large(self, xml_file):
+        return Path(xml_file).stat().st_size > self.MAX_CACHED_BYTES
+
+    def parse(self, xml_file):
+        path = str(xml_file)
+        stat = Path(path).stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        if stat.st_size > self.MAX_CACHED_BYTES:
+            self._entries.pop(path, None)
+            return lxml.etree.parse(path)
+
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != signature:
+            try:
+                entry = (signature, lxml.etree.parse(path), None)
+            except lxml.etree.XMLSyntaxError as e:
+                entry = (signature, None, e)
+            self._entries[path] = entry
+
+        _, tree, error = entry
+        if error is not None:
+            raise error
+        return tree
+
+    def result(self, xml_file, name, compute):
+        """Return compute(xml_file), memoized until the part changes on disk."""
+        path = str(xml_file)
+        stat = Path(path).stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        key = (path, name)
+        entry = self._results.get(key)
+        if entry is None or entry[0] != signature:
+            entry = (signature, compute(xml_file))
+            self._results[key] = entry
+        return entry[1]
+
+    def invalidate(self, xml_file=None):
+        if xml_file is None:
+            self._entries.clear()
+            self._results.clear()
+        else:
+            self._entries.pop(str(xml_file), None)
+            for key in [key for key in self._results if key[0] == str(xml_file)]:
+                del self._results[key]
+
+
+class OriginalPackage:
+    """Read-only access to the members of the original Office file.
+
+    The ZIP is opened on first use and members are streamed straight into the
+    parser, so nothing is extracted to disk. Baseline XSD errors of original
+    parts are kept in xsd_errors (part name -> set of messages) so each part is
+    validated at most once per process.
+    """
+
+    def __init__(self, path, signature=None):
+        self.path = Path(path)
+        self.signature = signature
+        self.xsd_errors = {}
+        self._zip = None
+
+    def _archive(self):
+        if self._zip is None:
+            self._zip = zipfile.ZipFile(self.path, "r")
+        return self._zip
+
+    def has_part(self, part_name):
+        return part_name in self._archive().NameToInfo
+
+    def open(self, part_name):
+        return self._archive().open(part_name)
+
+    def parse(self, part_name):
+        with self.open(part_name) as f:
+            return lxml.etree.parse(f, _PARSER)
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+
+class ValidationManifest:
+    """Per-part check results from earlier runs, keyed by content hash.
+
+    Stored as JSON beside the unpacked directory (".<name>.validation.json") so
+    it never ends up inside the packed file. Each part maps check names to a
+    [key, result] pair, where key hashes the part and any files the check also
+    read; a result is reused only while that key still matches. The whole
+    manifest is discarded when the context (validator class, original file)
+    or VERSION changes.
+    """
+
+    VERSION = 4
+
+    def __init__(self, unpacked_dir, context):
+        unpacked_dir = Path(unpacked_dir)
+        self.path = unpacked_dir.parent / f".{unpacked_dir.name}.validation.json"
+        self.context = context
+        self._parts = {}
+        self._hashes = {}
+
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") == self.VERSION and data.get("context") == context:
+            self._parts = data.get("parts", {})
+
+    def file_hash(self, path):
+        path = str(path)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        cached = self._hashes.get(path)
+        if cached is None or cached[0] != signature:
+            with open(path, "rb") as f:
+                cached = (signature, hashlib.sha1(f.read()).hexdigest())
+            self._hashes[path] = cached
+        return cached[1]
+
+    def key(self, *paths):
+        return ":".join(
+            self.file_hash(path) if Path(path).exists() else "-" for path in paths
+        )
+
+    def lookup(self, part_name, check, key):
+        entry = self._parts.get(part_name, {}).get(check)
+        if entry is not None and entry[0] == key:
+            return True, _decode_result(entry[1])
+        return False, None
+
+    def store(self, part_name, check, key, result):
+        self._parts.setdefault(part_name, {})[check] = [key, _encode_result(result)]
+
+    def save(self, part_names):
+        data = {
+            "version": self.VERSION,
+            "context": self.context,
+            "parts": {
+                name: self._parts[name] for name in part_names if name in self._parts
+            },
+        }
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(data), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+
+
+def _encode_result(value):
+    if isinstance(value, Issue):
+        return {"issue": value.to_dict()}
+    if isinstance(value, (list, tuple)):
+        return [_encode_result(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _encode_result(item) for key, item in value.items()}
+    return value
+
+
+def _decode_result(value):
+    if isinstance(value, list):
+        return [_decode_result(item) for item in value]
+    if isinstance(value, dict):
+        if value.keys() == {"issue"}:
+            return Issue.from_dict(value["issue"])
+        return {key: _decode_result(item) for key, item in value.items()}
+    return value
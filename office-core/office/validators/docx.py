@@ -0,0 +1,527 @@
+"""
+Validator for Word document XML files against XSD schemas.
+"""
+
+import random
+import re
+
+import lxml.etree
+
+from .base import BaseSchemaValidator
+from .report import check
+
+_EDGE_WHITESPACE = re.compile(r"^[ \t\n\r]|[ \t\n\r]$")
+
+
+class DOCXSchemaValidator(BaseSchemaValidator):
+
+    WORD_2006_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    W14_NAMESPACE = "http://schemas.microsoft.com/office/word/2010/wordml"
+    W16CID_NAMESPACE = "http://schemas.microsoft.com/office/word/2016/wordml/cid"
+
+    ELEMENT_RELATIONSHIP_TYPES = {}
+
+    def validate(self):
+        if not self.validate_xml():
+            return False
+
+        all_valid = True
+        if not self.validate_namespaces():
+            all_valid = False
+
+        if not self.validate_unique_ids():
+            all_valid = False
+
+        if not self.validate_file_references():
+            all_valid = False
+
+        if not self.validate_content_types():
+            all_valid = False
+
+        if not self.validate_against_xsd():
+            all_valid = False
+
+        if not self.validate_whitespace_preservation():
+            all_valid = False
+
+        if not self.validate_deletions():
+            all_valid = False
+
+        if not self.validate_insertions():
+            all_valid = False
+
+        if not self.validate_all_relationship_ids():
+            all_valid = False
+
+        if not self.validate_id_constraints():
+            all_valid = False
+
+        if not self.validate_comment_markers():
+            all_valid = False
+
+        self.compare_paragraph_counts()
+
+        self.save_manifest()
+
+        return all_valid
+
+    @check("whitespace")
+    def validate_whitespace_preservation(self):
+        errors = []
+
+        for xml_file in self.xml_files:
+            if xml_file.name != "document.xml":
+                continue
+
+            errors.extend(self._scan_document_body(xml_file)["whitespace"])
+
+        if errors:
+            print(f"FAILED - Found {len(errors)} whitespace preservation violations:")
+            self._print_issues(errors)
+            return False
+        else:
+            if self.verbose:
+                print("PASSED - All whitespace is properly preserved")
+            return True
+
+    @check("deletions")
+    def validate_deletions(self):
+        errors = []
+
+        for xml_file in self.xml_files:
+            if xml_file.name != "document.xml":
+                continue
+
+            errors.extend(self._scan_document_body(xml_file)["deletions"])
+
+        if errors:
+            print(f"FAILED - Found {len(errors)} deletion validation violations:")
+            self._print_issues(errors)
+            return False
+        else:
+            if self.verbose:
+                print("PASSED - No w:t elements found within w:del elements")
+            return True
+
+    def count_paragraphs_in_unpacked(self):
+        count = 0
+
+        for xml_file in self.xml_files:
+            if xml_file.name != "document.xml":
+                continue
+
+            try:
+                count = self._scan_document_body(xml_file)["paragraph_count"]
+            except Exception as e:
+                print(f"Error counting paragraphs in unpacked document: {e}")
+
+        return count
+
+    def count_paragraphs_in_original(self):
+        original = self.original_file
+        if original is None:
+            return 0
+
+        count = 0
+
+        try:
+            paragraphs = 0
+            with self.original_package.open("word/document.xml") as f:
+                for _, elem in lxml.etree.iterparse(
+                    f, events=("end",), tag=f"{{{self.WORD_2006_NAMESPACE}}}p"
+                ):
+                    paragraphs += 1
+                    elem.clear()
+            count = paragraphs
+
+        except Exception as e:
+            print(f"Error counting paragraphs in original document: {e}")
+
+        return count
+
+    @check("insertions")
+    def validate_insertions(self):
+        errors = []
+
+        for xml_file in self.xml_files:
+            if xml_file.name != "document.xml":
+                continue
+
+            errors.extend(self._scan_document_body(xml_file)["insertions"])
+
+        if errors:
+            print(f"FAILED - Found {len(errors)} insertion validation violations:")
+            self._print_issues(errors)
+            return False
+        else:
+            if self.verbose:
+                print("PASSED - No w:delText elements within w:ins elements")
+            return True
+
+    def _scan_document_body(self, xml_file):
+        """Whitespace, deletion and insertion violations plus the paragraph count.
+
+        All four are gathered in one pass over the part's start/end events;
+        large parts are streamed rather than parsed into a tree. The result is
+        memoized per part and, in incremental mode, stored in the manifest.
+        """
+        self._touch_part(xml_file)
+        return self.part_cache.result(
+            xml_file,
+            "document_body",
+            lambda xml_file: self._cached_part_result(
+                "document_body", xml_file, self._collect_document_body
+            ),
+        )
+
+    def _collect_document_body(self, xml_file):
+        w = f"{{{self.WORD_2006_NAMESPACE}}}"
+        xml_space_attr = f"{{{self.XML_NAMESPACE}}}space"
+        relative_path = xml_file.relative_to(self.unpacked_dir)
+
+        def preview(text):
+            return repr(text)[:50] + "..." if len(repr(text)) > 50 else repr(text)
+
+        whitespace = []
+        deleted_text = []
+        deleted_instr_text = []
+        insertions = []
+        paragraph_count = 0
+        del_depth = 0
+        ins_depth = 0
+
+        try:
+            tags = [
+                f"{w}{name}"
+                for name in ("p", "t", "del", "ins", "instrText", "delText")
+            ]
+            for event, elem in self._iter_part_events(xml_file, tags):
+                tag = elem.tag
+
+                if event == "start":
+                    if tag == f"{w}del":
+                        del_depth += 1
+                    elif tag == f"{w}ins":
+                        ins_depth += 1
+                    continue
+
+                if tag == f"{w}del":
+                    del_depth -= 1
+                elif tag == f"{w}ins":
+                    ins_depth -= 1
+                elif tag == f"{w}p":
+                    paragraph_count += 1
+                elif tag == f"{w}t":
+                    text = elem.text
+                    if text:
+                        if (
+                            _EDGE_WHITESPACE.search(text)
+                            and elem.get(xml_space_attr) != "preserve"
+                        ):
+                            whitespace.append(
+                                self._issue(
+                                    relative_path,
+                                    elem.sourceline,
+                                    f"w:t element with whitespace missing xml:space='preserve': {preview(text)}",
+                                )
+                            )
+                        if del_depth:
+                            deleted_text.append(
+                                self._issue(
+                                    relative_path,
+                                    elem.sourceline,
+                                    f"<w:t> found within <w:del>: {preview(text)}",
+                                    rule="t_in_del",
+                                )
+                            )
+                elif tag == f"{w}instrText":
+                    if del_depth:
+                        deleted_instr_text.append(
+                            self._issue(
+                                relative_path,
+                                elem.sourceline,
+                                f"<w:instrText> found within <w:del> (use <w:delInstrText>): {preview(elem.text or '')}",
+                                rule="instrText_in_del",
+                            )
+                        )
+                elif tag == f"{w}delText":
+                    if ins_depth and not del_depth:
+                        insertions.append(
+                            self._issue(
+                                relative_path,
+                                elem.sourceline,
+                                f"<w:delText> within <w:ins>: {preview(elem.text or '')}",
+                            )
+                        )
+
+        except (lxml.etree.XMLSyntaxError, Exception) as e:
+            error = self._issue(relative_path, None, f"Error: {e}")
+            whitespace.append(error)
+            deleted_instr_text.append(error)
+            insertions.append(error)
+
+        return {
+            "whitespace": whitespace,
+            "deletions": deleted_text + deleted_instr_text,
+            "insertions": insertions,
+            "paragraph_count": paragraph_count,
+        }
+
+    @check("paragraph_counts")
+    def compare_paragraph_counts(self):
+        original_count = self.count_paragraphs_in_original()
+        new_count = self.count_paragraphs_in_unpacked()
+
+        diff = new_count - original_count
+        diff_str = f"+{diff}" if diff > 0 else str(diff)
+        print(f"\nParagraphs: {original_count} → {new_count} ({diff_str})")
+
+    def _parse_id_value(self, val: str, base: int = 16) -> int:
+        return int(val, base)
+
+    @check("id_constraints")
+    def validate_id_constraints(self):
+        errors = []
+
+        for xml_file in self.xml_files:
+            errors.extend(
+                self._cached_part_result(
+                    "id_constraints", xml_file, self._check_part_id_constraints
+                )
+            )
+
+        if errors:
+            print(f"FAILED - {len(errors)} ID constraint violations:")
+            self._print_issues(errors)
+        elif self.verbose:
+            print("PASSED - All paraId/durableId values within constraints")
+        return not errors
+
+    def _check_part_id_constraints(self, xml_file):
+        errors = []
+        para_id_attr = f"{{{self.W14_NAMESPACE}}}paraId"
+        durable_id_attr = f"{{{self.W16CID_NAMESPACE}}}durableId"
+
+        try:
+            for elem in self._parse_xml(xml_file).iter():
+                if val := elem.get(para_id_attr):
+                    if self._parse_id_value(val, base=16) >= 0x80000000:
+                        errors.append(
+                            self._id_constraint_issue(
+                                xml_file, elem, f"paraId={val} >= 0x80000000"
+                            )
+                        )
+
+                if val := elem.get(durable_id_attr):
+                    if xml_file.name == "numbering.xml":
+                        try:
+                            if self._parse_id_value(val, base=10) >= 0x7FFFFFFF:
+                                errors.append(
+                                    self._id_constraint_issue(
+                                        xml_file, elem, f"durableId={val} >= 0x7FFFFFFF"
+                                    )
+                                )
+                        except ValueError:
+                            errors.append(
+                                self._id_constraint_issue(
+                                    xml_file,
+                                    elem,
+                                    f"durableId={val} must be decimal in numbering.xml",
+                                )
+                            )
+                    else:
+                        if self._parse_id_value(val, base=16) >= 0x7FFFFFFF:
+                            errors.append(
+                                self._id_constraint_issue(
+                                    xml_file, elem, f"durableId={val} >= 0x7FFFFFFF"
+                                )
+                            )
+        except Exception:
+            pass
+
+        return errors
+
+    def _id_constraint_issue(self, xml_file, elem, message):
+        return self._issue(
+            xml_file,
+            elem.sourceline,
+            message,
+            text=f"  {xml_file.name}:{elem.sourceline}: {message}",
+        )
+
+    @check("comment_markers")
+    def validate_comment_markers(self):
+        errors = []
+
+        document_xml = None
+        comments_xml = None
+        for xml_file in self.xml_files:
+            if xml_file.name == "document.xml" and "word" in str(xml_file):
+                document_xml = xml_file
+            elif xml_file.name == "comments.xml":
+                comments_xml = xml_file
+
+        if not document_xml:
+            if self.verbose:
+                print("PASSED - No document.xml found (skipping comment validation)")
+            return True
+
+        try:
+            range_starts, range_ends, references = (
+                set(ids)
+                for ids in self._cached_part_result(
+                    "comment_markers", document_xml, self._collect_comment_markers
+                )
+            )
+
+            orphaned_ends = range_ends - range_starts
+            for comment_id in sorted(
+                orphaned_ends, key=lambda x: int(x) if x and x.isdigit() else 0
+            ):
+                errors.append(
+                    self._comment_marker_issue(
+                        document_xml,
+                        f'commentRangeEnd id="{comment_id}" has no matching commentRangeStart',
+                        "orphaned_range_end",
+                    )
+                )
+
+            orphaned_starts = range_starts - range_ends
+            for comment_id in sorted(
+                orphaned_starts, key=lambda x: int(x) if x and x.isdigit() else 0
+            ):
+                errors.append(
+                    self._comment_marker_issue(
+                        document_xml,
+                        f'commentRangeStart id="{comment_id}" has no matching commentRangeEnd',
+                        "orphaned_range_start",
+                    )
+                )
+
+            comment_ids = set()
+            if comments_xml and comments_xml.exists():
+                comment_ids = set(
+                    self._cached_part_result(
+                        "comment_ids", comments_xml, self._collect_comment_ids
+                    )
+                )
+
+                marker_ids = range_starts | range_ends | references
+                invalid_refs = marker_ids - comment_ids
+                for comment_id in sorted(
+                    invalid_refs, key=lambda x: int(x) if x and x.isdigit() else 0
+                ):
+                    if comment_id:  
+                        errors.append(
+                            self._comment_marker_issue(
+                                document_xml,
+                                f'marker id="{comment_id}" references non-existent comment',
+                                "missing_comment",
+                            )
+                        )
+
+        except (lxml.etree.XMLSyntaxError, Exception) as e:
+            errors.append(
+                self._issue(
+                    document_xml,
+                    None,
+                    f"Error parsing XML: {e}",
+                    text=f"  Error parsing XML: {e}",
+                )
+            )
+
+        if errors:
+            print(f"FAILED - {len(errors)} comment marker violations:")
+            self._print_issues(errors)
+            return False
+        else:
+            if self.verbose:
+                print("PASSED - All comment markers properly paired")
+            return True
+
+    def _comment_marker_issue(self, document_xml, message, rule):
+        return self._issue(
+            document_xml, None, message, rule=rule, text=f"  document.xml: {message}"
+        )
+
+    def _collect_comment_markers(self, document_xml):
+        doc_root = self._parse_xml(document_xml).getroot()
+        namespaces = {"w": self.WORD_2006_NAMESPACE}
+        id_attr = f"{{{self.WORD_2006_NAMESPACE}}}id"
+
+        return [
+            sorted(
+                {
+                    elem.get(id_attr)
+                    for elem in doc_root.xpath(xpath, namespaces=namespaces)
+                },
+                key=str,
+            )
+            for xpath in (
+                ".//w:commentRangeStart",
+                ".//w:commentRangeEnd",
+                ".//w:commentReference",
+            )
+        ]
+
+    def _collect_comment_ids(self, comments_xml):
+        comments_root = self._parse_xml(comments_xml).getroot()
+        return sorted(
+            {
+                elem.get(f"{{{self.WORD_2006_NAMESPACE}}}id")
+                for elem in comments_root.xpath(
+                    ".//w:comment", namespaces={"w": self.WORD_2006_NAMESPACE}
+                )
+            },
+            key=str,
+        )
+
+    def _repair_steps(self):
+        return super()._repair_steps() + [self._repair_durable_ids]
+
+    def repair_durableId(self) -> int:
+        return self._run_repairs([self._repair_durable_ids])
+
+    def _repair_durable_ids(self, xml_file, tree):
+        repairs = 0
+        durable_id_attr = f"{{{self.W16CID_NAMESPACE}}}durableId"
+
+        for elem in tree.xpath(
+            "//*[@w16cid:durableId]", namespaces={"w16cid": self.W16CID_NAMESPACE}
+        ):
+            durable_id = elem.get(durable_id_attr)
+            needs_repair = False
+
+            if xml_file.name == "numbering.xml":
+                try:
+                    needs_repair = (
+                        self._parse_id_value(durable_id, base=10) >= 0x7FFFFFFF
+                    )
+                except ValueError:
+                    needs_repair = True
+            else:
+                try:
+                    needs_repair = (
+                        self._parse_id_value(durable_id, base=16) >= 0x7FFFFFFF
+                    )
+                except ValueError:
+                    needs_repair = True
+
+            if needs_repair:
+                value = random.randint(1, 0x7FFFFFFE)
+                if xml_file.name == "numbering.xml":
+                    new_id = str(value)  
+                else:
+                    new_id = f"{value:08X}"  
+
+                elem.set(durable_id_attr, new_id)
+                print(
+                    f"  Repaired: {xml_file.name}: durableId {durable_id} → {new_id}"
+                )
+                repairs += 1
+
+        return repairs
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
@@ -5,6 +5,7 @@ Validator for PowerPoint presentation XML files against XSD schemas.
 import re
 
 from .base import BaseSchemaValidator
+from .report import check
 
 
 class PPTXSchemaValidator(BaseSchemaValidator):
@@ -57,50 +58,63 @@ class PPTXSchemaValidator(BaseSchemaValidator):
         if not self.validate_no_duplicate_slide_layouts():
             all_valid = False
 
+        self.save_manifest()
+
         return all_valid
 
+    @check("uuid_ids")
     def validate_uuid_ids(self):
-        import lxml.etree
-
         errors = []
-        uuid_pattern = re.compile(
-            r"^[\{\(]?[0-9A-Fa-f]{8}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{12}[\}\)]?$"
-        )
 
         for xml_file in self.xml_files:
-            try:
-                root = lxml.etree.parse(str(xml_file)).getroot()
-
-                for elem in root.iter():
-                    for attr, value in elem.attrib.items():
-                        attr_name = attr.split("}")[-1].lower()
-                        if attr_name == "id" or attr_name.endswith("id"):
-                            if self._looks_like_uuid(value):
-                                if not uuid_pattern.match(value):
-                                    errors.append(
-                                        f"  {xml_file.relative_to(self.unpacked_dir)}: "
-                                        f"Line {elem.sourceline}: ID '{value}' appears to be a UUID but contains invalid hex characters"
-                                    )
-
-            except (lxml.etree.XMLSyntaxError, Exception) as e:
-                errors.append(
-                    f"  {xml_file.relative_to(self.unpacked_dir)}: Error: {e}"
-                )
+            errors.extend(
+                self._cached_part_result("uuid_ids", xml_file, self._check_part_uuid_ids)
+            )
 
         if errors:
             print(f"FAILED - Found {len(errors)} UUID ID validation errors:")
-            for error in errors:
-                print(error)
+            self._print_issues(errors)
             return False
         else:
             if self.verbose:
                 print("PASSED - All UUID-like IDs contain valid hex values")
             return True
 
+    def _check_part_uuid_ids(self, xml_file):
+        import lxml.etree
+
+        errors = []
+        uuid_pattern = re.compile(
+            r"^[\{\(]?[0-9A-Fa-f]{8}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{4}-?[0-9A-Fa-f]{12}[\}\)]?$"
+        )
+
+        try:
+            root = self._parse_xml(xml_file).getroot()
+
+            for elem in root.iter():
+                for attr, value in elem.attrib.items():
+                    attr_name = attr.split("}")[-1].lower()
+                    if attr_name == "id" or attr_name.endswith("id"):
+                        if self._looks_like_uuid(value):
+                            if not uuid_pattern.match(value):
+                                errors.append(
+                                    self._issue(
+                                        xml_file,
+                                        elem.sourceline,
+                                        f"ID '{value}' appears to be a UUID but contains invalid hex characters",
+                                    )
+                                )
+
+        except (lxml.etree.XMLSyntaxError, Exception) as e:
+            errors.append(self._issue(xml_file, None, f"Error: {e}"))
+
+        return errors
+
     def _looks_like_uuid(self, value):
         clean_value = value.strip("{}()").replace("-", "")
         return len(clean_value) == 32 and all(c.isalnum() for c in clean_value)
 
+    @check("slide_layout_ids")
     def validate_slide_layout_ids(self):
         import lxml.etree
 
@@ -115,18 +129,22 @@ class PPTXSchemaValidator(BaseSchemaValidator):
 
         for slide_master in slide_masters:
             try:
-                root = lxml.etree.parse(str(slide_master)).getroot()
+                root = self._parse_xml(slide_master).getroot()
 
                 rels_file = slide_master.parent / "_rels" / f"{slide_master.name}.rels"
 
                 if not rels_file.exists():
                     errors.append(
-                        f"  {slide_master.relative_to(self.unpacked_dir)}: "
-                        f"Missing relationships file: {rels_file.relative_to(self.unpacked_dir)}"
+                        self._issue(
+                            slide_master,
+                            None,
+                            f"Missing relationships file: {rels_file.relative_to(self.unpacked_dir)}",
+                            rule="missing_rels",
+                        )
                     )
                     continue
 
-                rels_root = lxml.etree.parse(str(rels_file)).getroot()
+                rels_root = self._parse_xml(rels_file).getroot()
 
                 valid_layout_rids = set()
                 for rel in rels_root.findall(
@@ -146,20 +164,20 @@ class PPTXSchemaValidator(BaseSchemaValidator):
 
                     if r_id and r_id not in valid_layout_rids:
                         errors.append(
-                            f"  {slide_master.relative_to(self.unpacked_dir)}: "
-                            f"Line {sld_layout_id.sourceline}: sldLayoutId with id='{layout_id}' "
-                            f"references r:id='{r_id}' which is not found in slide layout relationships"
+                            self._issue(
+                                slide_master,
+                                sld_layout_id.sourceline,
+                                f"sldLayoutId with id='{layout_id}' "
+                                f"references r:id='{r_id}' which is not found in slide layout relationships",
+                            )
                         )
 
             except (lxml.etree.XMLSyntaxError, Exception) as e:
-                errors.append(
-                    f"  {slide_master.relative_to(self.unpacked_dir)}: Error: {e}"
-                )
+                errors.append(self._issue(slide_master, None, f"Error: {e}"))
 
         if errors:
             print(f"FAILED - Found {len(errors)} slide layout ID validation errors:")
-            for error in errors:
-                print(error)
+            self._print_issues(errors)
             print(
                 "Remove invalid references or add missing slide layouts to the relationships file."
             )
@@ -169,6 +187,7 @@ class PPTXSchemaValidator(BaseSchemaValidator):
                 print("PASSED - All slide layout IDs reference valid slide layouts")
             return True
 
+    @check("duplicate_slide_layouts")
     def validate_no_duplicate_slide_layouts(self):
         import lxml.etree
 
@@ -177,7 +196,7 @@ class PPTXSchemaValidator(BaseSchemaValidator):
 
         for rels_file in slide_rels_files:
             try:
-                root = lxml.etree.parse(str(rels_file)).getroot()
+                root = self._parse_xml(rels_file).getroot()
 
                 layout_rels = [
                     rel
@@ -189,24 +208,26 @@ class PPTXSchemaValidator(BaseSchemaValidator):
 
                 if len(layout_rels) > 1:
                     errors.append(
-                        f"  {rels_file.relative_to(self.unpacked_dir)}: has {len(layout_rels)} slideLayout references"
+                        self._issue(
+                            rels_file,
+                            None,
+                            f"has {len(layout_rels)} slideLayout references",
+                        )
                     )
 
             except Exception as e:
-                errors.append(
-                    f"  {rels_file.relative_to(self.unpacked_dir)}: Error: {e}"
-                )
+                errors.append(self._issue(rels_file, None, f"Error: {e}"))
 
         if errors:
             print("FAILED - Found slides with duplicate slideLayout references:")
-            for error in errors:
-                print(error)
+            self._print_issues(errors)
             return False
         else:
             if self.verbose:
                 print("PASSED - All slides have exactly one slideLayout reference")
             return True
 
+    @check("notes_slide_references")
     def validate_notes_slide_references(self):
         import lxml.etree
 
@@ -222,7 +243,7 @@ class PPTXSchemaValidator(BaseSchemaValidator):
 
         for rels_file in slide_rels_files:
             try:
-                root = lxml.etree.parse(str(rels_file)).getroot()
+                root = self._parse_xml(rels_file).getroot()
 
                 for rel in root.findall(
                     f".//{{{self.PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
@@ -244,25 +265,34 @@ class PPTXSchemaValidator(BaseSchemaValidator):
                             )
 
             except (lxml.etree.XMLSyntaxError, Exception) as e:
-                errors.append(
-                    f"  {rels_file.relative_to(self.unpacked_dir)}: Error: {e}"
-                )
+                errors.append(self._issue(rels_file, None, f"Error: {e}"))
 
         for target, references in notes_slide_references.items():
             if len(references) > 1:
                 slide_names = [ref[0] for ref in references]
                 errors.append(
-                    f"  Notes slide '{target}' is referenced by multiple slides: {', '.join(slide_names)}"
+                    self._issue(
+                        None,
+                        None,
+                        f"Notes slide '{target}' is referenced by multiple slides: {', '.join(slide_names)}",
+                        text=f"  Notes slide '{target}' is referenced by multiple slides: {', '.join(slide_names)}",
+                    )
                 )
                 for slide_name, rels_file in references:
-                    errors.append(f"    - {rels_file.relative_to(self.unpacked_dir)}")
+                    errors.append(
+                        self._issue(
+                            rels_file,
+                            None,
+                            f"References notes slide '{target}'",
+                            text=f"    - {rels_file.relative_to(self.unpacked_dir)}",
+                        )
+                    )
 
         if errors:
             print(
                 f"FAILED - Found {len([e for e in errors if not e.startswith('    ')])} notes slide reference validation errors:"
             )
-            for error in errors:
-                print(error)
+            self._print_issues(errors)
             print("Each slide may optionally have its own slide file.")
             return False
         else:
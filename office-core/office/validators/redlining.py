@@ -0,0 +1,334 @@
+"""
+Validator for tracked changes in Word documents.
+"""
+
+import difflib
+import os
+import re
+from pathlib import Path
+
+import lxml.etree
+
+from ..helpers.pipeline import is_story_part
+from .cache import get_original_package
+from .report import Issue, check
+
+_WORD_TOKENS = re.compile(r"\s+|\w+|[^\w\s]")
+
+_PARSER = lxml.etree.XMLParser(huge_tree=True)
+
+# Story parts whose text may change anyway: Word never tracks adding or
+# editing a comment, so comment text is left out of the comparison.
+UNTRACKED_STORY_PARTS = {"word/comments.xml"}
+
+
+class RedliningValidator:
+
+    # Replaced runs of words up to this many characters are refined to a
+    # character diff; longer ones are reported as whole words.
+    MAX_CHAR_DIFF = 200
+
+    def __init__(
+        self, unpacked_dir, original_docx, verbose=False, author="Claude", report=None
+    ):
+        self.unpacked_dir = Path(unpacked_dir)
+        self.original_docx = Path(original_docx)
+        self.verbose = verbose
+        self.author = author
+        self.report = report
+        self._current_check = None
+        self.namespaces = {
+            "w": "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+        }
+
+    def repair(self) -> int:
+        return 0
+
+    @check("redlining")
+    def validate(self):
+        modified_file = self.unpacked_dir / "word" / "document.xml"
+        if self._current_check is not None:
+            self._current_check.parts.add("word/document.xml")
+        if not modified_file.exists():
+            self._fail(f"Modified document.xml not found at {modified_file}")
+            return False
+
+        try:
+            modified_roots = {
+                name: lxml.etree.parse(str(path), _PARSER).getroot()
+                for name, path in self._modified_story_parts()
+            }
+        except lxml.etree.XMLSyntaxError as e:
+            self._fail(f"Error parsing XML files: {e}")
+            return False
+
+        if not any(self._has_author_changes(root) for root in modified_roots.values()):
+            if self.verbose:
+                print(f"PASSED - No tracked changes by {self.author} found.")
+            return True
+
+        try:
+            original = get_original_package(self.original_docx)
+            has_document = original.has_part("word/document.xml")
+        except Exception as e:
+            self._fail(f"Error unpacking original docx: {e}")
+            return False
+
+        if not has_document:
+            self._fail(f"Original document.xml not found in {self.original_docx}")
+            return False
+
+        success = True
+        for name, modified_root in modified_roots.items():
+            if self._current_check is not None:
+                self._current_check.parts.add(name)
+
+            try:
+                original_root = (
+                    original.parse(name).getroot() if original.has_part(name) else None
+                )
+            except lxml.etree.XMLSyntaxError as e:
+                self._fail(f"Error parsing XML files: {e}")
+                return False
+
+            self._remove_author_tracked_changes(modified_root)
+            modified_paragraphs = self._paragraph_texts(modified_root)
+            if original_root is not None:
+                self._remove_author_tracked_changes(original_root)
+            original_paragraphs = self._paragraph_texts(original_root)
+
+            if modified_paragraphs == original_paragraphs:
+                continue
+
+            success = False
+            error_message = self._generate_detailed_diff(
+                "\n".join(original_paragraphs), "\n".join(modified_paragraphs), name
+            )
+            print(error_message)
+            if self._current_check is not None:
+                self._current_check.issues.append(
+                    Issue(
+                        error_message,
+                        part=name,
+                        message=error_message.removeprefix("FAILED - "),
+                        rule="untracked_change",
+                    )
+                )
+
+        if success and self.verbose:
+            print(f"PASSED - All changes by {self.author} are properly tracked")
+        return success
+
+    def _modified_story_parts(self):
+        """(part name, path) for each story part, word/document.xml first."""
+        word_dir = self.unpacked_dir / "word"
+        names = sorted(
+            f"word/{path.name}"
+            for path in word_dir.glob("*.xml")
+            if is_story_part(f"word/{path.name}")
+            and f"word/{path.name}" not in UNTRACKED_STORY_PARTS
+        )
+        names.sort(key=lambda name: name != "word/document.xml")
+        return [(name, self.unpacked_dir / name) for name in names]
+
+    def _has_author_changes(self, root):
+        w = self.namespaces["w"]
+        author_attr = f"{{{w}}}author"
+        return any(
+            elem.get(author_attr) == self.author
+            for elem in root.iter(f"{{{w}}}ins", f"{{{w}}}del")
+        )
+
+    def _fail(self, message):
+        print(f"FAILED - {message}")
+        if self._current_check is not None:
+            self._current_check.issues.append(
+                Issue(f"FAILED - {message}", part="word/document.xml", message=message)
+            )
+
+    def _generate_detailed_diff(self, original_text, modified_text, part="word/document.xml"):
+        subject = "Document text" if part == "word/document.xml" else f"Text of {part}"
+        error_parts = [
+            f"FAILED - {subject} doesn't match after removing {self.author}'s tracked changes",
+            "",
+            "Likely causes:",
+            "  1. Modified text inside another author's <w:ins> or <w:del> tags",
+            "  2. Made edits without proper tracked changes",
+            "  3. Didn't nest <w:del> inside <w:ins> when deleting another's insertion",
+            "",
+            "For pre-redlined documents, use correct patterns:",
+            "  - To reject another's INSERTION: Nest <w:del> inside their <w:ins>",
+            "  - To restore another's DELETION: Add new <w:ins> AFTER their <w:del>",
+            "",
+        ]
+
+        word_diff = self._get_word_diff(original_text, modified_text)
+        if word_diff:
+            error_parts.extend(["Differences:", "============", word_diff])
+        else:
+            error_parts.append("Unable to generate word diff")
+
+        return "\n".join(error_parts)
+
+    def _get_word_diff(self, original_text, modified_text):
+        """Changed paragraphs with [-removed-] and {+added+} inline markers.
+
+        Same report as `git diff --word-diff=plain --word-diff-regex=. -U0`:
+        paragraphs are aligned first, then each changed run of paragraphs is
+        diffed within, and only the changed lines are listed.
+        """
+        original_lines = original_text.split("\n")
+        modified_lines = modified_text.split("\n")
+
+        # Unchanged paragraphs at either end never reach the matcher, so a
+        # single edit in a long document costs one pass over the paragraphs.
+        limit = min(len(original_lines), len(modified_lines))
+        head = 0
+        while head < limit - 1 and original_lines[head] == modified_lines[head]:
+            head += 1
+        tail = 0
+        while (
+            tail < limit - head
+            and original_lines[-1 - tail] == modified_lines[-1 - tail]
+        ):
+            tail += 1
+        original_lines = original_lines[head : len(original_lines) - tail]
+        modified_lines = modified_lines[head : len(modified_lines) - tail]
+
+        original_keys = list(original_lines)
+        modified_keys = list(modified_lines)
+        if not tail and original_keys and modified_keys:
+            # The last paragraph has no line break after it, so, as in git,
+            # it only matches the other text's last paragraph.
+            original_keys[-1] = (original_keys[-1],)
+            modified_keys[-1] = (modified_keys[-1],)
+        matcher = difflib.SequenceMatcher(
+            None, original_keys, modified_keys, autojunk=False
+        )
+
+        content_lines = []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            if i2 - i1 == j2 - j1:
+                # Paragraph-for-paragraph replacement: diff each pair alone.
+                pairs = zip(original_lines[i1:i2], modified_lines[j1:j2])
+            else:
+                pairs = [
+                    (
+                        "\n".join(original_lines[i1:i2]),
+                        "\n".join(modified_lines[j1:j2]),
+                    )
+                ]
+            for old, new in pairs:
+                hunk = self._inline_diff(old, new)
+                content_lines.extend(
+                    line for line in hunk.split("\n") if line.strip()
+                )
+
+        return "\n".join(content_lines) or None
+
+    def _inline_diff(self, old, new, by_char=False):
+        """old and new with changes marked: by words, then by characters
+        within each replaced run of words that is short enough."""
+        if "\n" in old or "\n" in new:
+            prefix = suffix = 0
+        else:
+            prefix = len(os.path.commonprefix([old, new]))
+            suffix = len(
+                os.path.commonprefix([old[prefix:][::-1], new[prefix:][::-1]])
+            )
+        if prefix or suffix:
+            middle = self._inline_diff(
+                old[prefix : len(old) - suffix], new[prefix : len(new) - suffix], by_char
+            )
+            return old[:prefix] + middle + old[len(old) - suffix :]
+
+        if by_char:
+            old_tokens, new_tokens = list(old), list(new)
+        else:
+            old_tokens = _WORD_TOKENS.findall(old)
+            new_tokens = _WORD_TOKENS.findall(new)
+
+        matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+        parts = []
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            old_run = "".join(old_tokens[i1:i2])
+            new_run = "".join(new_tokens[j1:j2])
+            if tag == "equal":
+                parts.append(old_run)
+            elif (
+                tag == "replace"
+                and not by_char
+                and len(old_run) + len(new_run) <= self.MAX_CHAR_DIFF
+            ):
+                parts.append(self._inline_diff(old_run, new_run, by_char=True))
+            else:
+                if old_run:
+                    parts.append(self._mark(old_run, "[-", "-]"))
+                if new_run:
+                    parts.append(self._mark(new_run, "{+", "+}"))
+        return "".join(parts)
+
+    @staticmethod
+    def _mark(text, start, end):
+        return "\n".join(
+            f"{start}{line}{end}" if line else "" for line in text.split("\n")
+        )
+
+    def _remove_author_tracked_changes(self, root):
+        """Reject the author's insertions and accept-back their deletions.
+
+        Each element is detached or unwrapped in place with lxml's sibling
+        operations, so the pass is linear in the size of the tree.
+        """
+        w = self.namespaces["w"]
+        author_attr = f"{{{w}}}author"
+
+        author_ins = [
+            elem
+            for elem in root.iter(f"{{{w}}}ins")
+            if elem.get(author_attr) == self.author
+        ]
+        for ins_elem in author_ins:
+            parent = ins_elem.getparent()
+            if parent is not None:
+                parent.remove(ins_elem)
+
+        author_del = [
+            elem
+            for elem in root.iter(f"{{{w}}}del")
+            if elem.get(author_attr) == self.author
+        ]
+        for del_elem in author_del:
+            for elem in del_elem.iter(f"{{{w}}}delText"):
+                elem.tag = f"{{{w}}}t"
+
+            parent = del_elem.getparent()
+            if parent is None:
+                continue
+            for child in reversed(list(del_elem)):
+                del_elem.addnext(child)
+            parent.remove(del_elem)
+
+    def _paragraph_texts(self, root):
+        """Text of each non-empty paragraph; [] for a part that doesn't exist."""
+        if root is None:
+            return []
+
+        p_tag = f"{{{self.namespaces['w']}}}p"
+        t_tag = f"{{{self.namespaces['w']}}}t"
+
+        paragraphs = []
+        for p_elem in root.iter(p_tag):
+            paragraph_text = "".join(
+                t_elem.text for t_elem in p_elem.iter(t_tag) if t_elem.text
+            )
+            if paragraph_text:
+                paragraphs.append(paragraph_text)
+
+        return paragraphs
+
+
+if __name__ == "__main__":
+    raise RuntimeError("This module should not be run directly.")
@@ -0,0 +1,213 @@
+"""
+Index of the relationships declared in an unpacked Office package.
+"""
+
+import os
+import posixpath
+from pathlib import Path, PurePosixPath
+from typing import NamedTuple
+
+import lxml.etree
+
+PACKAGE_RELATIONSHIPS_NAMESPACE = (
+    "http://schemas.openxmlformats.org/package/2006/relationships"
+)
+
+
+class Relationship(NamedTuple):
+    source: str
+    rels_part: str
+    id: str | None
+    type: str
+    target: str
+    part: str | None
+    line: int | None
+
+
+class PackageRelationshipGraph:
+    """Every part of an unpacked package and the relationships between them.
+
+    Part names are posix paths relative to the package root ("ppt/slides/
+    slide1.xml"); the package-level _rels/.rels has the source part "". The
+    file list comes from one directory walk, and each .rels file is parsed
+    the first time its source part is queried, so a script that only needs
+    presentation.xml.rels never reads the others. Target existence checks
+    and the reverse index (part -> relationships pointing at it) are plain
+    dict and set lookups.
+
+    Callers that add or delete files must keep the graph in step with
+    discard() and reload().
+    """
+
+    def __init__(self, unpacked_dir, parse=None):
+        self.unpacked_dir = Path(unpacked_dir).resolve()
+        self._parse = parse or (lambda path: lxml.etree.parse(str(path)))
+
+        self.parts = set()
+        self.rels_parts = []
+        for dirpath, dirnames, filenames in os.walk(self.unpacked_dir):
+            dirnames.sort()
+            rel_dir = Path(dirpath).relative_to(self.unpacked_dir).as_posix()
+            for filename in sorted(filenames):
+                part = filename if rel_dir == "." else f"{rel_dir}/{filename}"
+                self.parts.add(part)
+                if filename.endswith(".rels"):
+                    self.rels_parts.append(part)
+
+        self.load_errors = {}
+        self._relationships = {}
+        self._referrers = None
+
+    @staticmethod
+    def source_part(rels_part):
+        rels_dir, rels_name = posixpath.split(rels_part)
+        base_dir = posixpath.dirname(rels_dir)
+        if rels_name == ".rels":
+            return base_dir
+        return posixpath.join(base_dir, rels_name[: -len(".rels")])
+
+    @staticmethod
+    def rels_part_for(source_part):
+        base_dir, name = posixpath.split(source_part)
+        return posixpath.join(base_dir, "_rels", f"{name}.rels")
+
+    def has_part(self, part_name):
+        return part_name in self.parts
+
+    def relationships_in(self, rels_part):
+        """Relationships declared in one .rels file, in document order."""
+        relationships = self._relationships.get(rels_part)
+        if relationships is None:
+            relationships = self._load(rels_part)
+        return relationships
+
+    def relationships_from(self, source_part):
+        rels_part = self.rels_part_for(source_part)
+        if rels_part not in self.parts:
+            return []
+        return self.relationships_in(rels_part)
+
+    def get(self, source_part, rid):
+        for rel in self.relationships_from(source_part):
+            if rel.id == rid:
+                return rel
+        return None
+
+    def referrers(self, part_name):
+        """Relationships whose target resolves to part_name."""
+        return self._reverse_index().get(part_name, [])
+
+    def is_referenced(self, part_name):
+        return bool(self.referrers(part_name))
+
+    def referenced_parts(self):
+        return {part for part, rels in self._reverse_index().items() if rels}
+
+    def broken_relationships(self, rels_part):
+        return [
+            rel
+            for rel in self.relationships_in(rels_part)
+            if rel.part is not None and rel.part not in self.parts
+        ]
+
+    def unreferenced_parts(self):
+        """Parts no relationship points at, excluding .rels and [Content_Types].xml."""
+        referenced = self._reverse_index()
+        return sorted(
+            (
+                part
+                for part in self.parts
+                if not part.endswith(".rels")
+                and posixpath.basename(part) != "[Content_Types].xml"
+                and not referenced.get(part)
+            ),
+            key=PurePosixPath,
+        )
+
+    def discard(self, part_name):
+        """Forget a deleted part (and, for a .rels file, its relationships)."""
+        self.parts.discard(part_name)
+        if part_name.endswith(".rels"):
+            self._forget(part_name)
+            self.rels_parts = [p for p in self.rels_parts if p != part_name]
+
+    def reload(self, rels_part):
+        """Re-read a .rels file that was written after the graph was built."""
+        self._forget(rels_part)
+        if (self.unpacked_dir / rels_part).is_file():
+            self.parts.add(rels_part)
+            if rels_part not in self.rels_parts:
+                self.rels_parts.append(rels_part)
+            self._load(rels_part)
+
+    def _load(self, rels_part):
+        source = self.source_part(rels_part)
+        relationships = []
+
+        try:
+            root = self._parse(self.unpacked_dir / rels_part).getroot()
+            for rel in root.iter(
+                f"{{{PACKAGE_RELATIONSHIPS_NAMESPACE}}}Relationship"
+            ):
+                target = rel.get("Target") or ""
+                relationships.append(
+                    Relationship(
+                        source=source,
+                        rels_part=rels_part,
+                        id=rel.get("Id"),
+                        type=rel.get("Type", ""),
+                        target=target,
+                        part=self._resolve_target(rels_part, target),
+                        line=rel.sourceline,
+                    )
+                )
+        except Exception as e:
+            self.load_errors[rels_part] = e
+
+        self._relationships[rels_part] = relationships
+        if self._referrers is not None:
+            for rel in relationships:
+                if rel.part is not None:
+                    self._referrers.setdefault(rel.part, []).append(rel)
+        return relationships
+
+    def _forget(self, rels_part):
+        self.load_errors.pop(rels_part, None)
+        relationships = self._relationships.pop(rels_part, [])
+        if self._referrers is not None:
+            for rel in relationships:
+                if rel.part is not None:
+                    self._referrers[rel.part].remove(rel)
+
+    def _reverse_index(self):
+        if self._referrers is None:
+            for rels_part in self.rels_parts:
+                if rels_part not in self._relationships:
+                    self._load(rels_part)
+            self._referrers = {}
+            for relationships in self._relationships.values():
+                for rel in relationships:
+                    if rel.part is not None:
+                        self._referrers.setdefault(rel.part, []).append(rel)
+        return self._referrers
+
+    @staticmethod
+    def _resolve_target(rels_part, target):
+        """Part name a target resolves to; None for external and empty targets.
+
+        Targets that climb out of the package keep their leading "../" and so
+        never match a part.
+        """
+        if not target or target.startswith(("http", "mailto:")):
+            return None
+
+        if target.startswith("/"):
+            path = target.lstrip("/")
+        elif posixpath.basename(rels_part) == ".rels":
+            path = target
+        else:
+            path = posixpath.join(
+                posixpath.dirname(posixpath.dirname(rels_part)), target
+            )
+
+        return posixpath.normpath(path)
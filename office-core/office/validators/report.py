@@ -0,0 +1,127 @@
+"""
+Structured results for the validator checks.
+"""
+
+import functools
+import time
+
+
+class Issue(str):
+    """One finding of a check.
+
+    The string value is the line the check prints in text mode, so issues can
+    be collected, counted and printed exactly like the plain strings they
+    replace; the attributes carry the same finding for the JSON report.
+    """
+
+    def __new__(
+        cls, text, part=None, line=None, message=None, rule=None, severity="error"
+    ):
+        issue = super().__new__(cls, text)
+        issue.part = part
+        issue.line = line
+        issue.message = text.strip() if message is None else message
+        issue.rule = rule
+        issue.severity = severity
+        return issue
+
+    def to_dict(self):
+        return {
+            "text": str(self),
+            "part": self.part,
+            "line": self.line,
+            "message": self.message,
+            "rule": self.rule,
+            "severity": self.severity,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["text"],
+            part=data["part"],
+            line=data["line"],
+            message=data["message"],
+            rule=data["rule"],
+            severity=data["severity"],
+        )
+
+
+class CheckResult:
+    def __init__(self, validator, name):
+        self.validator = validator
+        self.name = name
+        self.passed = None
+        self.seconds = 0.0
+        self.parts = set()
+        self.issues = []
+
+    def to_dict(self):
+        return {
+            "validator": self.validator,
+            "check": self.name,
+            "passed": self.passed,
+            "seconds": round(self.seconds, 6),
+            "parts": len(self.parts),
+            "issues": [
+                {
+                    "part": issue.part,
+                    "line": issue.line,
+                    "rule": issue.rule or self.name,
+                    "message": issue.message,
+                    "severity": issue.severity,
+                }
+                for issue in self.issues
+            ],
+        }
+
+
+class ValidationReport:
+    """Checks run by one or more validators, in the order they ran."""
+
+    def __init__(self):
+        self.checks = []
+
+    @property
+    def passed(self):
+        return all(check.passed is not False for check in self.checks)
+
+    def to_dict(self):
+        return {
+            "passed": self.passed,
+            "seconds": round(sum(check.seconds for check in self.checks), 6),
+            "checks": [check.to_dict() for check in self.checks],
+        }
+
+
+def check(name):
+    """Record a validator method as the check `name` in the validator's report.
+
+    The method runs unchanged when the validator has no report. Otherwise its
+    wall time, the parts it touched and the issues it reported are stored in
+    a CheckResult; a None return value counts as passed.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            report = getattr(self, "report", None)
+            if report is None or self._current_check is not None:
+                return method(self, *args, **kwargs)
+
+            result = CheckResult(type(self).__name__, name)
+            self._current_check = result
+            start = time.perf_counter()
+            try:
+                passed = method(self, *args, **kwargs)
+            finally:
+                result.seconds = time.perf_counter() - start
+                self._current_check = None
+
+            result.passed = passed is not False
+            report.checks.append(result)
+            return passed
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,83 @@
+"""convert_batch against a stand-in soffice on PATH.
+
+The fake converts every input by copying it under the new suffix, except
+inputs named "broken*", for which it reports a load error on stderr the
+way soffice does and writes nothing.
+"""
+
+import os
+import sys
+import textwrap
+
+import pytest
+
+from office.soffice import convert_batch
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="runs a script by its shebang")
+
+FAKE_SOFFICE = f"""\
+#!{sys.executable}
+import pathlib, sys
+
+args = sys.argv[1:]
+suffix = "." + args[args.index("--convert-to") + 1].split(":")[0]
+outdir = pathlib.Path(args[args.index("--outdir") + 1])
+for arg in args[args.index("--outdir") + 2:]:
+    source = pathlib.Path(arg)
+    if source.stem.startswith("broken"):
+        print(f"Error: source file could not be loaded: {{source}}", file=sys.stderr)
+    else:
+        (outdir / (source.stem + suffix)).write_bytes(source.read_bytes())
+"""
+
+
+@pytest.fixture(autouse=True)
+def fake_soffice(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "soffice"
+    script.write_text(textwrap.dedent(FAKE_SOFFICE))
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr("office.soffice._needs_shim", lambda: False)
+
+
+def _inputs(tmp_path, *names):
+    paths = []
+    for name in names:
+        path = tmp_path / name
+        path.write_text(name)
+        paths.append(path)
+    return paths
+
+
+def test_outputs_are_mapped_in_input_order(tmp_path):
+    inputs = _inputs(tmp_path, "a.docx", "b.pptx")
+    outdir = tmp_path / "out"
+
+    results = convert_batch(inputs, "pdf", outdir=outdir)
+
+    assert [r.input for r in results] == inputs
+    assert all(r.ok for r in results)
+    assert (outdir / "a.pdf").read_text() == "a.docx"
+    assert (outdir / "b.pdf").read_text() == "b.pptx"
+
+
+def test_each_failure_reports_its_own_error(tmp_path):
+    inputs = _inputs(tmp_path, "broken1.docx", "good.docx", "broken2.docx")
+
+    results = convert_batch(inputs, "pdf", outdir=tmp_path / "out")
+
+    assert [r.ok for r in results] == [False, True, False]
+    assert results[0].error.endswith("broken1.docx")
+    assert results[2].error.endswith("broken2.docx")
+
+
+def test_missing_input_does_not_stop_the_others(tmp_path):
+    (good,) = _inputs(tmp_path, "good.docx")
+    missing = tmp_path / "missing.docx"
+
+    results = convert_batch([missing, good], "pdf", outdir=tmp_path / "out")
+
+    assert results[0] == (missing, tmp_path / "out" / "missing.pdf", False, "input not found")
+    assert results[1].ok
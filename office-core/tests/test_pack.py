@@ -0,0 +1,74 @@
+"""Round trips through pack(), on both the raw-write and the writestr path."""
+
+import zipfile
+
+import pytest
+
+from office import pack as pack_module
+from office.pack import pack
+from office.unpack import unpack
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="xml" ContentType="application/xml"/></Types>'
+)
+WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">\n'
+    "  <sheets/>\n"
+    "</workbook>"
+)
+
+
+@pytest.fixture(params=[True, False], ids=["raw", "writestr"])
+def raw_writes(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(pack_module, "_supports_raw_writes", lambda zf: False)
+    return request.param
+
+
+def _source(tmp_path):
+    source = tmp_path / "source.xlsx"
+    with zipfile.ZipFile(source, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", CONTENT_TYPES)
+        zf.writestr("xl/workbook.xml", WORKBOOK)
+        zf.writestr("xl/media/image1.png", b"\x89PNG" + bytes(range(256)) * 4)
+    return source
+
+
+def test_packed_archive_is_intact(tmp_path, raw_writes):
+    source = _source(tmp_path)
+    unpacked = tmp_path / "unpacked"
+    unpack(str(source), str(unpacked))
+    (unpacked / "xl" / "workbook.xml").write_text(
+        WORKBOOK.replace("<sheets/>", '<sheets><sheet name="Edited"/></sheets>'),
+        encoding="utf-8",
+    )
+
+    output = tmp_path / "output.xlsx"
+    _, message = pack(str(unpacked), str(output), validate=False)
+
+    assert message.startswith("Successfully packed")
+    with zipfile.ZipFile(output) as zf:
+        assert zf.testzip() is None
+        assert zf.namelist()[0] == "[Content_Types].xml"
+        workbook = zf.read("xl/workbook.xml")
+        assert b'<sheet name="Edited"/>' in workbook
+        assert b"\n  " not in workbook
+        assert zf.read("xl/media/image1.png") == b"\x89PNG" + bytes(range(256)) * 4
+        assert not any(name.endswith(".json") for name in zf.namelist())
+
+
+def test_pristine_parts_are_copied(tmp_path, raw_writes):
+    source = _source(tmp_path)
+    unpacked = tmp_path / "unpacked"
+    unpack(str(source), str(unpacked))
+
+    output = tmp_path / "output.xlsx"
+    pack(str(unpacked), str(output), validate=False)
+
+    with zipfile.ZipFile(output) as zf, zipfile.ZipFile(source) as original:
+        assert zf.testzip() is None
+        for name in original.namelist():
+            assert zf.read(name) == original.read(name)
@@ -0,0 +1,96 @@
+"""SofficePool recovery from a wedged worker, with a stand-in soffice.
+
+The worker's process is a sleeping child in its own session and its UNO
+desktop a fake, so no LibreOffice is needed.
+"""
+
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from office.soffice import SofficePool
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses process groups")
+
+
+class BlockingDesktop:
+    """A desktop whose calls never return, like a soffice that stopped
+    serving UNO requests while its process stays alive."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def getComponents(self):
+        self.release.wait()
+
+    def terminate(self):
+        self.release.wait()
+
+
+class Desktop:
+    process = None
+
+    def getComponents(self):
+        return ()
+
+    def terminate(self):
+        self.process.terminate()
+
+
+def _start_fake(worker, desktop):
+    worker.process = subprocess.Popen(["sleep", "60"], start_new_session=True)
+    desktop.process = worker.process
+    worker.desktop = desktop
+    worker.jobs = 0
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = SofficePool(size=1, health_timeout=0.2)
+    worker = pool._workers[0]
+    started = []
+
+    def start(startup_timeout):
+        _start_fake(worker, Desktop())
+        started.append(worker.process)
+
+    monkeypatch.setattr(worker, "start", start)
+    monkeypatch.setattr(worker, "run", lambda input_path, job, save: job(None, None))
+    pool.started = started
+    yield pool
+    pool.close()
+
+
+def test_wedged_worker_is_killed_and_restarted(pool, tmp_path):
+    worker = pool._workers[0]
+    desktop = BlockingDesktop()
+    _start_fake(worker, desktop)
+    wedged = worker.process
+    document = tmp_path / "input.docx"
+    document.write_bytes(b"")
+
+    began = time.monotonic()
+    result = pool._run(document, lambda document, context: "done", save=False, timeout=5)
+
+    assert result == "done"
+    assert time.monotonic() - began < 5
+    assert wedged.wait(timeout=5) is not None
+    assert pool.started and worker.process is pool.started[0]
+    desktop.release.set()
+
+
+def test_close_does_not_wait_for_a_wedged_worker(pool):
+    worker = pool._workers[0]
+    desktop = BlockingDesktop()
+    _start_fake(worker, desktop)
+    wedged = worker.process
+
+    began = time.monotonic()
+    pool.close()
+
+    assert time.monotonic() - began < 5
+    assert wedged.poll() is not None
+    desktop.release.set()
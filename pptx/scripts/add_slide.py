@@ -23,10 +23,12 @@ import shutil
 import sys
 from pathlib import Path
 
+from office.validators.relationships import PackageRelationshipGraph
 
-def get_next_slide_number(slides_dir: Path) -> int:
-    existing = [int(m.group(1)) for f in slides_dir.glob("slide*.xml")
-                if (m := re.match(r"slide(\d+)\.xml", f.name))]
+
+def get_next_slide_number(graph: PackageRelationshipGraph) -> int:
+    existing = [int(m.group(1)) for part in graph.parts
+                if (m := re.fullmatch(r"ppt/slides/slide(\d+)\.xml", part))]
     return max(existing) + 1 if existing else 1
 
 
@@ -34,13 +36,14 @@ def create_slide_from_layout(unpacked_dir: Path, layout_file: str) -> None:
     slides_dir = unpacked_dir / "ppt" / "slides"
     rels_dir = slides_dir / "_rels"
     layouts_dir = unpacked_dir / "ppt" / "slideLayouts"
+    graph = PackageRelationshipGraph(unpacked_dir)
 
     layout_path = layouts_dir / layout_file
-    if not layout_path.exists():
+    if not graph.has_part(f"ppt/slideLayouts/{layout_file}"):
         print(f"Error: {layout_path} not found", file=sys.stderr)
         sys.exit(1)
 
-    next_num = get_next_slide_number(slides_dir)
+    next_num = get_next_slide_number(graph)
     dest = f"slide{next_num}.xml"
     dest_slide = slides_dir / dest
     dest_rels = rels_dir / f"{dest}.rels"
@@ -79,7 +82,7 @@ def create_slide_from_layout(unpacked_dir: Path, layout_file: str) -> None:
 
     _add_to_content_types(unpacked_dir, dest)
 
-    rid = _add_to_presentation_rels(unpacked_dir, dest)
+    rid = _add_to_presentation_rels(unpacked_dir, dest, graph)
 
     next_slide_id = _get_next_slide_id(unpacked_dir)
 
@@ -90,14 +93,15 @@ def create_slide_from_layout(unpacked_dir: Path, layout_file: str) -> None:
 def duplicate_slide(unpacked_dir: Path, source: str) -> None:
     slides_dir = unpacked_dir / "ppt" / "slides"
     rels_dir = slides_dir / "_rels"
+    graph = PackageRelationshipGraph(unpacked_dir)
 
     source_slide = slides_dir / source
 
-    if not source_slide.exists():
+    if not graph.has_part(f"ppt/slides/{source}"):
         print(f"Error: {source_slide} not found", file=sys.stderr)
         sys.exit(1)
 
-    next_num = get_next_slide_number(slides_dir)
+    next_num = get_next_slide_number(graph)
     dest = f"slide{next_num}.xml"
     dest_slide = slides_dir / dest
 
@@ -106,7 +110,7 @@ def duplicate_slide(unpacked_dir: Path, source: str) -> None:
 
     shutil.copy2(source_slide, dest_slide)
 
-    if source_rels.exists():
+    if graph.has_part(f"ppt/slides/_rels/{source}.rels"):
         shutil.copy2(source_rels, dest_rels)
 
         rels_content = dest_rels.read_text(encoding="utf-8")
@@ -119,7 +123,7 @@ def duplicate_slide(unpacked_dir: Path, source: str) -> None:
 
     _add_to_content_types(unpacked_dir, dest)
 
-    rid = _add_to_presentation_rels(unpacked_dir, dest)
+    rid = _add_to_presentation_rels(unpacked_dir, dest, graph)
 
     next_slide_id = _get_next_slide_id(unpacked_dir)
 
@@ -138,19 +142,27 @@ def _add_to_content_types(unpacked_dir: Path, dest: str) -> None:
         content_types_path.write_text(content_types, encoding="utf-8")
 
 
-def _add_to_presentation_rels(unpacked_dir: Path, dest: str) -> str:
+def _add_to_presentation_rels(
+    unpacked_dir: Path, dest: str, graph: PackageRelationshipGraph
+) -> str:
     pres_rels_path = unpacked_dir / "ppt" / "_rels" / "presentation.xml.rels"
-    pres_rels = pres_rels_path.read_text(encoding="utf-8")
+    relationships = graph.relationships_from("ppt/presentation.xml")
 
-    rids = [int(m) for m in re.findall(r'Id="rId(\d+)"', pres_rels)]
+    for rel in relationships:
+        if rel.part == f"ppt/slides/{dest}":
+            return rel.id
+
+    rids = [int(m.group(1)) for rel in relationships
+            if rel.id and (m := re.fullmatch(r"rId(\d+)", rel.id))]
     next_rid = max(rids) + 1 if rids else 1
     rid = f"rId{next_rid}"
 
     new_rel = f'<Relationship Id="{rid}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/slide" Target="slides/{dest}"/>'
 
-    if f"slides/{dest}" not in pres_rels:
-        pres_rels = pres_rels.replace("</Relationships>", f"  {new_rel}\n</Relationships>")
-        pres_rels_path.write_text(pres_rels, encoding="utf-8")
+    pres_rels = pres_rels_path.read_text(encoding="utf-8")
+    pres_rels = pres_rels.replace("</Relationships>", f"  {new_rel}\n</Relationships>")
+    pres_rels_path.write_text(pres_rels, encoding="utf-8")
+    graph.reload("ppt/_rels/presentation.xml.rels")
 
     return rid
 
@@ -5,7 +5,7 @@ Labels each thumbnail with its XML filename (e.g., slide1.xml).
 Hidden slides are shown with a placeholder pattern.
 
 Usage:
-    python thumbnail.py input.pptx [output_prefix] [--cols N]
+    python thumbnail.py input.pptx [input.pptx ...] [output_prefix] [--cols N]
 
 Examples:
     python thumbnail.py presentation.pptx
@@ -13,6 +13,9 @@ Examples:
 
     python thumbnail.py template.pptx grid --cols 4
     # Creates: grid.jpg (or grid-1.jpg, grid-2.jpg for large decks)
+
+    python thumbnail.py a.pptx b.pptx grid
+    # Creates: grid-a.jpg, grid-b.jpg; LibreOffice starts once for both
 """
 
 import argparse
@@ -23,7 +26,7 @@ import zipfile
 from pathlib import Path
 
 import defusedxml.minidom
-from office.soffice import get_soffice_env
+from office.soffice import convert_batch
 from PIL import Image, ImageDraw, ImageFont
 
 THUMBNAIL_WIDTH = 300
@@ -41,12 +44,12 @@ def main():
     parser = argparse.ArgumentParser(
         description="Create thumbnail grids from PowerPoint slides."
     )
-    parser.add_argument("input", help="Input PowerPoint file (.pptx)")
     parser.add_argument(
-        "output_prefix",
-        nargs="?",
-        default="thumbnails",
-        help="Output prefix for image files (default: thumbnails)",
+        "paths",
+        nargs="+",
+        metavar="input",
+        help="Input PowerPoint file(s) (.pptx), then optionally an output "
+        "prefix for image files (default: thumbnails)",
     )
     parser.add_argument(
         "--cols",
@@ -61,36 +64,65 @@ def main():
     if args.cols > MAX_COLS:
         print(f"Warning: Columns limited to {MAX_COLS}")
 
-    input_path = Path(args.input)
-    if not input_path.exists() or input_path.suffix.lower() != ".pptx":
-        print(f"Error: Invalid PowerPoint file: {args.input}", file=sys.stderr)
+    inputs, output_prefix = args.paths, "thumbnails"
+    if len(inputs) > 1 and Path(inputs[-1]).suffix.lower() != ".pptx":
+        *inputs, output_prefix = inputs
+
+    input_paths = [Path(name) for name in inputs]
+    for input_path in input_paths:
+        if not input_path.exists() or input_path.suffix.lower() != ".pptx":
+            print(f"Error: Invalid PowerPoint file: {input_path}", file=sys.stderr)
+            sys.exit(1)
+    stems = [input_path.stem for input_path in input_paths]
+    if len(set(stems)) < len(stems):
+        print("Error: Input files must have different names", file=sys.stderr)
         sys.exit(1)
 
-    output_path = Path(f"{args.output_prefix}.jpg")
-
+    failed = False
     try:
-        slide_info = get_slide_info(input_path)
-
         with tempfile.TemporaryDirectory() as temp_dir:
             temp_path = Path(temp_dir)
-            visible_images = convert_to_images(input_path, temp_path)
+            conversions = convert_to_pdfs(input_paths, temp_path)
+
+            for number, result in enumerate(conversions):
+                if len(input_paths) == 1:
+                    output_path = Path(f"{output_prefix}.jpg")
+                else:
+                    output_path = Path(f"{output_prefix}-{result.input.stem}.jpg")
 
-            if not visible_images and not any(s["hidden"] for s in slide_info):
-                print("Error: No slides found", file=sys.stderr)
-                sys.exit(1)
+                if not result.ok:
+                    print(
+                        f"Error: {result.input}: PDF conversion failed: {result.error}",
+                        file=sys.stderr,
+                    )
+                    failed = True
+                    continue
 
-            slides = build_slide_list(slide_info, visible_images, temp_path)
+                slide_info = get_slide_info(result.input)
+                deck_path = temp_path / f"deck{number}"
+                deck_path.mkdir()
+                visible_images = pdf_to_images(result.output, deck_path)
 
-            grid_files = create_grids(slides, cols, THUMBNAIL_WIDTH, output_path)
+                if not visible_images and not any(s["hidden"] for s in slide_info):
+                    print(f"Error: {result.input}: No slides found", file=sys.stderr)
+                    failed = True
+                    continue
 
-            print(f"Created {len(grid_files)} grid(s):")
-            for grid_file in grid_files:
-                print(f"  {grid_file}")
+                slides = build_slide_list(slide_info, visible_images, deck_path)
+
+                grid_files = create_grids(slides, cols, THUMBNAIL_WIDTH, output_path)
+
+                print(f"Created {len(grid_files)} grid(s):")
+                for grid_file in grid_files:
+                    print(f"  {grid_file}")
 
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
+    if failed:
+        sys.exit(1)
+
 
 def get_slide_info(pptx_path: Path) -> list[dict]:
     with zipfile.ZipFile(pptx_path, "r") as zf:
@@ -155,26 +187,24 @@ def create_hidden_placeholder(size: tuple[int, int]) -> Image.Image:
     return img
 
 
-def convert_to_images(pptx_path: Path, temp_dir: Path) -> list[Path]:
-    pdf_path = temp_dir / f"{pptx_path.stem}.pdf"
+def convert_to_images(pptx_path: Path, temp_dir: Path, pool=None) -> list[Path]:
+    (result,) = convert_to_pdfs([pptx_path], temp_dir, pool)
+    if not result.ok:
+        raise RuntimeError(f"PDF conversion failed: {result.error}")
+    return pdf_to_images(result.output, temp_dir)
 
-    result = subprocess.run(
-        [
-            "soffice",
-            "--headless",
-            "--convert-to",
-            "pdf",
-            "--outdir",
-            str(temp_dir),
-            str(pptx_path),
-        ],
-        capture_output=True,
-        text=True,
-        env=get_soffice_env(),
+
+def convert_to_pdfs(pptx_paths: list[Path], temp_dir: Path, pool=None) -> list:
+    """Convert every deck to a PDF in temp_dir with a single soffice run,
+    returning a ConversionResult per deck."""
+    return convert_batch(
+        {path: temp_dir / f"{path.stem}.pdf" for path in pptx_paths},
+        "pdf",
+        pool=pool,
     )
-    if result.returncode != 0 or not pdf_path.exists():
-        raise RuntimeError("PDF conversion failed")
 
+
+def pdf_to_images(pdf_path: Path, temp_dir: Path) -> list[Path]:
     result = subprocess.run(
         [
             "pdftoppm",
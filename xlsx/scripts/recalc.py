@@ -1,6 +1,7 @@
 """
 Excel Formula Recalculation Script
-Recalculates all formulas in an Excel file using LibreOffice
+Recalculates all formulas in an Excel file, in process where possible and
+with LibreOffice otherwise
 """
 
 import json
@@ -8,11 +9,35 @@ import os
 import platform
 import subprocess
 import sys
+import traceback
 from pathlib import Path
 
-from office.soffice import get_soffice_env
+from office.soffice import SofficeError, get_soffice_env
+from recalc_engine import (
+    ExcelError,
+    Model,
+    Unsupported,
+    collector_paused,
+    discard_state,
+    load_state,
+    save_state,
+    write_values,
+)
 
 from openpyxl import load_workbook
+from openpyxl.utils.cell import get_column_letter
+
+ENGINES = ("auto", "python", "libreoffice")
+
+EXCEL_ERRORS = [
+    "#VALUE!",
+    "#DIV/0!",
+    "#REF!",
+    "#NAME?",
+    "#NULL!",
+    "#NUM!",
+    "#N/A",
+]
 
 MACRO_DIR_MACOS = "~/Library/Application Support/LibreOffice/4/user/basic/Standard"
 MACRO_DIR_LINUX = "~/.config/libreoffice/4/user/basic/Standard"
@@ -67,77 +92,69 @@ def setup_libreoffice_macro():
         return False
 
 
-def recalc(filename, timeout=30):
-    if not Path(filename).exists():
-        return {"error": f"File {filename} does not exist"}
+def recalc(filename, timeout=30, pool=None, engine="auto", incremental=True):
+    """Recalculate and report on an Excel file.
 
-    abs_path = str(Path(filename).absolute())
+    engine picks who computes the formulas: "python" evaluates them in
+    process with recalc_engine, "libreoffice" runs them through LibreOffice,
+    and "auto" uses the in-process engine unless the workbook needs
+    something it does not implement, then falls back to LibreOffice. Any
+    other failure of the in-process engine is reported as an error, with
+    its traceback on stderr, rather than hidden behind the fallback.
 
-    if not setup_libreoffice_macro():
-        return {"error": "Failed to setup LibreOffice macro"}
+    The in-process engine keeps what it computed in a hidden
+    ".<name>.recalc.json" beside the workbook. On the next run only the
+    cells an edit reaches are recomputed and only the sheets holding them
+    are rewritten; incremental=False ignores that state and recalculates
+    everything.
 
-    cmd = [
-        "soffice",
-        "--headless",
-        "--norestore",
-        "vnd.sun.star.script:Standard.Module1.RecalculateAndSave?language=Basic&location=application",
-        abs_path,
-    ]
+    With a SofficePool from office.soffice, LibreOffice work runs on one of
+    its warm instances instead of a freshly started soffice.
 
-    if platform.system() == "Linux":
-        cmd = ["timeout", str(timeout)] + cmd
-    elif platform.system() == "Darwin" and has_gtimeout():
-        cmd = ["gtimeout", str(timeout)] + cmd
+    Either way the error report covers every cell, constants as well as
+    formula results: a cell typed as "#N/A" is counted like a formula that
+    returns #N/A.
+    """
+    if not Path(filename).exists():
+        return {"error": f"File {filename} does not exist"}
+    if engine not in ENGINES:
+        return {"error": f"Unknown engine {engine!r}, expected one of {', '.join(ENGINES)}"}
 
-    result = subprocess.run(cmd, capture_output=True, text=True, env=get_soffice_env())
+    abs_path = str(Path(filename).absolute())
 
-    if result.returncode != 0 and result.returncode != 124:  
-        error_msg = result.stderr or "Unknown error during recalculation"
-        if "Module1" in error_msg or "RecalculateAndSave" not in error_msg:
-            return {"error": "LibreOffice macro not configured properly"}
-        return {"error": error_msg}
+    if engine != "libreoffice":
+        try:
+            return _recalc_in_process(abs_path, incremental)
+        except Unsupported as e:
+            if engine == "python":
+                return {"error": f"In-process recalculation failed: {e}"}
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            return {"error": f"In-process recalculation failed: {type(e).__name__}: {e}"}
+
+    discard_state(abs_path)
+
+    if pool is not None:
+        try:
+            pool.recalc(abs_path, timeout=timeout)
+        except SofficeError as e:
+            return {"error": str(e)}
+    else:
+        error = _recalc_with_macro(abs_path, timeout)
+        if error is not None:
+            return error
 
     try:
         wb = load_workbook(filename, data_only=True)
-
-        excel_errors = [
-            "#VALUE!",
-            "#DIV/0!",
-            "#REF!",
-            "#NAME?",
-            "#NULL!",
-            "#NUM!",
-            "#N/A",
-        ]
-        error_details = {err: [] for err in excel_errors}
-        total_errors = 0
-
+        cells = []
         for sheet_name in wb.sheetnames:
             ws = wb[sheet_name]
             for row in ws.iter_rows():
                 for cell in row:
-                    if cell.value is not None and isinstance(cell.value, str):
-                        for err in excel_errors:
-                            if err in cell.value:
-                                location = f"{sheet_name}!{cell.coordinate}"
-                                error_details[err].append(location)
-                                total_errors += 1
-                                break
-
+                    cells.append((f"{sheet_name}!{cell.coordinate}", cell.value))
         wb.close()
 
-        result = {
-            "status": "success" if total_errors == 0 else "errors_found",
-            "total_errors": total_errors,
-            "error_summary": {},
-        }
-
-        for err_type, locations in error_details.items():
-            if locations:
-                result["error_summary"][err_type] = {
-                    "count": len(locations),
-                    "locations": locations[:20],  
-                }
+        result = _error_report(cells)
 
         wb_formulas = load_workbook(filename, data_only=False)
         formula_count = 0
@@ -161,24 +178,151 @@ def recalc(filename, timeout=30):
         return {"error": str(e)}
 
 
+def _recalc_in_process(abs_path, incremental=True):
+    """Compute the formulas with recalc_engine and store the results;
+    raises Unsupported when the workbook needs LibreOffice."""
+    with collector_paused():
+        model = load_state(abs_path) if incremental else None
+        changed = model.refresh(abs_path) if model is not None else None
+        if changed is None:
+            model = Model.load(abs_path)
+            model.compile()
+            model.calculate()
+            recalculated = len(model.formulas)
+            write_values(abs_path, model.values, model.formulas)
+            save_state(model, abs_path)
+        else:
+            recomputed = model.recalculate(changed)
+            recalculated = len(recomputed)
+            # A stale sheet gets all its results stored, any other sheet
+            # only the ones that were recomputed.
+            stale = model.stale_sheets
+            cells = [key for key in recomputed if key[0] not in stale]
+            cells += [key for key in model.formulas if key[0] in stale]
+            if cells:
+                write_values(abs_path, model.values, cells)
+            if changed or cells:
+                save_state(model, abs_path)
+
+        sheet_order = {title: index for index, title in enumerate(model.sheets)}
+
+        def position(key):
+            return sheet_order[key[0]], key[1], key[2]
+
+        result = _error_report(
+            (
+                f"{sheet}!{get_column_letter(col)}{row}",
+                value.code if isinstance(value, ExcelError) else value,
+            )
+            for (sheet, row, col), value in (
+                (key, model.values.get(key))
+                for key in sorted(model.error_cells, key=position)
+            )
+        )
+        result["total_formulas"] = len(model.formulas)
+        result["recalculated_formulas"] = recalculated
+        if model.circular:
+            result["circular_references"] = [
+                f"{sheet}!{get_column_letter(col)}{row}"
+                for sheet, row, col in sorted(model.circular, key=position)
+            ]
+        return result
+
+
+def _error_report(cells):
+    """Status and error summary for (location, value) pairs in sheet order."""
+    error_details = {err: [] for err in EXCEL_ERRORS}
+    total_errors = 0
+
+    for location, value in cells:
+        if value is not None and isinstance(value, str):
+            for err in EXCEL_ERRORS:
+                if err in value:
+                    error_details[err].append(location)
+                    total_errors += 1
+                    break
+
+    result = {
+        "status": "success" if total_errors == 0 else "errors_found",
+        "total_errors": total_errors,
+        "error_summary": {},
+    }
+
+    for err_type, locations in error_details.items():
+        if locations:
+            result["error_summary"][err_type] = {
+                "count": len(locations),
+                "locations": locations[:20],
+            }
+
+    return result
+
+
+def _recalc_with_macro(abs_path, timeout):
+    if not setup_libreoffice_macro():
+        return {"error": "Failed to setup LibreOffice macro"}
+
+    cmd = [
+        "soffice",
+        "--headless",
+        "--norestore",
+        "vnd.sun.star.script:Standard.Module1.RecalculateAndSave?language=Basic&location=application",
+        abs_path,
+    ]
+
+    if platform.system() == "Linux":
+        cmd = ["timeout", str(timeout)] + cmd
+    elif platform.system() == "Darwin" and has_gtimeout():
+        cmd = ["gtimeout", str(timeout)] + cmd
+
+    result = subprocess.run(cmd, capture_output=True, text=True, env=get_soffice_env())
+
+    if result.returncode != 0 and result.returncode != 124:  
+        error_msg = result.stderr or "Unknown error during recalculation"
+        if "Module1" in error_msg or "RecalculateAndSave" not in error_msg:
+            return {"error": "LibreOffice macro not configured properly"}
+        return {"error": error_msg}
+
+    return None
+
+
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: python recalc.py <excel_file> [timeout_seconds]")
-        print("\nRecalculates all formulas in an Excel file using LibreOffice")
+    args = sys.argv[1:]
+    engine = "auto"
+    incremental = "--full" not in args
+    args = [arg for arg in args if arg != "--full"]
+    if "--engine" in args:
+        index = args.index("--engine")
+        engine = args[index + 1] if index + 1 < len(args) else ""
+        del args[index:index + 2]
+
+    if not args or engine not in ENGINES:
+        print(
+            "Usage: python recalc.py <excel_file> [timeout_seconds]"
+            " [--engine auto|python|libreoffice] [--full]"
+        )
+        print("\nRecalculates all formulas in an Excel file")
+        print("\nEngines:")
+        print("  - auto (default): in process, LibreOffice for what it can't evaluate")
+        print("  - python: in process only, an error if the workbook needs LibreOffice")
+        print("  - libreoffice: always LibreOffice")
+        print("\nIn process, only formulas affected by edits since the last run are")
+        print("recomputed; --full recalculates everything.")
         print("\nReturns JSON with error details:")
         print("  - status: 'success' or 'errors_found'")
-        print("  - total_errors: Total number of Excel errors found")
+        print("  - total_errors: Excel errors found in any cell, constants included")
         print("  - total_formulas: Number of formulas in the file")
         print("  - error_summary: Breakdown by error type with locations")
         print("    - #VALUE!, #DIV/0!, #REF!, #NAME?, #NULL!, #NUM!, #N/A")
+        print("  - recalculated_formulas: Formulas computed this run (in process)")
+        print("  - circular_references: Cells on reference cycles, if any")
         sys.exit(1)
 
-    filename = sys.argv[1]
-    timeout = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+    filename = args[0]
+    timeout = int(args[1]) if len(args) > 1 else 30
 
-    result = recalc(filename, timeout)
+    result = recalc(filename, timeout, engine=engine, incremental=incremental)
     print(json.dumps(result, indent=2))
 
-
 if __name__ == "__main__":
     main()
@@ -0,0 +1,25 @@
+"""
+In-process formula evaluation for recalc.py.
+
+Computes a workbook's formulas in Python, without starting LibreOffice, for
+the functions and references listed in functions.py and parser.py. Anything
+outside that subset raises Unsupported so the caller can fall back to
+LibreOffice.
+"""
+
+from .engine import Model, collector_paused
+from .parser import Unsupported
+from .state import discard_state, load_state, save_state
+from .values import ExcelError
+from .writer import write_values
+
+__all__ = [
+    "ExcelError",
+    "Model",
+    "Unsupported",
+    "collector_paused",
+    "discard_state",
+    "load_state",
+    "save_state",
+    "write_values",
+]
@@ -0,0 +1,861 @@
+"""Evaluate a workbook's formulas in dependency order.
+
+Model.load reads cell values and formulas with reader.py. compile() turns
+each formula into a closure over the model's value table and records what
+it reads: single cells and rectangular ranges. calculate() orders the
+formula cells so every cell is computed after the formula cells it reads
+(Kahn's algorithm); cells left over sit on or behind a reference cycle.
+The cycles themselves are found as strongly connected components, their
+cells get #VALUE! (LibreOffice's Err:522 saved to xlsx), and evaluation
+continues with whatever depended on them.
+
+After an edit, recalculate() recomputes only the dirty cone: the changed
+cells, the formulas reading them, the formulas reading those, and so on.
+A _ReaderIndex answers "which formulas read this cell" for that walk; it is
+built on first use and kept up to date as formulas change. refresh() finds
+the changed cells of an edited workbook by re-reading only the sheet parts
+whose bytes differ from the ones the model was saved with (see state.py).
+"""
+
+import bisect
+import contextlib
+import functools
+import gc
+import inspect
+import os
+import zipfile
+from collections import defaultdict, deque
+
+from openpyxl.utils.cell import get_column_letter
+
+from .functions import FUNCTIONS, power_of
+from .parser import Unsupported, parse_formula, shift, template_key
+from .reader import iter_cells, read_shared_strings, read_workbook
+from .values import (
+    DIV0,
+    ERRORS,
+    NA,
+    NAME,
+    NUM,
+    REF,
+    VALUE,
+    ExcelError,
+    Range,
+    compare,
+    mentions_error,
+    same_value,
+    to_number,
+    to_text,
+)
+
+# Functions whose result changes without any cell changing.
+_VOLATILE = frozenset({"TODAY", "NOW"})
+
+# A range spanning more columns than this is indexed once per sheet rather
+# than once per column it covers.
+_WIDE = 16
+
+
+class Model:
+    def __init__(self):
+        self.sheets = []
+        self.values = {}
+        self.formulas = {}
+        self.names = {}
+        self.dimensions = {}
+        self.compiled = {}
+        self.precedents = {}
+        self.circular = set()
+        self.volatile = set()
+        # Every cell whose value shows an error, constants included, so a
+        # report built from it covers the same cells as a scan of the sheet.
+        self.error_cells = set()
+        # What refresh() compares an edited workbook against: the file's
+        # (mtime_ns, size) and each sheet part's (CRC-32, size) when saved.
+        self.signature = None
+        self.part_signatures = {}
+        # Sheets whose stored formula results don't match the model, as
+        # found by the last refresh(); they need writing even if nothing
+        # on them is recalculated.
+        self.stale_sheets = set()
+        self._readers = None
+        self._sheet_titles = {}
+        self._range_cache = {}
+        self._templates = {}
+        # Compiled formulas capture this reader rather than the model, so
+        # dropping a model frees it by reference counting alone.
+        self.range = _range_reader(self.values, self.dimensions, self._range_cache)
+
+    @classmethod
+    def load(cls, path):
+        """Cells of every worksheet in the workbook at path."""
+        model = cls()
+        with zipfile.ZipFile(path) as archive:
+            workbook = read_workbook(archive)
+            if workbook.date1904:
+                raise Unsupported("1904 date system")
+            shared_strings = read_shared_strings(archive)
+            for title, part in workbook.sheets:
+                model._load_sheet(title, iter_cells(archive, part, shared_strings))
+        model.names = workbook.names
+        return model
+
+    def _load_sheet(self, title, cells):
+        self.add_sheet(title)
+        values = self.values
+        formulas = self.formulas
+        max_row = max_col = 0
+        for row, col, value, formula in cells:
+            if row > max_row:
+                max_row = row
+            if col > max_col:
+                max_col = col
+            if formula is not None:
+                formulas[(title, row, col)] = formula
+            else:
+                values[(title, row, col)] = value
+        self.dimensions[title] = (max_row, max_col)
+
+    def add_sheet(self, title):
+        self.sheets.append(title)
+        self._sheet_titles[title.lower()] = title
+
+    # ---- compilation ----------------------------------------------------------
+
+    def compile(self):
+        """Compile every formula; Unsupported names the first one that can't be."""
+        with collector_paused():
+            for key, formula in self.formulas.items():
+                self.compile_cell(key, formula)
+
+    def compile_cell(self, key, formula):
+        reads = []
+        try:
+            node = self._parse(key, formula)
+            evaluate = self._compile(node, key, reads, in_argument=False)
+        except Unsupported as e:
+            raise Unsupported(f"{_location(key)}: {e}") from None
+        self.compiled[key] = evaluate
+        self.precedents[key] = reads
+
+    def _parse(self, key, formula):
+        """Formula tree, parsed once per fill pattern: a formula copied down
+        or across reuses the first copy's tree, shifted to its own cell."""
+        sheet, row, col = key
+        template = (sheet, template_key(formula, row, col))
+        cached = self._templates.get(template)
+        if cached is None:
+            node = parse_formula(formula, sheet)
+            self._templates[template] = (node, row, col)
+            return node
+        node, origin_row, origin_col = cached
+        return shift(node, row - origin_row, col - origin_col)
+
+    def _sheet(self, name):
+        return self._sheet_titles.get(name.lower()) if name is not None else None
+
+    def _compile(self, node, key, reads, in_argument, names_seen=()):
+        kind = node[0]
+        if kind in ("num", "str", "bool"):
+            value = node[1]
+            return lambda: value
+        if kind == "missing":
+            return lambda: None
+        if kind == "err":
+            return _raiser(ERRORS.get(node[1], VALUE))
+
+        if kind == "ref":
+            sheet = self._sheet(node[1])
+            if sheet is None:
+                return _raiser(REF)
+            cell = (sheet, node[2], node[3])
+            reads.append(("cell", cell))
+            if in_argument:
+                read_range = self.range
+                return lambda: read_range(sheet, cell[1], cell[2], cell[1], cell[2])
+            values = self.values
+
+            def cell_value():
+                value = values.get(cell)
+                if value.__class__ is ExcelError:
+                    raise value
+                return value
+
+            return cell_value
+
+        if kind == "range":
+            sheet = self._sheet(node[1])
+            if sheet is None:
+                return _raiser(REF)
+            _, _, r1, c1, r2, c2, _ = node
+            reads.append(("range", (sheet, r1, c1, r2, c2)))
+            read_range = self.range
+            return lambda: read_range(sheet, r1, c1, r2, c2)
+
+        if kind == "name":
+            return self._compile_name(node[1], key, reads, in_argument, names_seen)
+
+        if kind == "array":
+            rows = []
+            for row in node[1]:
+                values = []
+                for literal in row:
+                    if literal[0] == "err":
+                        values.append(ERRORS.get(literal[1], VALUE))
+                    elif literal[0] in ("num", "str", "bool"):
+                        values.append(literal[1])
+                    else:
+                        raise Unsupported("array constant")
+                rows.append(values)
+            array = Range(rows)
+            return lambda: array
+
+        if kind == "neg":
+            operand = self._compile(node[1], key, reads, False, names_seen)
+            return _unary(operand, lambda value: -to_number(value))
+        if kind == "pct":
+            operand = self._compile(node[1], key, reads, False, names_seen)
+            return _unary(operand, lambda value: to_number(value) / 100)
+
+        if kind == "op":
+            operator = node[1]
+            if operator not in _OPERATORS:
+                raise Unsupported(f"operator {operator!r}")
+            left = self._compile(node[2], key, reads, False, names_seen)
+            right = self._compile(node[3], key, reads, False, names_seen)
+            return _binary(_OPERATORS[operator], left, right)
+
+        if kind == "call":
+            return self._compile_call(node[1], node[2], key, reads, names_seen)
+
+        raise Unsupported(f"node {kind}")
+
+    def _compile_name(self, name, key, reads, in_argument, names_seen):
+        upper = name.upper()
+        definition = self.names.get((key[0], upper), self.names.get((None, upper)))
+        if definition is None:
+            return _raiser(NAME)
+        if upper in names_seen:
+            raise Unsupported(f"name {name} refers to itself")
+        node = parse_formula("=" + definition, None)
+        return self._compile(node, key, reads, in_argument, names_seen + (upper,))
+
+    def _compile_call(self, name, args, key, reads, names_seen):
+        if name in ("ROW", "COLUMN") and not args:
+            position = key[1] if name == "ROW" else key[2]
+            return lambda: position
+        if name not in FUNCTIONS:
+            raise Unsupported(f"function {name}")
+        implementation, lazy = FUNCTIONS[name]
+        if not _accepts(implementation, len(args)):
+            raise Unsupported(f"{name} with {len(args)} arguments")
+        if name in _VOLATILE:
+            self.volatile.add(key)
+
+        compiled = [
+            self._compile(arg, key, reads, True, names_seen) for arg in args
+        ]
+        if lazy:
+            return lambda: implementation(*compiled)
+        return lambda: implementation(*[arg() for arg in compiled])
+
+    # ---- evaluation -------------------------------------------------------------
+
+    def evaluate(self, key):
+        try:
+            result = self.compiled[key]()
+        except ExcelError as e:
+            # Errors are shared singletons; don't let them pin frames.
+            e.__traceback__ = e.__context__ = None
+            return e
+        except RecursionError:
+            return NUM
+        return _cell_result(result, key)
+
+    def calculate(self):
+        """Compute every formula cell; returns the cells on reference cycles."""
+        if len(self.compiled) != len(self.formulas):
+            self.compile()
+        self._range_cache.clear()
+        with collector_paused():
+            keys = list(self.formulas)
+            dependents = defaultdict(list)
+            for key, found in self.formula_precedents(keys).items():
+                for precedent in found:
+                    dependents[precedent].append(key)
+            order, circular = _evaluation_order(keys, dependents)
+            for key in circular:
+                self.values[key] = VALUE
+            for key in order:
+                self.values[key] = self.evaluate(key)
+        self._range_cache.clear()
+        self.circular = circular
+        self.error_cells = {key for key, value in self.values.items() if mentions_error(value)}
+        return circular
+
+    def formula_precedents(self, keys):
+        """For each formula cell in keys, the formula cells it reads."""
+        formulas = self.formulas
+        by_column = defaultdict(list)
+        for sheet, row, col in formulas:
+            by_column[(sheet, col)].append(row)
+        for rows in by_column.values():
+            rows.sort()
+        columns_by_sheet = defaultdict(list)
+        for sheet, col in by_column:
+            columns_by_sheet[sheet].append(col)
+        for columns in columns_by_sheet.values():
+            columns.sort()
+
+        result = {}
+        for key in keys:
+            found = set()
+            for kind, target in self.precedents[key]:
+                if kind == "cell":
+                    if target in formulas:
+                        found.add(target)
+                    continue
+                sheet, r1, c1, r2, c2 = target
+                columns = columns_by_sheet.get(sheet, ())
+                start = bisect.bisect_left(columns, c1)
+                end = len(columns) if c2 is None else bisect.bisect_right(columns, c2)
+                for col in columns[start:end]:
+                    rows = by_column[(sheet, col)]
+                    low = bisect.bisect_left(rows, r1)
+                    high = len(rows) if r2 is None else bisect.bisect_right(rows, r2)
+                    found.update((sheet, row, col) for row in rows[low:high])
+            result[key] = found
+        return result
+
+    # ---- incremental recalculation ---------------------------------------------
+
+    def update(self, changes: dict):
+        """Edit cells and recompute what depends on them. changes maps
+        (sheet, row, col) to a constant, None to clear the cell, or "=..."
+        text for a formula; returns the formula cells recomputed."""
+        changed = set(changes)
+        for key, value in changes.items():
+            if isinstance(value, str) and value.startswith("="):
+                if self.formulas.get(key) != value:
+                    self._set_formula(key, value)
+            else:
+                self._set_constant(key, value)
+            if self._extend(key):
+                changed |= self._reader_index().open_readers[key[0]]
+        return self.recalculate(changed)
+
+    def refresh(self, path):
+        """Bring the model in line with the workbook at path, edited since
+        the model was saved; returns the cells that changed, or None when
+        sheets or defined names changed and only a full recalculation will
+        do. Sheets whose parts are byte-identical to the saved ones are not
+        read at all, nor is anything when the file itself is untouched."""
+        self.stale_sheets = set()
+        if self.signature is not None and file_signature(path) == self.signature:
+            return set()
+        changed = set()
+        with zipfile.ZipFile(path) as archive:
+            workbook = read_workbook(archive)
+            if workbook.date1904:
+                raise Unsupported("1904 date system")
+            if [title for title, _ in workbook.sheets] != self.sheets or workbook.names != self.names:
+                return None
+            signatures = part_signatures(archive, workbook.sheets)
+            shared_strings = None
+            for title, part in workbook.sheets:
+                if signatures[title] == self.part_signatures.get(title):
+                    continue
+                if shared_strings is None:
+                    shared_strings = read_shared_strings(archive)
+                changed |= self._reload_sheet(title, iter_cells(archive, part, shared_strings))
+        self.part_signatures = signatures
+        self.signature = None
+        return changed
+
+    def _reload_sheet(self, title, cells):
+        """Apply a sheet's cells as read from the file; returns the keys
+        whose value or formula differs from the model's."""
+        values = self.values
+        formulas = self.formulas
+        changed = set()
+        seen = set()
+        stale = False
+        max_row = max_col = 0
+        for row, col, value, formula in cells:
+            key = (title, row, col)
+            seen.add(key)
+            if row > max_row:
+                max_row = row
+            if col > max_col:
+                max_col = col
+            if formula is not None:
+                if formulas.get(key) != formula:
+                    self._set_formula(key, formula)
+                    changed.add(key)
+                elif not same_value("" if value is None else value, values.get(key)):
+                    # An empty <v> is how an empty text result is stored.
+                    stale = True
+            elif key in formulas or key not in values or not same_value(value, values[key]):
+                self._set_constant(key, value)
+                changed.add(key)
+
+        for key in [key for key in formulas if key[0] == title and key not in seen]:
+            self._set_constant(key, None)
+            changed.add(key)
+        for key in [key for key in values if key[0] == title and key not in seen]:
+            self._set_constant(key, None)
+            changed.add(key)
+
+        if self.dimensions.get(title) != (max_row, max_col):
+            self.dimensions[title] = (max_row, max_col)
+            changed |= self._reader_index().open_readers[title]
+        if stale:
+            self.stale_sheets.add(title)
+        return changed
+
+    def _set_formula(self, key, formula):
+        index = self._reader_index()
+        self._drop_formula(key)
+        self.values.pop(key, None)
+        self.formulas[key] = formula
+        self.compile_cell(key, formula)
+        index.add(key, self.precedents[key])
+
+    def _set_constant(self, key, value):
+        self._drop_formula(key)
+        if value is None:
+            self.values.pop(key, None)
+        else:
+            self.values[key] = value
+
+    def _drop_formula(self, key):
+        if self.formulas.pop(key, None) is None:
+            return
+        self.compiled.pop(key, None)
+        reads = self.precedents.pop(key, None)
+        if reads is not None:
+            self._reader_index().remove(key, reads)
+        self.volatile.discard(key)
+        self.circular.discard(key)
+
+    def _extend(self, key):
+        """Grow a sheet's dimensions to cover a cell; whether they grew."""
+        sheet, row, col = key
+        max_row, max_col = self.dimensions.get(sheet, (0, 0))
+        if row <= max_row and col <= max_col:
+            return False
+        self.dimensions[sheet] = (max(row, max_row), max(col, max_col))
+        return True
+
+    def recalculate(self, changed):
+        """Recompute the formulas that read the changed cells, directly or
+        through other formulas, plus any volatile ones; returns them."""
+        if not changed and not self.volatile:
+            return set()
+        formulas = self.formulas
+        index = self._reader_index()
+        cone = {key for key in changed if key in formulas} | self.volatile
+        dependents = {}
+        queue = deque(set(changed) | cone)
+        expanded = set()
+        while queue:
+            cell = queue.popleft()
+            if cell in expanded:
+                continue
+            expanded.add(cell)
+            readers = index.readers_of(cell)
+            if cell in formulas:
+                dependents[cell] = readers
+            for reader in readers:
+                if reader not in cone:
+                    cone.add(reader)
+                    queue.append(reader)
+
+        with collector_paused():
+            for key in cone:
+                if key not in self.compiled:
+                    self.compile_cell(key, formulas[key])
+            self._range_cache.clear()
+            order, circular = _evaluation_order(cone, dependents)
+            for key in circular:
+                self.values[key] = VALUE
+            for key in order:
+                self.values[key] = self.evaluate(key)
+            self._range_cache.clear()
+
+        self.circular = (self.circular - cone) | circular
+        for key in cone.union(changed):
+            if mentions_error(self.values.get(key)):
+                self.error_cells.add(key)
+            else:
+                self.error_cells.discard(key)
+        return cone
+
+    def _reader_index(self):
+        if self._readers is None:
+            self._readers = _ReaderIndex()
+            for key, reads in self.precedents.items():
+                self._readers.add(key, reads)
+        return self._readers
+
+
+class _ReaderIndex:
+    """Formula cells by the cells they read. Single cells are looked up
+    directly; ranges are filed under each column they cover, sorted by
+    first row, or per sheet when wider than _WIDE columns or open-ended."""
+
+    def __init__(self):
+        self.cells = defaultdict(set)
+        self.columns = defaultdict(list)  # (sheet, col) -> [(r1, r2, key)]
+        self.wide = defaultdict(list)  # sheet -> [(r1, c1, r2, c2, key)]
+        # Formulas reading a whole row or column, whose reach moves with
+        # the sheet's dimensions.
+        self.open_readers = defaultdict(set)
+
+    def add(self, key, reads):
+        for kind, target in reads:
+            if kind == "cell":
+                self.cells[target].add(key)
+                continue
+            sheet, r1, c1, r2, c2 = target
+            if r2 is None or c2 is None:
+                self.open_readers[sheet].add(key)
+            if c2 is None or c2 - c1 >= _WIDE:
+                self.wide[sheet].append((r1, c1, r2, c2, key))
+                continue
+            last = _UNBOUNDED if r2 is None else r2
+            for col in range(c1, c2 + 1):
+                bisect.insort(self.columns[(sheet, col)], (r1, last, key))
+
+    def remove(self, key, reads):
+        for kind, target in reads:
+            if kind == "cell":
+                self.cells[target].discard(key)
+                continue
+            sheet, r1, c1, r2, c2 = target
+            self.open_readers[sheet].discard(key)
+            if c2 is None or c2 - c1 >= _WIDE:
+                with contextlib.suppress(ValueError):
+                    self.wide[sheet].remove((r1, c1, r2, c2, key))
+                continue
+            last = _UNBOUNDED if r2 is None else r2
+            for col in range(c1, c2 + 1):
+                with contextlib.suppress(ValueError):
+                    self.columns[(sheet, col)].remove((r1, last, key))
+
+    def readers_of(self, cell):
+        sheet, row, col = cell
+        found = set(self.cells.get(cell, ()))
+        entries = self.columns.get((sheet, col))
+        if entries:
+            end = bisect.bisect_right(entries, row, key=_first)
+            found.update(key for r1, r2, key in entries[:end] if row <= r2)
+        for r1, c1, r2, c2, key in self.wide.get(sheet, ()):
+            if r1 <= row and (r2 is None or row <= r2) and c1 <= col and (c2 is None or col <= c2):
+                found.add(key)
+        return found
+
+
+_UNBOUNDED = float("inf")
+
+
+def _first(entry):
+    return entry[0]
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def part_signatures(archive, sheets):
+    """Sheet title -> [CRC-32, size] of its part, from the zip directory."""
+    signatures = {}
+    for title, part in sheets:
+        try:
+            info = archive.getinfo(part)
+        except KeyError:
+            signatures[title] = None
+        else:
+            signatures[title] = [info.CRC, info.file_size]
+    return signatures
+
+
+def _evaluation_order(keys, dependents):
+    """(order, circular) for formula cells: order computes each cell after
+    the cells in keys it reads (dependents maps a cell to its readers);
+    circular holds the cells on cycles, which have no such order."""
+    keys = list(keys)
+    waiting = dict.fromkeys(keys, 0)
+    for key in keys:
+        for dependent in dependents.get(key, ()):
+            if dependent in waiting:
+                waiting[dependent] += 1
+
+    order = []
+    ready = deque(key for key in keys if waiting[key] == 0)
+    circular = set()
+    while True:
+        while ready:
+            key = ready.popleft()
+            order.append(key)
+            for dependent in dependents.get(key, ()):
+                if dependent in waiting:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        ready.append(dependent)
+        if len(order) + len(circular) == len(keys):
+            return order, circular
+
+        blocked = [key for key in keys if waiting[key] > 0 and key not in circular]
+        cycle = _cycle_members(blocked, dependents)
+        circular |= cycle
+        for key in cycle:
+            waiting[key] = -1
+        for key in cycle:
+            for dependent in dependents.get(key, ()):
+                if waiting.get(dependent, 0) > 0:
+                    waiting[dependent] -= 1
+                    if waiting[dependent] == 0:
+                        ready.append(dependent)
+
+
+def _range_reader(values, dimensions, cache):
+    def read_range(sheet, r1, c1, r2, c2):
+        """Values of a block of cells; open-ended rows/columns stop at the
+        last used row/column of the sheet."""
+        cache_key = (sheet, r1, c1, r2, c2)
+        block = cache.get(cache_key)
+        if block is None:
+            max_row, max_col = dimensions.get(sheet, (0, 0))
+            last_row = max_row if r2 is None else r2
+            last_col = max_col if c2 is None else c2
+            columns = range(c1, max(last_col, c1) + 1)
+            rows = [
+                [values.get((sheet, row, col)) for col in columns]
+                for row in range(r1, max(last_row, r1) + 1)
+            ]
+            block = Range(rows, sheet, r1, c1)
+            cache[cache_key] = block
+        return block
+
+    return read_range
+
+
+def _cycle_members(blocked, edges):
+    """Cells of blocked on a reference cycle: the strongly connected
+    components with more than one cell, or a cell that reads itself
+    (Tarjan's algorithm, iteratively). edges may point either way, from
+    readers to what they read or back; the components are the same."""
+    nodes = set(blocked)
+    index_of = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    members = set()
+    counter = 0
+
+    for root in blocked:
+        if root in index_of:
+            continue
+        work = [(root, iter([p for p in edges.get(root, ()) if p in nodes]))]
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            for child in children:
+                if child not in index_of:
+                    index_of[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter([p for p in edges.get(child, ()) if p in nodes])))
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[child])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in edges.get(node, ()):
+                        members.update(component)
+    return members
+
+
+@contextlib.contextmanager
+def collector_paused():
+    """Hold off the cyclic garbage collector: compiling and evaluating a
+    large workbook allocates millions of long-lived closures and tuples,
+    and collecting after every few thousand of them costs more than the
+    work itself."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+@functools.lru_cache(maxsize=None)
+def _accepts(implementation, count):
+    try:
+        inspect.signature(implementation).bind(*range(count))
+    except TypeError:
+        return False
+    return True
+
+
+def _location(key):
+    return f"{key[0]}!{get_column_letter(key[2])}{key[1]}"
+
+
+def _raiser(error):
+    def raise_error():
+        raise error
+
+    return raise_error
+
+
+def _cell_result(result, key):
+    """A formula's final value: a block is intersected with the cell's row
+    or column, a blank becomes 0, infinities and NaN become #NUM!."""
+    if result.__class__ is Range:
+        if result.height == 1 and result.width == 1:
+            result = result.rows[0][0]
+        elif result.width == 1 and result.row is not None and 0 <= key[1] - result.row < result.height:
+            result = result.rows[key[1] - result.row][0]
+        elif result.height == 1 and result.col is not None and 0 <= key[2] - result.col < result.width:
+            result = result.rows[0][key[2] - result.col]
+        else:
+            return VALUE
+    if result is None:
+        return 0
+    if isinstance(result, float) and (result != result or result in (float("inf"), float("-inf"))):
+        return NUM
+    return result
+
+
+def _unary(operand, operation):
+    def evaluate():
+        value = operand()
+        if value.__class__ is Range:
+            return _elementwise(lambda a, _: operation(a), value, None)
+        return operation(value)
+
+    return evaluate
+
+
+def _binary(operation, left, right):
+    def evaluate():
+        a = left()
+        b = right()
+        if a.__class__ is Range or b.__class__ is Range:
+            return _elementwise(operation, a, b)
+        return operation(a, b)
+
+    return evaluate
+
+
+def _elementwise(operation, a, b):
+    """Apply operation cell by cell; a 1x1 side or a single row/column is
+    repeated to the other side's size, cells outside either side are #N/A."""
+    a_rows = a.rows if a.__class__ is Range else [[a]]
+    b_rows = b.rows if b.__class__ is Range else [[b]]
+    height = max(len(a_rows), len(b_rows))
+    width = max(len(a_rows[0]) if a_rows else 0, len(b_rows[0]) if b_rows else 0)
+
+    def pick(rows, i, j):
+        if not rows:
+            return NA
+        row = rows[0] if len(rows) == 1 else rows[i] if i < len(rows) else None
+        if row is None:
+            return NA
+        if len(row) == 1:
+            return row[0]
+        return row[j] if j < len(row) else NA
+
+    rows = []
+    for i in range(height):
+        row = []
+        for j in range(width):
+            try:
+                x = pick(a_rows, i, j)
+                y = pick(b_rows, i, j)
+                if x.__class__ is ExcelError:
+                    raise x
+                row.append(operation(x, y))
+            except ExcelError as e:
+                row.append(e)
+        rows.append(row)
+    origin = a if a.__class__ is Range and a.row is not None else b
+    if origin.__class__ is Range and origin.row is not None:
+        return Range(rows, origin.sheet, origin.row, origin.col)
+    return Range(rows)
+
+
+def _checked(value):
+    if value.__class__ is ExcelError:
+        raise value
+    return value
+
+
+def _add(a, b):
+    return to_number(a) + to_number(b)
+
+
+def _subtract(a, b):
+    return to_number(a) - to_number(b)
+
+
+def _multiply(a, b):
+    return to_number(a) * to_number(b)
+
+
+def _divide(a, b):
+    a, b = to_number(a), to_number(b)
+    if b == 0:
+        raise DIV0
+    return a / b
+
+
+def _power(a, b):
+    return power_of(to_number(a), to_number(b))
+
+
+def _join(a, b):
+    return to_text(a) + to_text(b)
+
+
+def _comparison(test):
+    def operation(a, b):
+        return test(compare(_checked(a), _checked(b)))
+
+    return operation
+
+
+_OPERATORS = {
+    "+": _add,
+    "-": _subtract,
+    "*": _multiply,
+    "/": _divide,
+    "^": _power,
+    "&": _join,
+    "=": _comparison(lambda order: order == 0),
+    "<>": _comparison(lambda order: order != 0),
+    "<": _comparison(lambda order: order < 0),
+    ">": _comparison(lambda order: order > 0),
+    "<=": _comparison(lambda order: order <= 0),
+    ">=": _comparison(lambda order: order >= 0),
+}
@@ -0,0 +1,1157 @@
+"""Excel worksheet functions.
+
+Each function receives its arguments evaluated: references arrive as Range
+objects, so a function can tell a referenced blank or text cell (which
+aggregates skip) from a literal. Functions registered with lazy=True get
+zero-argument callables instead and evaluate only what they need, which is
+how IF skips the branch not taken and IFERROR catches its argument's error.
+
+FUNCTIONS maps the upper-case name to (implementation, lazy). Formulas
+calling anything else are left to LibreOffice.
+"""
+
+import datetime
+import math
+import statistics
+from decimal import ROUND_DOWN, ROUND_HALF_UP, ROUND_UP, Decimal, InvalidOperation
+
+from openpyxl.utils.datetime import from_excel, to_excel
+
+from .values import (
+    DIV0,
+    NA,
+    NUM,
+    REF,
+    VALUE,
+    ExcelError,
+    Range,
+    compare,
+    has_wildcards,
+    is_number,
+    parse_number,
+    same_kind,
+    scalar,
+    to_bool,
+    to_int,
+    to_number,
+    to_text,
+    wildcard_pattern,
+)
+
+FUNCTIONS = {}
+
+
+def function(*names, lazy=False):
+    def register(implementation):
+        for name in names:
+            FUNCTIONS[name] = (implementation, lazy)
+        return implementation
+
+    return register
+
+
+def _numbers(args):
+    """Numbers to aggregate: from ranges only real numbers, from direct
+    arguments anything coercible; errors anywhere propagate."""
+    for arg in args:
+        if isinstance(arg, Range):
+            for value in arg:
+                if isinstance(value, ExcelError):
+                    raise value
+                if is_number(value):
+                    yield value
+        elif arg is not None:
+            yield to_number(arg)
+
+
+def _finite(number):
+    if isinstance(number, float) and (math.isinf(number) or math.isnan(number)):
+        raise NUM
+    return number
+
+
+def _probe(thunk):
+    try:
+        return scalar(thunk())
+    except ExcelError as e:
+        return e
+
+
+# ---- math and aggregation -------------------------------------------------
+
+
+@function("SUM")
+def _sum(*args):
+    return sum(_numbers(args))
+
+
+@function("PRODUCT")
+def _product(*args):
+    numbers = list(_numbers(args))
+    return _finite(math.prod(numbers)) if numbers else 0
+
+
+@function("AVERAGE")
+def _average(*args):
+    numbers = list(_numbers(args))
+    if not numbers:
+        raise DIV0
+    return sum(numbers) / len(numbers)
+
+
+@function("MIN")
+def _min(*args):
+    return min(_numbers(args), default=0)
+
+
+@function("MAX")
+def _max(*args):
+    return max(_numbers(args), default=0)
+
+
+@function("MEDIAN")
+def _median(*args):
+    numbers = list(_numbers(args))
+    if not numbers:
+        raise NUM
+    return statistics.median(numbers)
+
+
+@function("COUNT")
+def _count(*args):
+    count = 0
+    for arg in args:
+        if isinstance(arg, Range):
+            count += sum(1 for value in arg if is_number(value))
+        elif is_number(arg) or isinstance(arg, bool):
+            count += 1
+        elif isinstance(arg, str) and parse_number(arg) is not None:
+            count += 1
+    return count
+
+
+@function("COUNTA")
+def _counta(*args):
+    count = 0
+    for arg in args:
+        if isinstance(arg, Range):
+            count += sum(1 for value in arg if value is not None)
+        elif arg is not None:
+            count += 1
+    return count
+
+
+@function("COUNTBLANK")
+def _countblank(values):
+    if not isinstance(values, Range):
+        raise VALUE
+    return sum(1 for value in values if value is None or value == "")
+
+
+@function("ABS")
+def _abs(number):
+    return abs(to_number(number))
+
+
+@function("INT")
+def _int(number):
+    return math.floor(to_number(number))
+
+
+@function("MOD")
+def _mod(number, divisor):
+    number, divisor = to_number(number), to_number(divisor)
+    if divisor == 0:
+        raise DIV0
+    return number - divisor * math.floor(number / divisor)
+
+
+@function("POWER")
+def _power(number, power):
+    return power_of(to_number(number), to_number(power))
+
+
+def power_of(base, exponent):
+    if base == 0 and exponent < 0:
+        raise DIV0
+    if base == 0 and exponent == 0:
+        raise NUM
+    try:
+        result = base**exponent
+    except OverflowError:
+        raise NUM from None
+    if isinstance(result, complex):
+        raise NUM
+    return _finite(result)
+
+
+@function("SQRT")
+def _sqrt(number):
+    number = to_number(number)
+    if number < 0:
+        raise NUM
+    return math.sqrt(number)
+
+
+@function("EXP")
+def _exp(number):
+    try:
+        return math.exp(to_number(number))
+    except OverflowError:
+        raise NUM from None
+
+
+@function("LN")
+def _ln(number):
+    number = to_number(number)
+    if number <= 0:
+        raise NUM
+    return math.log(number)
+
+
+@function("LOG")
+def _log(number, base=None):
+    number = to_number(number)
+    base = 10 if base is None else to_number(base)
+    if number <= 0 or base <= 0:
+        raise NUM
+    if base == 1:
+        raise DIV0
+    return math.log(number, base)
+
+
+@function("LOG10")
+def _log10(number):
+    number = to_number(number)
+    if number <= 0:
+        raise NUM
+    return math.log10(number)
+
+
+@function("PI")
+def _pi():
+    return math.pi
+
+
+@function("SIGN")
+def _sign(number):
+    number = to_number(number)
+    return (number > 0) - (number < 0)
+
+
+def _round(number, digits, rounding):
+    number = to_number(number)
+    digits = to_int(digits)
+    quantum = Decimal(1).scaleb(-digits)
+    try:
+        result = float(Decimal(repr(float(number))).quantize(quantum, rounding=rounding))
+    except InvalidOperation:
+        # More digits than Decimal's precision: nothing left to round.
+        return number
+    return int(result) if digits <= 0 and abs(result) < 2**53 else result
+
+
+@function("ROUND")
+def _round_half_up(number, digits=None):
+    return _round(number, digits, ROUND_HALF_UP)
+
+
+@function("ROUNDUP")
+def _roundup(number, digits=None):
+    return _round(number, digits, ROUND_UP)
+
+
+@function("ROUNDDOWN", "TRUNC")
+def _rounddown(number, digits=None):
+    return _round(number, digits, ROUND_DOWN)
+
+
+@function("CEILING")
+def _ceiling(number, significance=None):
+    number = to_number(number)
+    significance = 1 if significance is None else to_number(significance)
+    if significance == 0:
+        return 0
+    if number > 0 and significance < 0:
+        raise NUM
+    if significance < 0:
+        return -math.ceil(-number / -significance) * -significance
+    return math.ceil(number / significance) * significance
+
+
+@function("FLOOR")
+def _floor(number, significance=None):
+    number = to_number(number)
+    significance = 1 if significance is None else to_number(significance)
+    if significance == 0:
+        raise DIV0
+    if number > 0 and significance < 0:
+        raise NUM
+    if significance < 0:
+        return -math.floor(-number / -significance) * -significance
+    return math.floor(number / significance) * significance
+
+
+def _kth(values, k, largest):
+    numbers = sorted(_numbers([values]), reverse=largest)
+    k = to_int(k)
+    if not 1 <= k <= len(numbers):
+        raise NUM
+    return numbers[k - 1]
+
+
+@function("LARGE")
+def _large(values, k):
+    return _kth(values, k, largest=True)
+
+
+@function("SMALL")
+def _small(values, k):
+    return _kth(values, k, largest=False)
+
+
+def _spread(args, sample, variance):
+    numbers = list(_numbers(args))
+    if len(numbers) < (2 if sample else 1):
+        raise DIV0
+    if sample:
+        result = statistics.variance(numbers)
+    else:
+        result = statistics.pvariance(numbers)
+    return result if variance else math.sqrt(result)
+
+
+@function("STDEV", "STDEV.S")
+def _stdev(*args):
+    return _spread(args, sample=True, variance=False)
+
+
+@function("STDEVP", "STDEV.P")
+def _stdevp(*args):
+    return _spread(args, sample=False, variance=False)
+
+
+@function("VAR", "VAR.S")
+def _var(*args):
+    return _spread(args, sample=True, variance=True)
+
+
+@function("VARP", "VAR.P")
+def _varp(*args):
+    return _spread(args, sample=False, variance=True)
+
+
+@function("SUMPRODUCT")
+def _sumproduct(*arrays):
+    blocks = [arg if isinstance(arg, Range) else Range([[arg]]) for arg in arrays]
+    shape = (blocks[0].height, blocks[0].width)
+    if any((block.height, block.width) != shape for block in blocks):
+        raise VALUE
+    total = 0
+    for values in zip(*(list(block) for block in blocks)):
+        product = 1
+        for value in values:
+            if isinstance(value, ExcelError):
+                raise value
+            product *= value if is_number(value) else 0
+        total += product
+    return total
+
+
+# ---- conditional aggregation -----------------------------------------------
+
+
+def criterion_matcher(criterion):
+    """Predicate for a SUMIF/COUNTIF criterion such as 5, ">=10", "<>x", "a*"."""
+    criterion = scalar(criterion)
+    if isinstance(criterion, ExcelError):
+        raise criterion
+    if criterion is None:
+        criterion = 0
+    if not isinstance(criterion, str):
+        return lambda value: same_kind(value, criterion) and compare(value, criterion) == 0
+
+    for operator in ("<=", ">=", "<>", "<", ">", "="):
+        if criterion.startswith(operator):
+            operand = criterion[len(operator):]
+            break
+    else:
+        operator, operand = "=", criterion
+
+    target = parse_number(operand)
+    if target is None and operand.upper() in ("TRUE", "FALSE"):
+        target = operand.upper() == "TRUE"
+    if target is None:
+        if operand == "" and operator in ("=", "<>"):
+            blank = operator == "="
+            return lambda value: (value is None or value == "") == blank
+        if operator in ("=", "<>"):
+            pattern = wildcard_pattern(operand)
+            matches = operator == "="
+            return lambda value: (
+                isinstance(value, str) and pattern.fullmatch(value) is not None
+            ) == matches
+        target = operand
+
+    tests = {
+        "=": lambda order: order == 0,
+        "<>": lambda order: order != 0,
+        "<": lambda order: order < 0,
+        ">": lambda order: order > 0,
+        "<=": lambda order: order <= 0,
+        ">=": lambda order: order >= 0,
+    }
+    test = tests[operator]
+    if operator == "<>":
+        return lambda value: not same_kind(value, target) or test(compare(value, target))
+    return lambda value: same_kind(value, target) and test(compare(value, target))
+
+
+def _matching_cells(criteria_pairs):
+    """Row-major indexes of the cells meeting every (range, criterion)."""
+    ranges = []
+    for values, criterion in criteria_pairs:
+        if not isinstance(values, Range):
+            raise VALUE
+        ranges.append((values, criterion_matcher(criterion)))
+    shape = (ranges[0][0].height, ranges[0][0].width)
+    if any((values.height, values.width) != shape for values, _ in ranges):
+        raise VALUE
+    flat = [(list(values), matcher) for values, matcher in ranges]
+    return [
+        index
+        for index in range(shape[0] * shape[1])
+        if all(matcher(values[index]) for values, matcher in flat)
+    ]
+
+
+def _pairs(args):
+    if len(args) % 2:
+        raise VALUE
+    return list(zip(args[::2], args[1::2]))
+
+
+def _selected_numbers(values, indexes):
+    if not isinstance(values, Range):
+        raise VALUE
+    cells = list(values)
+    for index in indexes:
+        value = cells[index] if index < len(cells) else None
+        if isinstance(value, ExcelError):
+            raise value
+        if is_number(value):
+            yield value
+
+
+def _sum_range(values, criteria_range):
+    """SUMIF's sum_range takes the shape of its criteria range."""
+    if values is None:
+        return criteria_range
+    if not isinstance(values, Range):
+        raise VALUE
+    return values
+
+
+@function("SUMIF")
+def _sumif(values, criterion, sum_values=None):
+    indexes = _matching_cells([(values, criterion)])
+    return sum(_selected_numbers(_sum_range(sum_values, values), indexes))
+
+
+@function("SUMIFS")
+def _sumifs(sum_values, *criteria):
+    indexes = _matching_cells(_pairs(criteria))
+    return sum(_selected_numbers(sum_values, indexes))
+
+
+@function("COUNTIF")
+def _countif(values, criterion):
+    return len(_matching_cells([(values, criterion)]))
+
+
+@function("COUNTIFS")
+def _countifs(*criteria):
+    return len(_matching_cells(_pairs(criteria)))
+
+
+@function("AVERAGEIF")
+def _averageif(values, criterion, average_values=None):
+    indexes = _matching_cells([(values, criterion)])
+    numbers = list(_selected_numbers(_sum_range(average_values, values), indexes))
+    if not numbers:
+        raise DIV0
+    return sum(numbers) / len(numbers)
+
+
+@function("AVERAGEIFS")
+def _averageifs(average_values, *criteria):
+    numbers = list(
+        _selected_numbers(average_values, _matching_cells(_pairs(criteria)))
+    )
+    if not numbers:
+        raise DIV0
+    return sum(numbers) / len(numbers)
+
+
+@function("MAXIFS")
+def _maxifs(max_values, *criteria):
+    return max(_selected_numbers(max_values, _matching_cells(_pairs(criteria))), default=0)
+
+
+@function("MINIFS")
+def _minifs(min_values, *criteria):
+    return min(_selected_numbers(min_values, _matching_cells(_pairs(criteria))), default=0)
+
+
+# ---- logical and information -------------------------------------------------
+
+
+@function("IF", lazy=True)
+def _if(condition, if_true=None, if_false=None):
+    if to_bool(condition()):
+        return if_true() if if_true is not None else True
+    return if_false() if if_false is not None else False
+
+
+@function("IFS", lazy=True)
+def _ifs(*args):
+    if len(args) % 2:
+        raise VALUE
+    for condition, result in zip(args[::2], args[1::2]):
+        if to_bool(condition()):
+            return result()
+    raise NA
+
+
+@function("SWITCH", lazy=True)
+def _switch(expression, *cases):
+    value = scalar(expression())
+    for i in range(0, len(cases) - 1, 2):
+        candidate = scalar(cases[i]())
+        if same_kind(value, candidate) and compare(value, candidate) == 0:
+            return cases[i + 1]()
+    if len(cases) % 2:
+        return cases[-1]()
+    raise NA
+
+
+@function("IFERROR", lazy=True)
+def _iferror(value, fallback):
+    result = _probe(value)
+    return fallback() if isinstance(result, ExcelError) else result
+
+
+@function("IFNA", lazy=True)
+def _ifna(value, fallback):
+    result = _probe(value)
+    return fallback() if result == NA else result
+
+
+@function("CHOOSE", lazy=True)
+def _choose(index, *choices):
+    index = to_int(index())
+    if not 1 <= index <= len(choices):
+        raise VALUE
+    return choices[index - 1]()
+
+
+def _logicals(args):
+    for arg in args:
+        if isinstance(arg, Range):
+            for value in arg:
+                if isinstance(value, ExcelError):
+                    raise value
+                if isinstance(value, bool) or is_number(value):
+                    yield bool(value)
+        elif arg is not None:
+            yield to_bool(arg)
+
+
+@function("AND")
+def _and(*args):
+    values = list(_logicals(args))
+    if not values:
+        raise VALUE
+    return all(values)
+
+
+@function("OR")
+def _or(*args):
+    values = list(_logicals(args))
+    if not values:
+        raise VALUE
+    return any(values)
+
+
+@function("XOR")
+def _xor(*args):
+    values = list(_logicals(args))
+    if not values:
+        raise VALUE
+    return sum(values) % 2 == 1
+
+
+@function("NOT")
+def _not(value):
+    return not to_bool(value)
+
+
+@function("TRUE")
+def _true():
+    return True
+
+
+@function("FALSE")
+def _false():
+    return False
+
+
+@function("NA")
+def _na():
+    raise NA
+
+
+@function("ISERROR", lazy=True)
+def _iserror(value):
+    return isinstance(_probe(value), ExcelError)
+
+
+@function("ISERR", lazy=True)
+def _iserr(value):
+    result = _probe(value)
+    return isinstance(result, ExcelError) and result != NA
+
+
+@function("ISNA", lazy=True)
+def _isna(value):
+    return _probe(value) == NA
+
+
+@function("ISBLANK", lazy=True)
+def _isblank(value):
+    return _probe(value) is None
+
+
+@function("ISNUMBER", lazy=True)
+def _isnumber(value):
+    return is_number(_probe(value))
+
+
+@function("ISTEXT", lazy=True)
+def _istext(value):
+    return isinstance(_probe(value), str)
+
+
+@function("ISNONTEXT", lazy=True)
+def _isnontext(value):
+    return not isinstance(_probe(value), str)
+
+
+@function("ISLOGICAL", lazy=True)
+def _islogical(value):
+    return isinstance(_probe(value), bool)
+
+
+# ---- lookup and reference ------------------------------------------------------
+
+
+def _lookup_position(lookup, values, mode):
+    """Index in values of lookup: exact (mode 0, wildcards for text), the
+    largest value <= lookup in ascending data (1) or the smallest value >=
+    lookup in descending data (-1)."""
+    lookup = scalar(lookup)
+    if isinstance(lookup, ExcelError):
+        raise lookup
+    if mode == 0:
+        if isinstance(lookup, str) and has_wildcards(lookup):
+            pattern = wildcard_pattern(lookup)
+            for i, value in enumerate(values):
+                if isinstance(value, str) and pattern.fullmatch(value):
+                    return i
+        else:
+            for i, value in enumerate(values):
+                if same_kind(value, lookup) and compare(value, lookup) == 0:
+                    return i
+        raise NA
+
+    best = None
+    for i, value in enumerate(values):
+        if not same_kind(value, lookup):
+            continue
+        order = compare(value, lookup)
+        if order == 0 or (order < 0) == (mode > 0):
+            best = i
+        else:
+            break
+    if best is None:
+        raise NA
+    return best
+
+
+@function("MATCH")
+def _match(lookup, values, mode=None):
+    if not isinstance(values, Range):
+        raise NA
+    mode = 1 if mode is None else to_int(mode)
+    return _lookup_position(lookup, values.vector(), (mode > 0) - (mode < 0)) + 1
+
+
+@function("VLOOKUP")
+def _vlookup(lookup, table, column, approximate=None):
+    if not isinstance(table, Range):
+        raise VALUE
+    column = to_int(column)
+    if column < 1:
+        raise VALUE
+    if column > table.width:
+        raise REF
+    approximate = True if approximate is None else to_bool(approximate)
+    keys = [row[0] for row in table.rows]
+    row = _lookup_position(lookup, keys, 1 if approximate else 0)
+    return table.rows[row][column - 1]
+
+
+@function("HLOOKUP")
+def _hlookup(lookup, table, row, approximate=None):
+    if not isinstance(table, Range):
+        raise VALUE
+    row = to_int(row)
+    if row < 1:
+        raise VALUE
+    if row > table.height:
+        raise REF
+    approximate = True if approximate is None else to_bool(approximate)
+    column = _lookup_position(lookup, table.rows[0], 1 if approximate else 0)
+    return table.rows[row - 1][column]
+
+
+@function("XLOOKUP")
+def _xlookup(lookup, values, results, if_not_found=None, match_mode=None, search_mode=None):
+    if not isinstance(values, Range) or not isinstance(results, Range):
+        raise VALUE
+    keys = values.vector()
+    match_mode = 0 if match_mode is None else to_int(match_mode)
+    search_mode = 1 if search_mode is None else to_int(search_mode)
+    if match_mode not in (0, 2) or search_mode not in (1, -1):
+        raise VALUE
+    order = range(len(keys)) if search_mode == 1 else range(len(keys) - 1, -1, -1)
+    try:
+        position = order[_lookup_position(lookup, [keys[i] for i in order], 0)]
+    except ExcelError:
+        if if_not_found is not None:
+            return if_not_found
+        raise
+    if values.height == 1:
+        if results.width != len(keys):
+            raise VALUE
+        return Range([[row[position]] for row in results.rows])
+    if results.height != len(keys):
+        raise VALUE
+    return Range([results.rows[position]])
+
+
+@function("INDEX")
+def _index(values, row=None, column=None):
+    if not isinstance(values, Range):
+        values = Range([[values]])
+    row = 0 if row is None else to_int(row)
+    column = 0 if column is None else to_int(column)
+    if values.height == 1 and column == 0 and row != 0 and values.width > 1:
+        row, column = 0, row
+    if row < 0 or column < 0 or row > values.height or column > values.width:
+        raise REF
+    if row == 0 and column == 0:
+        return values
+    if row == 0:
+        return Range([[r[column - 1]] for r in values.rows])
+    if column == 0:
+        if values.width == 1:
+            return values.rows[row - 1][0]
+        return Range([values.rows[row - 1]])
+    return values.rows[row - 1][column - 1]
+
+
+@function("ROWS")
+def _rows(values):
+    return values.height if isinstance(values, Range) else 1
+
+
+@function("COLUMNS")
+def _columns(values):
+    return values.width if isinstance(values, Range) else 1
+
+
+@function("ROW")
+def _row(reference):
+    if not isinstance(reference, Range) or reference.row is None:
+        raise VALUE
+    return reference.row
+
+
+@function("COLUMN")
+def _column(reference):
+    if not isinstance(reference, Range) or reference.col is None:
+        raise VALUE
+    return reference.col
+
+
+# ---- text -----------------------------------------------------------------------
+
+
+def _concat(args):
+    parts = []
+    for arg in args:
+        if isinstance(arg, Range):
+            parts.extend(to_text(value) for value in arg)
+        else:
+            parts.append(to_text(arg))
+    return "".join(parts)
+
+
+@function("CONCATENATE")
+def _concatenate(*args):
+    return "".join(to_text(arg) for arg in args)
+
+
+@function("CONCAT")
+def _concat_function(*args):
+    return _concat(args)
+
+
+@function("TEXTJOIN")
+def _textjoin(delimiter, ignore_empty, *args):
+    delimiter = to_text(delimiter)
+    ignore_empty = to_bool(ignore_empty)
+    parts = []
+    for arg in args:
+        values = list(arg) if isinstance(arg, Range) else [arg]
+        for value in values:
+            text = to_text(value)
+            if text or not ignore_empty:
+                parts.append(text)
+    return delimiter.join(parts)
+
+
+@function("LEN")
+def _len(text):
+    return len(to_text(text))
+
+
+@function("LEFT")
+def _left(text, count=None):
+    count = 1 if count is None else to_int(count)
+    if count < 0:
+        raise VALUE
+    return to_text(text)[:count]
+
+
+@function("RIGHT")
+def _right(text, count=None):
+    count = 1 if count is None else to_int(count)
+    if count < 0:
+        raise VALUE
+    text = to_text(text)
+    return text[len(text) - count:] if count else ""
+
+
+@function("MID")
+def _mid(text, start, count):
+    start, count = to_int(start), to_int(count)
+    if start < 1 or count < 0:
+        raise VALUE
+    return to_text(text)[start - 1:start - 1 + count]
+
+
+@function("UPPER")
+def _upper(text):
+    return to_text(text).upper()
+
+
+@function("LOWER")
+def _lower(text):
+    return to_text(text).lower()
+
+
+@function("PROPER")
+def _proper(text):
+    return to_text(text).title()
+
+
+@function("TRIM")
+def _trim(text):
+    return " ".join(part for part in to_text(text).split(" ") if part)
+
+
+@function("EXACT")
+def _exact(first, second):
+    return to_text(first) == to_text(second)
+
+
+@function("REPT")
+def _rept(text, count):
+    count = to_int(count)
+    if count < 0:
+        raise VALUE
+    return to_text(text) * count
+
+
+@function("SUBSTITUTE")
+def _substitute(text, old, new, instance=None):
+    text, old, new = to_text(text), to_text(old), to_text(new)
+    if not old:
+        return text
+    if instance is None:
+        return text.replace(old, new)
+    instance = to_int(instance)
+    if instance < 1:
+        raise VALUE
+    position = -1
+    for _ in range(instance):
+        position = text.find(old, position + 1)
+        if position < 0:
+            return text
+    return text[:position] + new + text[position + len(old):]
+
+
+@function("FIND")
+def _find(needle, haystack, start=None):
+    needle, haystack = to_text(needle), to_text(haystack)
+    start = 1 if start is None else to_int(start)
+    if not 1 <= start <= len(haystack) + 1:
+        raise VALUE
+    position = haystack.find(needle, start - 1)
+    if position < 0:
+        raise VALUE
+    return position + 1
+
+
+@function("SEARCH")
+def _search(needle, haystack, start=None):
+    needle, haystack = to_text(needle), to_text(haystack)
+    start = 1 if start is None else to_int(start)
+    if not 1 <= start <= len(haystack) + 1:
+        raise VALUE
+    match = wildcard_pattern(needle).search(haystack, start - 1)
+    if match is None:
+        raise VALUE
+    return match.start() + 1
+
+
+@function("VALUE")
+def _value(text):
+    text = scalar(text)
+    if is_number(text):
+        return text
+    number = parse_number(to_text(text))
+    if number is None:
+        raise VALUE
+    return number
+
+
+# ---- dates ------------------------------------------------------------------------
+
+
+def serial_to_date(serial):
+    serial = to_number(serial)
+    if serial < 0:
+        raise NUM
+    value = from_excel(serial)
+    return value.date() if isinstance(value, datetime.datetime) else value
+
+
+def date_to_serial(value):
+    return int(to_excel(value))
+
+
+@function("DATE")
+def _date(year, month, day):
+    year, month, day = to_int(year), to_int(month), to_int(day)
+    if 0 <= year < 1900:
+        year += 1900
+    year += (month - 1) // 12
+    month = (month - 1) % 12 + 1
+    if not 1900 <= year <= 9999:
+        raise NUM
+    serial = date_to_serial(datetime.date(year, month, 1)) + day - 1
+    if serial < 0:
+        raise NUM
+    return serial
+
+
+@function("YEAR")
+def _year(serial):
+    return serial_to_date(serial).year
+
+
+@function("MONTH")
+def _month(serial):
+    return serial_to_date(serial).month
+
+
+@function("DAY")
+def _day(serial):
+    return serial_to_date(serial).day
+
+
+def _add_months(serial, months, end_of_month):
+    start = serial_to_date(serial)
+    months = to_int(months)
+    total = start.year * 12 + start.month - 1 + months
+    year, month = divmod(total, 12)
+    month += 1
+    if not 1900 <= year <= 9999:
+        raise NUM
+    last_day = (datetime.date(year + month // 12, month % 12 + 1, 1) - datetime.timedelta(days=1)).day
+    day = last_day if end_of_month else min(start.day, last_day)
+    return date_to_serial(datetime.date(year, month, day))
+
+
+@function("EDATE")
+def _edate(serial, months):
+    return _add_months(serial, months, end_of_month=False)
+
+
+@function("EOMONTH")
+def _eomonth(serial, months):
+    return _add_months(serial, months, end_of_month=True)
+
+
+@function("TODAY")
+def _today():
+    return date_to_serial(datetime.date.today())
+
+
+@function("NOW")
+def _now():
+    return to_excel(datetime.datetime.now())
+
+
+# ---- financial ------------------------------------------------------------------
+
+
+def _growth(rate, periods):
+    return power_of(1 + rate, periods)
+
+
+def future_value(rate, periods, payment, present, due):
+    if rate == 0:
+        return -(present + payment * periods)
+    growth = _growth(rate, periods)
+    return -(present * growth + payment * (1 + rate * due) * (growth - 1) / rate)
+
+
+def payment_for(rate, periods, present, future, due):
+    if periods == 0:
+        raise NUM
+    if rate == 0:
+        return -(present + future) / periods
+    growth = _growth(rate, periods)
+    return -rate * (future + present * growth) / ((1 + rate * due) * (growth - 1))
+
+
+def _financial_args(args, defaults):
+    return [to_number(arg) if arg is not None else default for arg, default in zip(args, defaults)]
+
+
+@function("PMT")
+def _pmt(rate, periods, present, future=None, due=None):
+    rate, periods, present, future, due = _financial_args(
+        (rate, periods, present, future, due), (0, 0, 0, 0, 0)
+    )
+    return payment_for(rate, periods, present, future, 1 if due else 0)
+
+
+@function("FV")
+def _fv(rate, periods, payment, present=None, due=None):
+    rate, periods, payment, present, due = _financial_args(
+        (rate, periods, payment, present, due), (0, 0, 0, 0, 0)
+    )
+    return future_value(rate, periods, payment, present, 1 if due else 0)
+
+
+@function("PV")
+def _pv(rate, periods, payment, future=None, due=None):
+    rate, periods, payment, future, due = _financial_args(
+        (rate, periods, payment, future, due), (0, 0, 0, 0, 0)
+    )
+    due = 1 if due else 0
+    if rate == 0:
+        return -(future + payment * periods)
+    growth = _growth(rate, periods)
+    return -(future + payment * (1 + rate * due) * (growth - 1) / rate) / growth
+
+
+@function("NPER")
+def _nper(rate, payment, present, future=None, due=None):
+    rate, payment, present, future, due = _financial_args(
+        (rate, payment, present, future, due), (0, 0, 0, 0, 0)
+    )
+    due = 1 if due else 0
+    if rate == 0:
+        if payment == 0:
+            raise NUM
+        return -(present + future) / payment
+    numerator = payment * (1 + rate * due) - future * rate
+    denominator = payment * (1 + rate * due) + present * rate
+    if denominator == 0 or numerator / denominator <= 0:
+        raise NUM
+    return math.log(numerator / denominator) / math.log(1 + rate)
+
+
+def _interest_payment(rate, period, periods, present, future, due):
+    if not 1 <= period <= periods:
+        raise NUM
+    payment = payment_for(rate, periods, present, future, due)
+    if due and period == 1:
+        return 0
+    interest = future_value(rate, period - 1, payment, present, due) * rate
+    return interest / (1 + rate) if due else interest
+
+
+@function("IPMT")
+def _ipmt(rate, period, periods, present, future=None, due=None):
+    rate, period, periods, present, future, due = _financial_args(
+        (rate, period, periods, present, future, due), (0, 0, 0, 0, 0, 0)
+    )
+    return _interest_payment(rate, period, periods, present, future, 1 if due else 0)
+
+
+@function("PPMT")
+def _ppmt(rate, period, periods, present, future=None, due=None):
+    rate, period, periods, present, future, due = _financial_args(
+        (rate, period, periods, present, future, due), (0, 0, 0, 0, 0, 0)
+    )
+    due = 1 if due else 0
+    payment = payment_for(rate, periods, present, future, due)
+    return payment - _interest_payment(rate, period, periods, present, future, due)
+
+
+@function("NPV")
+def _npv(rate, *values):
+    rate = to_number(rate)
+    if rate == -1:
+        raise DIV0
+    return sum(
+        value / (1 + rate) ** i for i, value in enumerate(_numbers(values), start=1)
+    )
+
+
+@function("IRR")
+def _irr(values, guess=None):
+    flows = list(_numbers([values]))
+    if not any(flow > 0 for flow in flows) or not any(flow < 0 for flow in flows):
+        raise NUM
+    rate = 0.1 if guess is None else to_number(guess)
+    for _ in range(100):
+        if rate <= -1:
+            raise NUM
+        value = sum(flow / (1 + rate) ** i for i, flow in enumerate(flows))
+        slope = sum(-i * flow / (1 + rate) ** (i + 1) for i, flow in enumerate(flows))
+        if slope == 0:
+            raise NUM
+        step = value / slope
+        rate -= step
+        if abs(step) < 1e-12:
+            return rate
+    raise NUM
+
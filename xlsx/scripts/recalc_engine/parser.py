@@ -0,0 +1,353 @@
+"""Parse Excel formulas into a small tuple AST.
+
+Tokens come from openpyxl's formula tokenizer; a precedence-climbing parser
+turns them into nodes:
+
+    ("num", value)  ("str", value)  ("bool", value)  ("err", code)
+    ("missing",)                       an omitted function argument
+    ("ref", sheet, row, col, fixed)           a single cell
+    ("range", sheet, r1, c1, r2, c2, fixed)   r2/c2 are None for whole columns/rows
+
+fixed holds a flag per coordinate, true where the reference pins it with $
+(whole-column and whole-row ranges count as pinned), and says which
+coordinates shift() moves when a formula is filled to another cell.
+    ("name", name)                     a defined name, resolved by the engine
+    ("array", rows)                    {1,2;3,4}, rows of literal nodes
+    ("neg", node)  ("pct", node)
+    ("op", operator, left, right)
+    ("call", NAME, args)
+
+Anything the engine cannot evaluate faithfully (intersections, unions,
+structured table references, external workbooks) raises Unsupported.
+"""
+
+import re
+
+from openpyxl.formula.tokenizer import Token, Tokenizer, TokenizerError
+from openpyxl.utils.cell import column_index_from_string, get_column_letter
+
+
+class Unsupported(Exception):
+    pass
+
+
+ERROR_CODES = ("#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A")
+
+# Binding power of the infix operators, loosest first. Negation binds tighter
+# than "^" in Excel, so -2^2 is 4.
+INFIX_POWER = {
+    "=": 1, "<>": 1, "<": 1, ">": 1, "<=": 1, ">=": 1,
+    "&": 2,
+    "+": 3, "-": 3,
+    "*": 4, "/": 4,
+    "^": 5,
+    ":": 8,
+}
+PREFIX_POWER = 6
+POSTFIX_POWER = 7
+
+_REFERENCE = re.compile(
+    r"""^(?:(?P<sheet>'(?:[^']|'')+'|[^'!]+)!)?
+    (?:
+        (?P<c1>\$?[A-Za-z]{1,3})(?P<r1>\$?\d+)(?::(?P<c2>\$?[A-Za-z]{1,3})(?P<r2>\$?\d+))?
+      | (?P<col1>\$?[A-Za-z]{1,3}):(?P<col2>\$?[A-Za-z]{1,3})
+      | (?P<row1>\$?\d+):(?P<row2>\$?\d+)
+    )$""",
+    re.VERBOSE,
+)
+
+
+def parse_formula(formula: str, sheet: str):
+    """AST of formula ("=..."), with unqualified references on sheet."""
+    try:
+        tokens = [
+            token
+            for token in Tokenizer(formula).items
+            if token.type != Token.WSPACE
+        ]
+    except TokenizerError as e:
+        raise Unsupported(f"cannot tokenize {formula!r}: {e}") from None
+    parser = _Parser(tokens, sheet)
+    node = parser.expression(0)
+    if parser.position != len(tokens):
+        raise Unsupported(f"unexpected {parser.peek().value!r} in {formula!r}")
+    return node
+
+
+def parse_reference(text: str, sheet: str):
+    """("ref", ...) or ("range", ...) node for an A1 reference, else None."""
+    match = _REFERENCE.match(text)
+    if match is None:
+        return None
+    if match["sheet"] is not None:
+        sheet = match["sheet"]
+        if sheet.startswith("'"):
+            sheet = sheet[1:-1].replace("''", "'")
+        if "[" in sheet:
+            raise Unsupported(f"external reference {text!r}")
+
+    if match["c1"] is not None:
+        r1, c1 = _row(match["r1"]), _column(match["c1"])
+        row_fixed, col_fixed = match["r1"][0] == "$", match["c1"][0] == "$"
+        if match["c2"] is None:
+            return ("ref", sheet, r1, c1, (row_fixed, col_fixed))
+        r2, c2 = _row(match["r2"]), _column(match["c2"])
+        return _range(
+            sheet, r1, c1, r2, c2,
+            (row_fixed, col_fixed, match["r2"][0] == "$", match["c2"][0] == "$"),
+        )
+    if match["col1"] is not None:
+        c1, c2 = _column(match["col1"]), _column(match["col2"])
+        return ("range", sheet, 1, min(c1, c2), None, max(c1, c2), (True,) * 4)
+    r1, r2 = _row(match["row1"]), _row(match["row2"])
+    return ("range", sheet, min(r1, r2), 1, max(r1, r2), None, (True,) * 4)
+
+
+# A1 cell references in formula text, as parse_reference reads them: not
+# glued to a name, number or function call, nor a sheet prefix themselves.
+_CELL_IN_TEXT = re.compile(
+    r"(?<![A-Za-z0-9_.$])(\$?)([A-Za-z]{1,3})(\$?)(\d+)(?![A-Za-z0-9_.(!\[])"
+)
+_QUOTED = re.compile(r"(\"[^\"]*\"|'[^']*')")
+
+
+def template_key(formula: str, row: int, col: int) -> str:
+    """formula with its relative references written relative to (row, col).
+
+    Two cells whose formulas have the same key differ only by where they
+    sit, so one parse serves both: shift() moves the tree from one to the
+    other. String literals and quoted sheet names are kept verbatim.
+    """
+    parts = _QUOTED.split(formula)
+    for i in range(0, len(parts), 2):
+        parts[i] = _CELL_IN_TEXT.sub(
+            lambda m: _relative(m, row, col), parts[i]
+        )
+    return "".join(parts)
+
+
+def _relative(match, row, col):
+    col_fixed, letters, row_fixed, digits = match.groups()
+    if col_fixed:
+        column = "$" + letters.upper()
+    else:
+        column = f"C[{column_index_from_string(letters.upper()) - col}]"
+    row_part = f"${digits}" if row_fixed else f"R[{int(digits) - row}]"
+    return f"\x00{column}{row_part}\x00"
+
+
+# Whole-column (A:C) and whole-row (1:3) references in formula text.
+_SPAN_IN_TEXT = re.compile(
+    r"(?<![A-Za-z0-9_.$])(\$?[A-Za-z]{1,3}:\$?[A-Za-z]{1,3}|\$?\d+:\$?\d+)(?![A-Za-z0-9_.(!])"
+)
+
+
+def translate(formula: str, rows: int, cols: int) -> str:
+    """formula as it reads when copied rows down and cols across, the way a
+    shared formula's master applies to the other cells of its range."""
+    parts = _QUOTED.split(formula)
+    for i in range(0, len(parts), 2):
+        for span in _SPAN_IN_TEXT.findall(parts[i]):
+            first, last = span.split(":")
+            moves = cols if first.lstrip("$")[0].isalpha() else rows
+            if moves and not (first.startswith("$") and last.startswith("$")):
+                raise Unsupported(f"shared formula with relative {span!r}")
+        parts[i] = _CELL_IN_TEXT.sub(lambda m: _moved(m, rows, cols), parts[i])
+    return "".join(parts)
+
+
+def _moved(match, rows, cols):
+    col_fixed, letters, row_fixed, digits = match.groups()
+    column = column_index_from_string(letters.upper())
+    row = int(digits)
+    if not col_fixed:
+        column += cols
+    if not row_fixed:
+        row += rows
+    if not (1 <= column <= 16384 and 1 <= row <= 1048576):
+        return "#REF!"
+    return f"{col_fixed}{get_column_letter(column)}{row_fixed}{row}"
+
+
+def shift(node, rows: int, cols: int):
+    """node with its relative references moved by rows and cols."""
+    kind = node[0]
+    if kind == "ref":
+        _, sheet, row, col, fixed = node
+        return (
+            "ref",
+            sheet,
+            row if fixed[0] else row + rows,
+            col if fixed[1] else col + cols,
+            fixed,
+        )
+    if kind == "range":
+        _, sheet, r1, c1, r2, c2, fixed = node
+        return _range(
+            sheet,
+            r1 if fixed[0] else r1 + rows,
+            c1 if fixed[1] else c1 + cols,
+            r2 if fixed[2] else r2 + rows,
+            c2 if fixed[3] else c2 + cols,
+            fixed,
+        )
+    if kind in ("neg", "pct"):
+        return (kind, shift(node[1], rows, cols))
+    if kind == "op":
+        return ("op", node[1], shift(node[2], rows, cols), shift(node[3], rows, cols))
+    if kind == "call":
+        return ("call", node[1], [shift(arg, rows, cols) for arg in node[2]])
+    return node
+
+
+def _range(sheet, r1, c1, r2, c2, fixed):
+    """Range node with corners ordered top-left to bottom-right (B2:A1 is
+    A1:B2); each coordinate keeps its own $ flag."""
+    row1_fixed, col1_fixed, row2_fixed, col2_fixed = fixed
+    if r2 is not None and r1 > r2:
+        r1, r2, row1_fixed, row2_fixed = r2, r1, row2_fixed, row1_fixed
+    if c2 is not None and c1 > c2:
+        c1, c2, col1_fixed, col2_fixed = c2, c1, col2_fixed, col1_fixed
+    return ("range", sheet, r1, c1, r2, c2, (row1_fixed, col1_fixed, row2_fixed, col2_fixed))
+
+
+def _row(text: str) -> int:
+    return int(text.lstrip("$"))
+
+
+def _column(text: str) -> int:
+    return column_index_from_string(text.lstrip("$").upper())
+
+
+class _Parser:
+    def __init__(self, tokens, sheet):
+        self.tokens = tokens
+        self.sheet = sheet
+        self.position = 0
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def advance(self):
+        token = self.peek()
+        if token is None:
+            raise Unsupported("formula ends unexpectedly")
+        self.position += 1
+        return token
+
+    def expression(self, min_power):
+        left = self.prefix()
+        while True:
+            token = self.peek()
+            if token is None:
+                return left
+            if token.type == Token.OP_POST:
+                if POSTFIX_POWER <= min_power:
+                    return left
+                self.advance()
+                left = ("pct", left)
+            elif token.type == Token.OP_IN:
+                power = INFIX_POWER.get(token.value)
+                if power is None:
+                    raise Unsupported(f"operator {token.value!r}")
+                if power <= min_power:
+                    return left
+                self.advance()
+                left = ("op", token.value, left, self.expression(power))
+            else:
+                return left
+
+    def prefix(self):
+        token = self.advance()
+        if token.type == Token.OPERAND:
+            return self.operand(token)
+        if token.type == Token.OP_PRE:
+            operand = self.expression(PREFIX_POWER)
+            return ("neg", operand) if token.value == "-" else operand
+        if token.type == Token.PAREN and token.subtype == Token.OPEN:
+            node = self.expression(0)
+            self.expect(Token.PAREN, Token.CLOSE)
+            return node
+        if token.type == Token.FUNC and token.subtype == Token.OPEN:
+            return self.call(token.value[:-1])
+        if token.type == Token.ARRAY and token.subtype == Token.OPEN:
+            return self.array()
+        raise Unsupported(f"unexpected {token.value!r}")
+
+    def expect(self, type_, subtype):
+        token = self.advance()
+        if token.type != type_ or token.subtype != subtype:
+            raise Unsupported(f"unexpected {token.value!r}")
+
+    def operand(self, token):
+        value = token.value
+        if token.subtype == Token.NUMBER:
+            number = float(value)
+            return ("num", int(number) if number.is_integer() and "." not in value else number)
+        if token.subtype == Token.TEXT:
+            return ("str", value[1:-1].replace('""', '"'))
+        if token.subtype == Token.LOGICAL:
+            return ("bool", value.upper() == "TRUE")
+        if token.subtype == Token.ERROR:
+            return ("err", value.upper())
+
+        if value.upper().endswith("#REF!"):
+            return ("err", "#REF!")
+        if "[" in value:
+            raise Unsupported(f"structured or external reference {value!r}")
+        reference = parse_reference(value, self.sheet)
+        if reference is not None:
+            return reference
+        if "!" in value:
+            raise Unsupported(f"reference {value!r}")
+        return ("name", value)
+
+    def call(self, name):
+        name = name.upper()
+        for prefix in ("_XLFN._XLWS.", "_XLFN.", "_XLWS."):
+            name = name.removeprefix(prefix)
+        args = []
+        token = self.peek()
+        if token is not None and token.type == Token.FUNC and token.subtype == Token.CLOSE:
+            self.advance()
+            return ("call", name, args)
+        while True:
+            token = self.peek()
+            if token is not None and (
+                token.type == Token.SEP
+                or (token.type == Token.FUNC and token.subtype == Token.CLOSE)
+            ):
+                args.append(("missing",))
+            else:
+                args.append(self.expression(0))
+            token = self.advance()
+            if token.type == Token.FUNC and token.subtype == Token.CLOSE:
+                return ("call", name, args)
+            if token.type != Token.SEP or token.subtype != Token.ARG:
+                raise Unsupported(f"unexpected {token.value!r} in {name}()")
+
+    def array(self):
+        rows = [[]]
+        while True:
+            token = self.advance()
+            if token.type == Token.ARRAY and token.subtype == Token.CLOSE:
+                break
+            if token.type == Token.SEP:
+                if token.subtype == Token.ROW:
+                    rows.append([])
+                continue
+            if token.type == Token.OP_PRE and token.value == "-":
+                literal = self.advance()
+                node = self.operand(literal)
+                if node[0] != "num":
+                    raise Unsupported("non-numeric negation in array constant")
+                rows[-1].append(("num", -node[1]))
+                continue
+            if token.type != Token.OPERAND or token.subtype == Token.RANGE:
+                raise Unsupported(f"unexpected {token.value!r} in array constant")
+            rows[-1].append(self.operand(token))
+        if len({len(row) for row in rows}) != 1:
+            raise Unsupported("ragged array constant")
+        return ("array", rows)
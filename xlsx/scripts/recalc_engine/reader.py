@@ -0,0 +1,203 @@
+"""Read cell values and formulas straight from an xlsx package.
+
+Sheets are streamed with lxml's iterparse, one pass per part, so a large
+workbook loads in a fraction of what openpyxl's read-only mode needs (it
+scans each sheet once for its size and once more for its cells). Numbers
+stay serial numbers whatever their format, which is what formulas see.
+"""
+
+import datetime
+import functools
+import posixpath
+import re
+from typing import NamedTuple
+
+from lxml import etree
+from openpyxl.utils.cell import (
+    column_index_from_string,
+    coordinate_from_string,
+    get_column_letter,
+)
+from openpyxl.utils.datetime import to_excel
+
+from .parser import Unsupported, translate
+from .values import ERRORS, VALUE
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PACKAGE_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+WORKSHEET_TYPE = f"{REL_NS}/worksheet"
+
+_PARSER = etree.XMLParser(resolve_entities=False, huge_tree=True)
+
+ROW = f"{{{MAIN_NS}}}row"
+CELL = f"{{{MAIN_NS}}}c"
+FORMULA = f"{{{MAIN_NS}}}f"
+VALUE_TAG = f"{{{MAIN_NS}}}v"
+INLINE = f"{{{MAIN_NS}}}is"
+_TEXT = f"{{{MAIN_NS}}}t"
+_CELL_REFERENCE = re.compile(r"([A-Z]{1,3})(\d+)$")
+_PHONETIC = f"{{{MAIN_NS}}}rPh"
+
+
+class WorkbookInfo(NamedTuple):
+    sheets: list  # (title, part name) of each worksheet, in tab order
+    names: dict  # (sheet title or None, upper-case name) -> definition text
+    date1904: bool
+
+
+def sheet_parts(archive) -> dict:
+    """Worksheet title -> part name inside the package."""
+    return dict(read_workbook(archive).sheets)
+
+
+def read_workbook(archive) -> WorkbookInfo:
+    workbook = etree.fromstring(archive.read("xl/workbook.xml"), _PARSER)
+    rels = etree.fromstring(archive.read("xl/_rels/workbook.xml.rels"), _PARSER)
+    targets = {
+        rel.get("Id"): rel.get("Target")
+        for rel in rels.iter(f"{{{PACKAGE_REL_NS}}}Relationship")
+        if rel.get("Type") == WORKSHEET_TYPE
+    }
+
+    sheets = []
+    titles = []
+    for sheet in workbook.iter(f"{{{MAIN_NS}}}sheet"):
+        titles.append(sheet.get("name"))
+        target = targets.get(sheet.get(f"{{{REL_NS}}}id"))
+        if target is None:
+            continue
+        if target.startswith("/"):
+            part = target.lstrip("/")
+        else:
+            part = posixpath.normpath(posixpath.join("xl", target))
+        sheets.append((sheet.get("name"), part))
+
+    names = {}
+    for name in workbook.iter(f"{{{MAIN_NS}}}definedName"):
+        local = name.get("localSheetId")
+        scope = titles[int(local)] if local is not None and int(local) < len(titles) else None
+        names[(scope, name.get("name").upper())] = name.text or ""
+
+    properties = workbook.find(f"{{{MAIN_NS}}}workbookPr")
+    date1904 = properties is not None and properties.get("date1904") in ("1", "true")
+    return WorkbookInfo(sheets, names, date1904)
+
+
+def read_shared_strings(archive) -> list:
+    try:
+        data = archive.read("xl/sharedStrings.xml")
+    except KeyError:
+        return []
+    root = etree.fromstring(data, _PARSER)
+    return [_rich_text(item) for item in root.iter(f"{{{MAIN_NS}}}si")]
+
+
+def _rich_text(element) -> str:
+    return "".join(
+        text.text or ""
+        for text in element.iter(_TEXT)
+        if text.getparent().tag != _PHONETIC
+    )
+
+
+def iter_cells(archive, part, shared_strings):
+    """(row, col, value, formula) for every non-empty cell of a worksheet
+    part; formula is the "=..." text, or None for a constant. A formula
+    cell's value is the result stored with it, None when there is none."""
+    shared_formulas = {}
+    with archive.open(part) as stream:
+        for row, col, cell in positioned_cells(_streamed_rows(stream)):
+            value = _cell_value(cell, shared_strings)
+            formula = cell.find(FORMULA)
+            if formula is not None:
+                text = _formula_text(formula, row, col, shared_formulas)
+                if text is not None:
+                    yield row, col, value, text
+                    continue
+            if value is not None:
+                yield row, col, value, None
+
+
+def positioned_cells(rows):
+    """(row, col, <c>) for the cells of <row> elements; r attributes are
+    optional in SpreadsheetML, a missing one means the next row or column."""
+    row_number = 0
+    for row in rows:
+        row_number = int(row.get("r", row_number + 1))
+        column_number = 0
+        for cell in row.iter(CELL):
+            reference = cell.get("r")
+            if reference is None:
+                column_number += 1
+            else:
+                row_number, column_number = _split_reference(reference)
+            yield row_number, column_number, cell
+
+
+@functools.lru_cache(maxsize=1 << 14)
+def _column_number(letters):
+    return column_index_from_string(letters)
+
+
+def _split_reference(reference):
+    """(row, col) of an "AB12" cell reference."""
+    match = _CELL_REFERENCE.match(reference)
+    if match is None:
+        column, row = coordinate_from_string(reference)
+        return row, column_index_from_string(column)
+    return int(match[2]), _column_number(match[1])
+
+
+def _streamed_rows(stream):
+    """<row> elements of a sheet, each dropped once the caller is done."""
+    for _, row in etree.iterparse(stream, tag=ROW, huge_tree=True, resolve_entities=False):
+        yield row
+        row.clear()
+        while row.getprevious() is not None:
+            del row.getparent()[0]
+
+
+def _formula_text(formula, row, col, shared_formulas):
+    kind = formula.get("t", "normal")
+    if kind in ("array", "dataTable"):
+        raise Unsupported(f"{kind} formula in {get_column_letter(col)}{row}")
+    if kind == "shared":
+        index = formula.get("si")
+        if formula.text:
+            shared_formulas[index] = (formula.text, row, col)
+        elif index in shared_formulas:
+            text, origin_row, origin_col = shared_formulas[index]
+            return "=" + translate(text, row - origin_row, col - origin_col)
+        else:
+            raise Unsupported(f"shared formula {index} used before it is defined")
+    if not formula.text:
+        return None
+    return "=" + formula.text
+
+
+def _cell_value(cell, shared_strings):
+    kind = cell.get("t", "n")
+    if kind == "inlineStr":
+        inline = cell.find(INLINE)
+        return _rich_text(inline) if inline is not None else None
+
+    value = cell.find(VALUE_TAG)
+    if value is None or value.text is None:
+        return None
+    text = value.text
+    if kind == "n":
+        if "." in text or "E" in text or "e" in text:
+            return float(text)
+        return int(text)
+    if kind == "s":
+        return shared_strings[int(text)]
+    if kind == "str":
+        return text
+    if kind == "b":
+        return text.strip() in ("1", "true")
+    if kind == "e":
+        return ERRORS.get(text, VALUE)
+    if kind == "d":
+        return to_excel(datetime.datetime.fromisoformat(text.rstrip("Z")))
+    return text
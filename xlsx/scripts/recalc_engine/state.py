@@ -0,0 +1,142 @@
+"""Keep a calculated Model beside its workbook between runs.
+
+save_state() writes ".<name>.recalc.json" next to the workbook: every
+cell's value, each formula with what it reads, and the signatures that
+Model.refresh() compares against (the file's mtime and size, each sheet
+part's CRC-32 and size). load_state() turns it back into a Model without
+parsing the workbook, so an edit costs a re-read of the sheets it touched
+and a recalculation of the cells depending on it.
+"""
+
+import json
+import os
+import zipfile
+from pathlib import Path
+
+from .engine import Model, file_signature, part_signatures
+from .reader import read_workbook
+from .values import ERRORS, VALUE, ExcelError
+
+VERSION = 1
+
+
+def state_path(workbook) -> Path:
+    workbook = Path(workbook)
+    return workbook.parent / f".{workbook.name}.recalc.json"
+
+
+def save_state(model: Model, workbook) -> None:
+    """Record model as the state of the workbook, which must already hold
+    its values."""
+    workbook = Path(workbook).resolve()
+    with zipfile.ZipFile(workbook) as archive:
+        model.part_signatures = part_signatures(archive, read_workbook(archive).sheets)
+    model.signature = file_signature(workbook)
+
+    index = {title: number for number, title in enumerate(model.sheets)}
+    sheets = [
+        {
+            "title": title,
+            "part_signature": model.part_signatures.get(title),
+            "dimensions": list(model.dimensions.get(title, (0, 0))),
+            "values": [],
+            "formulas": [],
+        }
+        for title in model.sheets
+    ]
+    for (title, row, col), value in model.values.items():
+        if (title, row, col) not in model.formulas:
+            sheets[index[title]]["values"].append([row, col, _encode(value)])
+    for key, formula in model.formulas.items():
+        title, row, col = key
+        reads = [
+            [index[target[0]], *target[1:]]
+            for _, target in model.precedents.get(key, ())
+        ]
+        sheets[index[title]]["formulas"].append(
+            [row, col, formula, _encode(model.values.get(key)), reads]
+        )
+
+    data = {
+        "version": VERSION,
+        "workbook": str(workbook),
+        "signature": model.signature,
+        "sheets": sheets,
+        "names": [[scope, name, text] for (scope, name), text in model.names.items()],
+        "circular": _cells(model.circular, index),
+        "volatile": _cells(model.volatile, index),
+        "errors": _cells(model.error_cells, index),
+    }
+    path = state_path(workbook)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_text(json.dumps(data, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def load_state(workbook) -> Model | None:
+    """The Model saved for the workbook, or None when there is none or it
+    was written by another version or for another file."""
+    workbook = Path(workbook).resolve()
+    try:
+        data = json.loads(state_path(workbook).read_text(encoding="utf-8"))
+        if data.get("version") != VERSION or data.get("workbook") != str(workbook):
+            return None
+        return _model(data)
+    except (OSError, ValueError, KeyError, TypeError, IndexError):
+        return None
+
+
+def discard_state(workbook) -> None:
+    """Forget the saved state, for when something else rewrote the values."""
+    try:
+        state_path(Path(workbook).resolve()).unlink()
+    except FileNotFoundError:
+        pass
+
+
+def _model(data) -> Model:
+    model = Model()
+    titles = [sheet["title"] for sheet in data["sheets"]]
+    for sheet in data["sheets"]:
+        title = sheet["title"]
+        model.add_sheet(title)
+        model.dimensions[title] = tuple(sheet["dimensions"])
+        model.part_signatures[title] = sheet["part_signature"]
+        for row, col, value in sheet["values"]:
+            model.values[(title, row, col)] = _decode(value)
+        for row, col, formula, value, reads in sheet["formulas"]:
+            key = (title, row, col)
+            model.formulas[key] = formula
+            model.values[key] = _decode(value)
+            model.precedents[key] = [
+                ("cell", (titles[target[0]], *target[1:]))
+                if len(target) == 3
+                else ("range", (titles[target[0]], *target[1:]))
+                for target in reads
+            ]
+    model.names = {(scope, name): text for scope, name, text in data["names"]}
+    model.circular = _keys(data["circular"], titles)
+    model.volatile = _keys(data["volatile"], titles)
+    model.error_cells = _keys(data["errors"], titles)
+    model.signature = data["signature"]
+    return model
+
+
+def _cells(keys, index):
+    return [[index[title], row, col] for title, row, col in keys]
+
+
+def _keys(cells, titles):
+    return {(titles[number], row, col) for number, row, col in cells}
+
+
+def _encode(value):
+    if isinstance(value, ExcelError):
+        return {"error": value.code}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        return ERRORS.get(value["error"], VALUE)
+    return value
@@ -0,0 +1,231 @@
+"""Excel values: errors, ranges, coercions and comparison.
+
+Cell values are None (blank), bool, int, float, str or an ExcelError. An
+ExcelError is also an exception: raising it from anywhere in a formula
+makes it the formula's result, which is how errors propagate.
+"""
+
+import re
+
+
+class ExcelError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.code = code
+
+    def __eq__(self, other):
+        return isinstance(other, ExcelError) and other.code == self.code
+
+    def __hash__(self):
+        return hash(self.code)
+
+    def __str__(self):
+        return self.code
+
+    def __repr__(self):
+        return f"ExcelError({self.code!r})"
+
+
+NULL = ExcelError("#NULL!")
+DIV0 = ExcelError("#DIV/0!")
+VALUE = ExcelError("#VALUE!")
+REF = ExcelError("#REF!")
+NAME = ExcelError("#NAME?")
+NUM = ExcelError("#NUM!")
+NA = ExcelError("#N/A")
+
+ERRORS = {error.code: error for error in (NULL, DIV0, VALUE, REF, NAME, NUM, NA)}
+
+
+class Range:
+    """A rectangular block of values, row-major; sheet/row/col locate its
+    top-left cell when it came from a reference rather than a computation."""
+
+    __slots__ = ("rows", "sheet", "row", "col")
+
+    def __init__(self, rows, sheet=None, row=None, col=None):
+        self.rows = rows
+        self.sheet = sheet
+        self.row = row
+        self.col = col
+
+    @property
+    def height(self):
+        return len(self.rows)
+
+    @property
+    def width(self):
+        return len(self.rows[0]) if self.rows else 0
+
+    def __iter__(self):
+        for row in self.rows:
+            yield from row
+
+    def scalar(self):
+        if len(self.rows) == 1 and len(self.rows[0]) == 1:
+            return self.rows[0][0]
+        raise VALUE
+
+    def vector(self):
+        """Values of a single row or column; #N/A for a 2-D block."""
+        if len(self.rows) == 1:
+            return self.rows[0]
+        if self.rows and len(self.rows[0]) == 1:
+            return [row[0] for row in self.rows]
+        raise NA
+
+
+def scalar(value):
+    return value.scalar() if isinstance(value, Range) else value
+
+
+_NUMBER = re.compile(r"^\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*$")
+
+
+def parse_number(text):
+    """float for numeric text (including "12%"), else None."""
+    text = text.strip()
+    percent = text.endswith("%")
+    if percent:
+        text = text[:-1]
+    if not _NUMBER.match(text):
+        return None
+    number = float(text)
+    return number / 100 if percent else number
+
+
+def to_number(value):
+    value = scalar(value)
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    if value is None:
+        return 0
+    if isinstance(value, ExcelError):
+        raise value
+    number = parse_number(value)
+    if number is None:
+        raise VALUE
+    return number
+
+
+def to_int(value):
+    """Whole-number argument, truncated toward zero as Excel does."""
+    return int(to_number(value))
+
+
+def to_text(value):
+    value = scalar(value)
+    if isinstance(value, str):
+        return value
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, ExcelError):
+        raise value
+    return format_number(value)
+
+
+def format_number(number):
+    if isinstance(number, int):
+        return str(number)
+    if number.is_integer() and abs(number) < 1e15:
+        return str(int(number))
+    return f"{number:.15G}".replace("E+", "E")
+
+
+def to_bool(value):
+    value = scalar(value)
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    if value is None:
+        return False
+    if isinstance(value, ExcelError):
+        raise value
+    upper = value.upper()
+    if upper in ("TRUE", "FALSE"):
+        return upper == "TRUE"
+    raise VALUE
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _rank(value):
+    if isinstance(value, bool):
+        return 2
+    if isinstance(value, str):
+        return 1
+    return 0
+
+
+def _blank_like(value):
+    if isinstance(value, bool):
+        return False
+    if isinstance(value, str):
+        return ""
+    return 0
+
+
+def compare(a, b):
+    """-1, 0 or 1, ordering as Excel's comparison operators do: numbers
+    before text before logicals, text case-insensitively, blank as the
+    other side's empty value."""
+    if a is None:
+        a = _blank_like(b)
+    if b is None:
+        b = _blank_like(a)
+    rank_a, rank_b = _rank(a), _rank(b)
+    if rank_a != rank_b:
+        return -1 if rank_a < rank_b else 1
+    if rank_a == 1:
+        a, b = a.lower(), b.lower()
+    return (a > b) - (a < b)
+
+
+def same_value(a, b):
+    """Whether two cell values read the same in a sheet (1 and 1.0 do, 1 and
+    TRUE don't)."""
+    if is_number(a) and is_number(b):
+        return a == b
+    return a.__class__ is b.__class__ and a == b
+
+
+def mentions_error(value):
+    """Whether a cell shows an error: an error value, or text quoting one."""
+    if value.__class__ is ExcelError:
+        return True
+    return isinstance(value, str) and "#" in value and any(code in value for code in ERRORS)
+
+
+def same_kind(a, b):
+    return _rank(a) == _rank(b) and a is not None and b is not None
+
+
+def wildcard_pattern(text):
+    """Compiled regex for an Excel wildcard pattern (*, ?, ~ escapes)."""
+    parts = []
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "~" and i + 1 < len(text) and text[i + 1] in "*?~":
+            parts.append(re.escape(text[i + 1]))
+            i += 2
+            continue
+        if char == "*":
+            parts.append(".*")
+        elif char == "?":
+            parts.append(".")
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return re.compile("".join(parts), re.IGNORECASE | re.DOTALL)
+
+
+def has_wildcards(text):
+    return any(char in text for char in "*?~")
@@ -0,0 +1,96 @@
+"""Store computed formula results in an xlsx file.
+
+Only the <v> (and t attribute) of formula cells change; every other part
+of the package is copied through byte for byte, so styles, charts and
+anything openpyxl would not round-trip survive untouched.
+"""
+
+import os
+import shutil
+import tempfile
+import zipfile
+
+from lxml import etree
+
+from .reader import FORMULA, INLINE, ROW, VALUE_TAG, positioned_cells, sheet_parts
+from .values import ExcelError
+
+_PARSER = etree.XMLParser(resolve_entities=False, huge_tree=True)
+
+
+def write_values(path, values: dict, formulas) -> None:
+    """Set the cached value of each formula cell (sheet, row, col) in
+    formulas to values[cell], rewriting the file at path atomically."""
+    by_sheet = {}
+    for key in formulas:
+        by_sheet.setdefault(key[0], {})[(key[1], key[2])] = values.get(key)
+
+    path = os.fspath(path)
+    with zipfile.ZipFile(path) as archive:
+        parts = sheet_parts(archive)
+        updated = {}
+        for title, cells in by_sheet.items():
+            part = parts.get(title)
+            if part is None:
+                continue
+            root = etree.fromstring(archive.read(part), _PARSER)
+            _set_values(root, cells)
+            updated[part] = etree.tostring(
+                root, xml_declaration=True, encoding="UTF-8", standalone=True
+            )
+
+        handle, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(os.path.abspath(path)), suffix=".xlsx"
+        )
+        os.close(handle)
+        try:
+            with zipfile.ZipFile(temp_path, "w") as output:
+                for info in archive.infolist():
+                    data = updated.get(info.filename)
+                    if data is None:
+                        data = archive.read(info)
+                    output.writestr(info, data, compress_type=info.compress_type)
+            # mkstemp creates the file 0600; keep the workbook's own mode.
+            shutil.copymode(path, temp_path)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+
+def _set_values(root, cells: dict) -> None:
+    for row, col, cell in positioned_cells(root.iter(ROW)):
+        if (row, col) not in cells:
+            continue
+        children = {child.tag: child for child in cell}
+        formula = children.get(FORMULA)
+        if formula is None:
+            continue
+        if INLINE in children:
+            cell.remove(children[INLINE])
+
+        kind, text = _serialize(cells[(row, col)])
+        if kind is None:
+            cell.attrib.pop("t", None)
+        else:
+            cell.set("t", kind)
+        value = children.get(VALUE_TAG)
+        if value is None:
+            value = etree.Element(VALUE_TAG)
+            formula.addnext(value)
+        value.text = text
+
+
+def _serialize(value):
+    """(t attribute, <v> text) for a computed value."""
+    if isinstance(value, ExcelError):
+        return "e", value.code
+    if isinstance(value, bool):
+        return "b", "1" if value else "0"
+    if isinstance(value, str):
+        return "str", value
+    if value is None:
+        return None, "0"
+    if isinstance(value, float) and value.is_integer() and abs(value) < 2**53:
+        return None, str(int(value))
+    return None, repr(value) if isinstance(value, float) else str(value)
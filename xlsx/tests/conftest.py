@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+import pytest
+from openpyxl import Workbook
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+
+@pytest.fixture
+def make_workbook(tmp_path):
+    """Save a workbook built from {sheet title: {coordinate: value}} and
+    return its path; strings starting with "=" are formulas."""
+
+    def make(sheets, name="book.xlsx"):
+        workbook = Workbook()
+        workbook.remove(workbook.active)
+        for title, cells in sheets.items():
+            sheet = workbook.create_sheet(title)
+            for coordinate, value in cells.items():
+                sheet[coordinate] = value
+        path = tmp_path / name
+        workbook.save(path)
+        return path
+
+    return make
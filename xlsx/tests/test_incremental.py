@@ -0,0 +1,151 @@
+"""recalc.py reusing .<name>.recalc.json to recompute only what an edit reaches."""
+
+from openpyxl import load_workbook
+from openpyxl.workbook.defined_name import DefinedName
+
+import recalc
+from recalc_engine import load_state
+from recalc_engine.state import state_path
+
+CELLS = {
+    "A1": 1,
+    "A2": 2,
+    "B1": "=A1*10",  # reads A1
+    "B2": "=B1+1",  # reads A1 through B1
+    "C1": "=A2*2",  # independent of A1
+    "C2": "=SUM(A1:A2)",  # reads A1 through a range
+    "D1": "=D2+1",  # D1 and D2 form a cycle
+    "D2": "=D1+1",
+}
+
+
+def run(path, **kwargs):
+    result = recalc.recalc(str(path), engine="python", **kwargs)
+    assert "error" not in result, result
+    return result
+
+
+def edit(path, changes, sheet="S"):
+    """Change cells with openpyxl, which drops every cached formula result."""
+    workbook = load_workbook(path)
+    for coordinate, value in changes.items():
+        workbook[sheet][coordinate] = value
+    workbook.save(path)
+
+
+def results(path, sheet="S"):
+    workbook = load_workbook(path, data_only=True)
+    return {cell.coordinate: cell.value for row in workbook[sheet].iter_rows() for cell in row}
+
+
+def test_first_run_is_full_and_saves_state(make_workbook):
+    path = make_workbook({"S": CELLS})
+
+    result = run(path)
+
+    assert result["recalculated_formulas"] == result["total_formulas"] == 6
+    assert state_path(path.resolve()).is_file()
+    assert run(path)["recalculated_formulas"] == 0
+
+
+def test_edit_recalculates_only_its_cone(make_workbook):
+    path = make_workbook({"S": CELLS})
+    run(path)
+
+    edit(path, {"A1": 5})
+    result = run(path)
+
+    assert result["recalculated_formulas"] == 3  # B1, B2, C2
+    values = results(path)
+    assert (values["B1"], values["B2"], values["C2"]) == (50, 51, 7)
+
+
+def test_results_outside_the_cone_are_written_back(make_workbook):
+    path = make_workbook({"S": CELLS})
+    run(path)
+
+    edit(path, {"A1": 5})
+    run(path)
+
+    values = results(path)
+    assert values["C1"] == 4
+    assert values["D1"] == values["D2"] == "#VALUE!"
+
+
+def test_cycle_is_reported_on_every_run(make_workbook):
+    path = make_workbook({"S": CELLS})
+
+    assert run(path)["circular_references"] == ["S!D1", "S!D2"]
+    edit(path, {"A1": 5})
+    assert run(path)["circular_references"] == ["S!D1", "S!D2"]
+
+    edit(path, {"D2": 3})
+    result = run(path)
+    assert "circular_references" not in result
+    assert results(path)["D1"] == 4
+
+
+def test_changed_formula_text_is_recomputed(make_workbook):
+    path = make_workbook({"S": CELLS})
+    run(path)
+
+    edit(path, {"C1": "=A1+A2", "D2": "=C1"})
+    result = run(path)
+
+    assert result["recalculated_formulas"] == 3  # C1, D2 and D1 reading it
+    assert "circular_references" not in result
+    values = results(path)
+    assert (values["C1"], values["D2"], values["D1"]) == (3, 3, 4)
+
+
+def test_changed_sheet_list_forces_a_full_recalc(make_workbook):
+    path = make_workbook({"S": CELLS})
+    run(path)
+
+    workbook = load_workbook(path)
+    workbook.create_sheet("New")["A1"] = "=S!A1+1"
+    workbook.save(path)
+    result = run(path)
+
+    assert result["recalculated_formulas"] == result["total_formulas"] == 7
+    assert results(path, "New")["A1"] == 2
+
+
+def test_changed_defined_name_forces_a_full_recalc(make_workbook):
+    path = make_workbook({"S": {"A1": 1, "A2": 2, "B1": "=Base*2", "B2": "=A2*2"}})
+    workbook = load_workbook(path)
+    workbook.defined_names["Base"] = DefinedName("Base", attr_text="S!$A$1")
+    workbook.save(path)
+    run(path)
+
+    workbook = load_workbook(path)
+    workbook.defined_names["Base"] = DefinedName("Base", attr_text="S!$A$2")
+    workbook.save(path)
+    result = run(path)
+
+    assert result["recalculated_formulas"] == 2
+    assert results(path)["B1"] == 4
+
+
+def test_full_ignores_the_state(make_workbook):
+    path = make_workbook({"S": CELLS})
+    run(path)
+    assert run(path)["recalculated_formulas"] == 0
+
+    result = run(path, incremental=False)
+
+    assert result["recalculated_formulas"] == 6
+
+
+def test_model_update_walks_the_cone_in_memory(make_workbook):
+    path = make_workbook({"S": CELLS})
+    run(path)
+    model = load_state(path)
+
+    recomputed = model.update({("S", 1, 1): 7})
+
+    assert recomputed == {("S", 1, 2), ("S", 2, 2), ("S", 2, 3)}
+    assert model.values[("S", 2, 2)] == 71
+    assert model.update({("S", 3, 1): 1}) == set()  # A1:A2 doesn't reach A3
+    assert model.update({("S", 2, 1): 3}) == {("S", 1, 3), ("S", 2, 3)}
+    assert model.values[("S", 2, 3)] == 10
@@ -0,0 +1,196 @@
+"""Formula results of the in-process engine and how recalc.py uses it."""
+
+import os
+import zipfile
+
+import pytest
+from openpyxl import load_workbook
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
+
+import recalc
+from recalc_engine import ExcelError, Model, write_values
+
+
+def calculate(make_workbook, cells, extra_sheets=None):
+    """Values of the cells on sheet S after a full calculation."""
+    path = make_workbook({"S": cells, **(extra_sheets or {})})
+    model = Model.load(path)
+    model.compile()
+    model.calculate()
+    return model
+
+
+def value(model, coordinate, sheet="S"):
+    column, row = coordinate_from_string(coordinate)
+    result = model.values.get((sheet, row, column_index_from_string(column)))
+    return result.code if isinstance(result, ExcelError) else result
+
+
+@pytest.mark.parametrize(
+    "formula, expected",
+    [
+        ("=-2^2", 4),
+        ("=2^3^2", 64),
+        ("=1+2*3", 7),
+        ("=(1+2)*3", 9),
+        ('="a"&1+1', "a2"),
+        ('=1&2="12"', True),
+        ("=1+2=3", True),
+        ("=2*3>5", True),
+        ("=1<2=TRUE", True),
+        ("=10%*3", pytest.approx(0.3)),
+        ('="b">"A"', True),
+    ],
+)
+def test_operator_precedence(make_workbook, formula, expected):
+    assert value(calculate(make_workbook, {"A1": formula}), "A1") == expected
+
+
+def test_errors_propagate_and_iferror_catches_them(make_workbook):
+    model = calculate(
+        make_workbook,
+        {
+            "A1": "=1/0",
+            "A2": "=A1+1",
+            "A3": "=SUM(A1:A2)",
+            "A4": '=IFERROR(A2,"caught")',
+            "A5": "=IFERROR(A2*0+1,0)",
+            "A6": "=ISERROR(A3)",
+            "A7": '=IFNA(MATCH(9,B1:B3,0),"none")',
+            "A8": "=NOSUCHNAME+1",
+            "B1": 1,
+            "B2": 2,
+        },
+    )
+    assert value(model, "A1") == "#DIV/0!"
+    assert value(model, "A2") == "#DIV/0!"
+    assert value(model, "A3") == "#DIV/0!"
+    assert value(model, "A4") == "caught"
+    assert value(model, "A5") == 0
+    assert value(model, "A6") is True
+    assert value(model, "A7") == "none"
+    assert value(model, "A8") == "#NAME?"
+
+
+def test_implicit_intersection(make_workbook):
+    model = calculate(
+        make_workbook,
+        {
+            "A1": 10, "A2": 20, "A3": 30,
+            "B2": "=A1:A3",
+            "B5": "=A1:A3",
+            "D1": 1, "E1": 2, "F1": 3,
+            "E3": "=D1:F1",
+            "C2": "=A1:A3*2",
+        },
+    )
+    assert value(model, "B2") == 20
+    assert value(model, "B5") == "#VALUE!"
+    assert value(model, "E3") == 2
+    assert value(model, "C2") == 40
+
+
+def test_lookup_functions(make_workbook):
+    model = calculate(
+        make_workbook,
+        {
+            "A1": "=VLOOKUP(2,D1:F3,3,FALSE)",
+            "A2": "=VLOOKUP(2.5,D1:F3,2)",
+            "A3": "=VLOOKUP(9,D1:F3,2,FALSE)",
+            "A4": "=HLOOKUP(\"b\",H1:J2,2,FALSE)",
+            "A5": "=INDEX(E1:E3,MATCH(3,D1:D3,0))",
+            "A6": "=MATCH(2.5,D1:D3,1)",
+            "A7": '=XLOOKUP("z",E1:E3,F1:F3,"missing")',
+            "A8": '=XLOOKUP("y",E1:E3,F1:F3)',
+            "A9": "=INDEX(D1:F3,2,3)",
+            "D1": 1, "E1": "x", "F1": 100,
+            "D2": 2, "E2": "y", "F2": 200,
+            "D3": 3, "E3": "z", "F3": 300,
+            "H1": "a", "I1": "b", "J1": "c",
+            "H2": 1, "I2": 2, "J2": 3,
+        },
+    )
+    assert value(model, "A1") == 200
+    assert value(model, "A2") == "y"
+    assert value(model, "A3") == "#N/A"
+    assert value(model, "A4") == 2
+    assert value(model, "A5") == "z"
+    assert value(model, "A6") == 2
+    assert value(model, "A7") == 300
+    assert value(model, "A8") == 200
+    assert value(model, "A9") == 200
+
+
+def test_cross_sheet_references_and_names(make_workbook):
+    model = calculate(
+        make_workbook,
+        {"A1": "=SUM('Other Sheet'!A1:A3)", "A2": "='Other Sheet'!A2*2"},
+        {"Other Sheet": {"A1": 1, "A2": 2, "A3": 3}},
+    )
+    assert value(model, "A1") == 6
+    assert value(model, "A2") == 4
+
+
+def test_auto_engine_falls_back_to_libreoffice_for_unsupported(make_workbook, monkeypatch):
+    path = make_workbook({"S": {"A1": 2, "A2": '=WEBSERVICE("http://example.com")'}})
+    calls = []
+    monkeypatch.setattr(recalc, "_recalc_with_macro", lambda path, timeout: calls.append(path))
+
+    result = recalc.recalc(str(path), engine="auto")
+
+    assert calls == [str(path.absolute())]
+    assert result["total_formulas"] == 1
+    assert "recalculated_formulas" not in result
+
+
+def test_python_engine_reports_unsupported(make_workbook, monkeypatch):
+    path = make_workbook({"S": {"A1": '=WEBSERVICE("http://example.com")'}})
+    monkeypatch.setattr(recalc, "_recalc_with_macro", pytest.fail)
+
+    result = recalc.recalc(str(path), engine="python")
+
+    assert "WEBSERVICE" in result["error"]
+
+
+def test_auto_engine_reports_engine_bugs(make_workbook, monkeypatch):
+    path = make_workbook({"S": {"A1": "=1+1"}})
+    monkeypatch.setattr(recalc, "_recalc_with_macro", pytest.fail)
+
+    def broken(self):
+        raise KeyError("bug")
+
+    monkeypatch.setattr(Model, "calculate", broken)
+
+    result = recalc.recalc(str(path), engine="auto", incremental=False)
+
+    assert result["error"].startswith("In-process recalculation failed: KeyError")
+
+
+def test_write_values_round_trip(make_workbook):
+    path = make_workbook(
+        {
+            "S": {"A1": 2, "A2": "=A1*3", "A3": '=A1&"x"', "A4": "=1/0", "A5": "=A1>1"},
+            "Constants": {"A1": "text", "B1": 1.5},
+        }
+    )
+    os.chmod(path, 0o644)
+    with zipfile.ZipFile(path) as archive:
+        before = {info.filename: archive.read(info) for info in archive.infolist()}
+
+    model = Model.load(path)
+    model.compile()
+    model.calculate()
+    write_values(path, model.values, model.formulas)
+
+    with zipfile.ZipFile(path) as archive:
+        assert archive.testzip() is None
+        after = {info.filename: archive.read(info) for info in archive.infolist()}
+    assert list(after) == list(before)
+    changed = {name for name in before if before[name] != after[name]}
+    assert changed == {"xl/worksheets/sheet1.xml"}
+    assert os.stat(path).st_mode & 0o777 == 0o644
+
+    sheet = load_workbook(path, data_only=True)["S"]
+    assert [sheet[f"A{row}"].value for row in range(1, 6)] == [2, 6, "2x", "#DIV/0!", True]
+    formulas = load_workbook(path)["S"]
+    assert formulas["A2"].value == "=A1*3"